@@ -0,0 +1,9 @@
+"""
+Pruebas de rendimiento de la capa de datos del punto de venta
+
+    python -m benchmark generar --productos 5000 --dias 365
+    python -m benchmark medir --repeticiones 50 --salida resultados.json
+
+Usar siempre una base de datos de pruebas: generar agrega miles de
+productos y ventas, y el escenario de cobro registra ventas reales.
+"""
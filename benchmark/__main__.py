@@ -0,0 +1,84 @@
+"""
+Línea de comandos de las pruebas de rendimiento
+
+    python -m benchmark generar --productos 5000 --dias 365
+    python -m benchmark medir --repeticiones 50 --salida resultados.json
+    python -m benchmark medir --escenarios busqueda cobro
+"""
+
+import argparse
+import json
+import platform
+import sys
+from datetime import datetime
+
+from database.conexion import ConexionBD
+from benchmark.escenarios import Escenarios
+from benchmark.generador import GeneradorDatos
+
+
+def crear_parser():
+    """Argumentos de los subcomandos generar y medir"""
+    parser = argparse.ArgumentParser(prog="python -m benchmark",
+                                     description="Pruebas de rendimiento de la capa de datos")
+    parser.add_argument("--base-datos",
+                        help="Base de datos MySQL o archivo SQLite de pruebas (por omisión el de config.py)")
+    parser.add_argument("--semilla", type=int, default=42)
+    subcomandos = parser.add_subparsers(dest="comando", required=True)
+    
+    generar = subcomandos.add_parser("generar", help="Inserta catálogo y ventas sintéticas")
+    generar.add_argument("--productos", type=int, default=5000)
+    generar.add_argument("--dias", type=int, default=365)
+    generar.add_argument("--ventas-min", type=int, default=80)
+    generar.add_argument("--ventas-max", type=int, default=200)
+    
+    medir = subcomandos.add_parser("medir", help="Cronometra los escenarios")
+    medir.add_argument("--repeticiones", type=int, default=30)
+    medir.add_argument("--escenarios", nargs="*", help="Solo estos escenarios")
+    medir.add_argument("--salida", help="Archivo JSON (por omisión se imprime)")
+    return parser
+
+
+def main(argumentos=None):
+    args = crear_parser().parse_args(argumentos)
+    
+    bd = ConexionBD.desde_config(args.base_datos, tamaño_pool=1)
+    if not bd.conectar():
+        return 1
+    
+    try:
+        if args.comando == "generar":
+            generador = GeneradorDatos(bd, args.semilla)
+            generador.generar_catalogo(args.productos)
+            generador.generar_ventas(args.dias, (args.ventas_min, args.ventas_max))
+            return 0
+        
+        escenarios = Escenarios(bd, args.semilla)
+        if bd.instrumentacion:
+            bd.instrumentacion.reiniciar()
+        resultados = escenarios.medir(args.repeticiones, args.escenarios)
+        informe = {
+            'fecha': datetime.now().isoformat(timespec='seconds'),
+            'motor': bd.motor.nombre,
+            'base_datos': bd.motor.destino,
+            'python': platform.python_version(),
+            'repeticiones': args.repeticiones,
+            'escenarios': resultados,
+        }
+        if bd.instrumentacion:
+            # Sentencias que más tiempo sumaron durante la medición
+            informe['consultas'] = bd.instrumentacion.resumen(limite=20)
+        texto = json.dumps(informe, indent=2, ensure_ascii=False)
+        if args.salida:
+            with open(args.salida, 'w', encoding='utf-8') as archivo:
+                archivo.write(texto + "\n")
+            print(f"✓ Resultados guardados en {args.salida}")
+        else:
+            print(texto)
+        return 0
+    finally:
+        bd.desconectar()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,208 @@
+"""
+Escenarios cronometrados de las rutas críticas
+
+Cada escenario se repite varias veces y se reportan percentiles p50/p95
+en milisegundos. Las consultas son las mismas que usan gui/ y main.py.
+"""
+
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from database import consultas
+from database.analitica import AnaliticaVentas
+from database.carrito import Carrito
+from database.catalogo import CatalogoProductos
+from database.consultas import RangoFechas
+from database.diario import DiarioVentas, SincronizadorVentas
+from database.dinero import a_centavos
+from database.ranking import RankingProductos
+from database.reservas import StockInsuficienteError
+from database.tablero import TableroVentas
+
+
+VENTAS_POR_SINCRONIZACION = 20
+
+TERMINOS_BUSQUEDA = ["ref", "agua", "leche light", "cafe", "galletas fresa", "1l",
+                     "chocolate extra", "jabon", "xyz", "12"]
+
+
+def percentil(tiempos, p):
+    """Percentil p (0-100) de una lista ordenada, por rango más cercano"""
+    indice = max(0, min(len(tiempos) - 1, round(p / 100 * len(tiempos)) - 1))
+    return tiempos[indice]
+
+
+def cronometrar(funcion, repeticiones, calentamiento=1):
+    """
+    Ejecuta funcion() varias veces y resume los tiempos
+    
+    Returns:
+        Diccionario con repeticiones, p50_ms, p95_ms, min_ms y max_ms
+    """
+    for _ in range(calentamiento):
+        funcion()
+    
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    tiempos.sort()
+    
+    return {
+        'repeticiones': repeticiones,
+        'p50_ms': round(percentil(tiempos, 50), 3),
+        'p95_ms': round(percentil(tiempos, 95), 3),
+        'min_ms': round(tiempos[0], 3),
+        'max_ms': round(tiempos[-1], 3),
+    }
+
+
+class Escenarios:
+    """Escenarios de catálogo, búsqueda, cobro, reportes y gráficas"""
+    
+    def __init__(self, bd, semilla=42):
+        self.bd = bd
+        self.azar = random.Random(semilla)
+        self.catalogo = CatalogoProductos(bd)
+        self.analitica = AnaliticaVentas(bd)
+        self.tablero = TableroVentas(bd)
+        self.ranking = RankingProductos(bd)
+        self.codigos = []
+        
+        # Diario desechable para medir la caja sin conexión
+        self.carpeta = tempfile.mkdtemp(prefix="diario_")
+        self.diario = DiarioVentas(os.path.join(self.carpeta, "diario_ventas.jsonl"))
+        self.sincronizador = SincronizadorVentas(bd, self.diario)
+    
+    def todos(self):
+        """Nombre -> función sin argumentos de cada escenario"""
+        hoy = RangoFechas.hoy()
+        mes = RangoFechas.mes_actual()
+        return {
+            'catalogo_carga': self.catalogo.cargar,
+            'catalogo_refrescar': self.catalogo.refrescar,
+            'busqueda': self.buscar,
+            'escaneo': self.escanear,
+            'carrito_mayoreo': self.llenar_carrito,
+            'cobro': self.cobrar,
+            'diario_registrar': self.registrar_en_diario,
+            'diario_sincronizar': self.sincronizar_diario,
+            'reporte_ventas_dia': lambda: consultas.ventas_del_periodo(self.bd, hoy),
+            'reporte_ventas_mes_pagina': lambda: consultas.pagina_ventas_del_periodo(self.bd, mes),
+            'reporte_stock_bajo': lambda: consultas.productos_stock_bajo(self.bd),
+            'analitica_carga': self.cargar_analitica,
+            # Cada gráfica pone al día la analítica (solo las ventas nuevas) y agrega
+            'grafica_ventas_por_hora': lambda: self.grafica(self.analitica.ventas_por_hora, hoy),
+            'grafica_producto_top': lambda: self.grafica(self.producto_top, mes),
+            'grafica_categorias': lambda: self.grafica(self.analitica.ingresos_por_categoria),
+            'grafica_tendencia_mes': lambda: self.grafica(self.analitica.tendencia_diaria, mes),
+            # La primera vuelta (calentamiento) trae el día; las medidas, solo lo nuevo
+            'tablero_vuelta': self.tablero.actualizar,
+            # Después del calentamiento solo revisa si hay ventas nuevas y arma el heap
+            'ranking_mas_vendidos': lambda: self.ranking.mas_vendidos(),
+            'ranking_menos_vendidos': lambda: self.ranking.menos_vendidos(),
+            'ranking_mes': lambda: self.ranking.mas_vendidos(mes),
+        }
+    
+    def medir(self, repeticiones, nombres=None):
+        """
+        Ejecuta los escenarios indicados (todos por omisión)
+        
+        Returns:
+            Diccionario nombre -> resumen de tiempos
+        """
+        escenarios = self.todos()
+        self.catalogo.cargar()
+        
+        resultados = {}
+        for nombre in nombres or escenarios:
+            if nombre not in escenarios:
+                print(f"✗ Escenario desconocido: {nombre}", file=sys.stderr)
+                continue
+            # Los mensajes de éxito de cada venta no se miden ni se muestran
+            with contextlib.redirect_stderr(io.StringIO()):
+                resultados[nombre] = cronometrar(escenarios[nombre], repeticiones)
+            # El avance va a stderr: stdout queda para el JSON de resultados
+            print(f"✓ {nombre}: p50 {resultados[nombre]['p50_ms']} ms, p95 {resultados[nombre]['p95_ms']} ms",
+                  file=sys.stderr)
+        return resultados
+    
+    def buscar(self):
+        """Búsqueda del punto de venta sobre el índice en memoria"""
+        for termino in TERMINOS_BUSQUEDA:
+            self.catalogo.buscar(termino)
+    
+    def escanear(self):
+        """Una canasta de 30 códigos de barras resueltos en el catálogo"""
+        # La lista de códigos se arma en la vuelta de calentamiento
+        if not self.codigos:
+            self.codigos = [prod['codigo_barras'] for prod in self.catalogo.por_id.values()
+                            if prod.get('codigo_barras')]
+            if not self.codigos:
+                return
+        for codigo in self.azar.choices(self.codigos, k=30):
+            self.catalogo.buscar_por_codigo(codigo)
+    
+    def llenar_carrito(self):
+        """Canasta de mayoreo: 1000 lecturas sobre 300 productos, con líneas repetidas"""
+        productos = list(self.catalogo.por_id.values())
+        if not productos:
+            return
+        carrito = Carrito()
+        for prod in self.azar.choices(productos[:300], k=1000):
+            carrito.agregar(prod['id'], prod['nombre'], a_centavos(prod['precio_venta']), 1)
+        carrito.lineas_venta()
+    
+    def lineas_al_azar(self):
+        """Líneas de venta de 1 a 5 productos al azar"""
+        productos = self.azar.sample(list(self.catalogo.por_id.values()),
+                                     min(len(self.catalogo.por_id), self.azar.randint(1, 5)))
+        return [{
+            'producto_id': prod['id'],
+            'cantidad': 1,
+            'precio_unitario': prod['precio_venta'],
+            'subtotal': prod['precio_venta'],
+        } for prod in productos]
+    
+    def cobrar(self):
+        """Registra una venta de 1 a 5 productos al azar"""
+        lineas = self.lineas_al_azar()
+        ahora = datetime.now()
+        try:
+            self.bd.registrar_venta(ahora.date(), ahora.strftime('%H:%M:%S'), 'Efectivo', lineas)
+        except StockInsuficienteError:
+            pass
+    
+    def registrar_en_diario(self):
+        """Cobro sin conexión: una línea en el diario con fsync"""
+        ahora = datetime.now()
+        self.diario.registrar(ahora.date(), ahora.time(), 'Efectivo', self.lineas_al_azar())
+    
+    def sincronizar_diario(self):
+        """Envía a la base de datos un lote de ventas del diario"""
+        for _ in range(VENTAS_POR_SINCRONIZACION - self.diario.pendientes):
+            self.registrar_en_diario()
+        self.sincronizador.sincronizar()
+    
+    def cargar_analitica(self):
+        """Carga completa de las líneas de venta a la tabla en columnas"""
+        self.analitica = AnaliticaVentas(self.bd)
+        self.analitica.actualizar()
+    
+    def grafica(self, funcion, *argumentos):
+        """Como VentanaGraficas.consultar: pone al día la analítica y calcula la gráfica"""
+        self.analitica.actualizar()
+        return funcion(*argumentos)
+    
+    def producto_top(self, rango):
+        """Las dos agregaciones de la gráfica del producto más vendido"""
+        producto_top = self.analitica.productos_mas_vendidos(rango, limite=1)
+        if not producto_top.empty:
+            self.analitica.tendencia_producto(producto_top['id'].iat[0], rango)
@@ -0,0 +1,207 @@
+"""
+Generador masivo de catálogo y ventas sintéticas
+
+A diferencia del procedimiento generar_ventas_mes de bd.sql (una venta a
+la vez y ORDER BY RAND() por cada línea), arma las filas en Python y las
+inserta por lotes con INSERT de varias filas. Con la misma semilla genera
+siempre los mismos datos.
+"""
+
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+
+from database.motores import Error
+
+from database.resumenes import reconstruir_resumenes
+
+
+NOMBRES = ["Refresco", "Agua", "Jugo", "Galletas", "Papas", "Leche", "Yogur", "Queso",
+           "Pan", "Cereal", "Arroz", "Frijol", "Atún", "Jabón", "Champú", "Café",
+           "Azúcar", "Aceite", "Salsa", "Chocolate", "Dulce", "Cerveza", "Detergente"]
+VARIANTES = ["Natural", "Light", "Clásico", "Picante", "Fresa", "Vainilla", "Limón",
+             "Integral", "Familiar", "Mini", "Extra", "Orgánico", "Sin Azúcar"]
+PRESENTACIONES = ["250ml", "355ml", "600ml", "1L", "2L", "100g", "250g", "500g", "1kg", "Pack 6"]
+CATEGORIAS = ["Bebidas", "Snacks", "Lácteos", "Panadería", "Abarrotes", "Limpieza",
+              "Higiene", "Dulces", "Enlatados", "Congelados"]
+
+# Misma distribución que generar_hora_realista() y generar_metodo_pago()
+FRANJAS_HORA = [(0.15, 0), (0.35, 6), (0.70, 12), (1.00, 18)]
+METODOS_PAGO = [(0.55, 'Efectivo'), (0.85, 'Tarjeta Débito'),
+                (0.95, 'Tarjeta Crédito'), (1.00, 'Transferencia')]
+
+TAMAÑO_LOTE = 2000
+
+
+def ean13(numero):
+    """
+    Código EAN-13 de uso interno (prefijo 2) con su dígito verificador
+    
+    Args:
+        numero: Entero que distingue al producto (hasta 11 dígitos)
+    """
+    base = f"2{numero:011d}"
+    suma = sum(int(d) * (3 if i % 2 else 1) for i, d in enumerate(base))
+    return base + str((10 - suma % 10) % 10)
+
+
+class GeneradorDatos:
+    """Inserta productos y ventas sintéticas por lotes"""
+    
+    def __init__(self, bd, semilla=42):
+        self.bd = bd
+        self.azar = random.Random(semilla)
+    
+    def generar_catalogo(self, cantidad):
+        """
+        Inserta productos sintéticos con stock alto
+        
+        Args:
+            cantidad: Número de productos a insertar
+        
+        Returns:
+            Cantidad insertada
+        """
+        categorias = self._asegurar_categorias()
+        # Códigos a partir del último ID para no repetir los de otra generación
+        ultimo = self.bd.ejecutar_consulta("SELECT COALESCE(MAX(id), 0) as ultimo FROM productos")
+        primero = (ultimo[0]['ultimo'] if ultimo else 0) + 1
+        filas = []
+        for i in range(cantidad):
+            compra = Decimal(self.azar.randint(500, 20000)) / 100
+            venta = (compra * Decimal('1.35')).quantize(Decimal('0.01'))
+            nombre = "{} {} {} #{}".format(
+                self.azar.choice(NOMBRES), self.azar.choice(VARIANTES),
+                self.azar.choice(PRESENTACIONES), i + 1
+            )
+            filas.append((nombre, self.azar.choice(categorias), compra, venta,
+                          self.azar.randint(1000, 100000), self.azar.randint(5, 20),
+                          ean13(primero + i)))
+        
+        sql = """
+            INSERT INTO productos (nombre, categoria_id, precio_compra, precio_venta, stock, stock_minimo, codigo_barras)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
+        """
+        insertados = self._insertar_por_lotes(sql, filas)
+        print(f"✓ Productos generados: {insertados}")
+        return insertados
+    
+    def generar_ventas(self, dias, ventas_por_dia=(80, 200), lineas_por_venta=(1, 6), hasta=None):
+        """
+        Inserta ventas sintéticas de los últimos días y reconstruye los resúmenes
+        
+        No descuenta stock: es historial simulado.
+        
+        Args:
+            dias: Cantidad de días hacia atrás a generar
+            ventas_por_dia: Rango (mínimo, máximo) de ventas diarias
+            lineas_por_venta: Rango (mínimo, máximo) de productos por venta
+            hasta: Último día generado (hoy por omisión)
+        
+        Returns:
+            Cantidad de ventas insertadas
+        """
+        productos = self.bd.ejecutar_consulta(
+            "SELECT id, precio_venta FROM productos WHERE activo = TRUE"
+        )
+        if not productos:
+            print("✗ No hay productos para generar ventas")
+            return 0
+        
+        resultado = self.bd.ejecutar_consulta("SELECT COALESCE(MAX(id), 0) as ultimo FROM ventas")
+        if resultado is None:
+            return 0
+        siguiente_id = resultado[0]['ultimo'] + 1
+        
+        hasta = hasta or date.today()
+        ventas, detalles, total_ventas = [], [], 0
+        for desplazamiento in range(dias - 1, -1, -1):
+            fecha = hasta - timedelta(days=desplazamiento)
+            for _ in range(self.azar.randint(*ventas_por_dia)):
+                total = Decimal('0')
+                for prod in self.azar.sample(productos, self.azar.randint(*lineas_por_venta)):
+                    cantidad = self.azar.randint(1, 5)
+                    subtotal = prod['precio_venta'] * cantidad
+                    detalles.append((siguiente_id, prod['id'], cantidad, prod['precio_venta'], subtotal))
+                    total += subtotal
+                ventas.append((siguiente_id, fecha, self._hora(), total, self._metodo_pago()))
+                siguiente_id += 1
+            
+            if len(ventas) >= TAMAÑO_LOTE:
+                if not self._insertar_ventas(ventas, detalles):
+                    return total_ventas
+                total_ventas += len(ventas)
+                ventas, detalles = [], []
+        
+        if ventas and self._insertar_ventas(ventas, detalles):
+            total_ventas += len(ventas)
+        
+        print(f"✓ Ventas generadas: {total_ventas}")
+        reconstruir_resumenes(self.bd)
+        return total_ventas
+    
+    def _asegurar_categorias(self):
+        """IDs de las categorías, creándolas si la tabla está vacía"""
+        categorias = self.bd.ejecutar_consulta("SELECT id FROM categorias")
+        if not categorias:
+            self._insertar_por_lotes(
+                "INSERT INTO categorias (nombre) VALUES (%s)",
+                [(nombre,) for nombre in CATEGORIAS]
+            )
+            categorias = self.bd.ejecutar_consulta("SELECT id FROM categorias") or []
+        return [c['id'] for c in categorias]
+    
+    def _insertar_ventas(self, ventas, detalles):
+        """Inserta un lote de encabezados y detalles en una transacción"""
+        try:
+            with self.bd.obtener_conexion() as conexion:
+                cursor = conexion.cursor()
+                try:
+                    cursor.executemany(
+                        "INSERT INTO ventas (id, fecha, hora, total, metodo_pago) VALUES (%s, %s, %s, %s, %s)",
+                        ventas
+                    )
+                    cursor.executemany(
+                        """
+                        INSERT INTO detalle_ventas (venta_id, producto_id, cantidad, precio_unitario, subtotal)
+                        VALUES (%s, %s, %s, %s, %s)
+                        """,
+                        detalles
+                    )
+                    conexion.commit()
+                finally:
+                    cursor.close()
+            return True
+        except Error as e:
+            print(f"✗ Error al insertar ventas: {e}")
+            return False
+    
+    def _insertar_por_lotes(self, sql, filas):
+        """Inserta filas con INSERT de varias filas, un commit por lote"""
+        insertados = 0
+        try:
+            with self.bd.obtener_conexion() as conexion:
+                cursor = conexion.cursor()
+                try:
+                    for inicio in range(0, len(filas), TAMAÑO_LOTE):
+                        lote = filas[inicio:inicio + TAMAÑO_LOTE]
+                        cursor.executemany(sql, lote)
+                        conexion.commit()
+                        insertados += len(lote)
+                finally:
+                    cursor.close()
+        except Error as e:
+            print(f"✗ Error al insertar: {e}")
+        return insertados
+    
+    def _hora(self):
+        """Hora aleatoria con la distribución de un día típico"""
+        rnd = self.azar.random()
+        inicio = next(h for limite, h in FRANJAS_HORA if rnd < limite)
+        segundos = inicio * 3600 + self.azar.randrange(6 * 3600)
+        return f"{segundos // 3600:02d}:{segundos // 60 % 60:02d}:{segundos % 60:02d}"
+    
+    def _metodo_pago(self):
+        """Método de pago con la distribución típica"""
+        rnd = self.azar.random()
+        return next(m for limite, m in METODOS_PAGO if rnd < limite)
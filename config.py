@@ -5,3 +5,32 @@ HOST = 'localhost'
 USUARIO = 'root'
 CONTRASEÑA = ''  # Cambia aquí tu contraseña MySQL
 BASE_DATOS = 'mini_super_botargas'
+
+# Motor de base de datos: 'mysql' (servidor) o 'sqlite' (archivo local,
+# sin servidor; el esquema y los datos iniciales se crean solos)
+MOTOR = 'mysql'
+RUTA_SQLITE = 'mini_super_botargas.db'
+
+# Reservas de stock al agregar al carrito (varias cajas a la vez)
+RESERVAR_EN_CARRITO = False
+DURACION_RESERVA_MINUTOS = 15
+
+# Caja con lector de código de barras: Enter en la búsqueda agrega el
+# producto del código leído; volver a leerlo suma una unidad a su línea
+MODO_ESCANER = True
+
+# Diario local de ventas: si la base de datos no responde la caja cobra
+# contra un archivo local y un hilo sincroniza las ventas al volver la
+# conexión. Esas ventas no validan el stock contra otras cajas (pueden
+# dejarlo negativo; la caja avisa), por eso viene apagado
+DIARIO_VENTAS = False
+RUTA_DIARIO = 'diario_ventas.jsonl'
+RUTA_COPIA_CATALOGO = 'catalogo_local.pickle'
+
+# Capa de datos: sentencias preparadas en MySQL, estadísticas por consulta
+# (se guardan al cerrar; ver con python -m database.instrumentacion) y
+# mensajes "✓ Registro insertado..." en consola (False = solo errores)
+SENTENCIAS_PREPARADAS = True
+INSTRUMENTAR_CONSULTAS = True
+RUTA_ESTADISTICAS = 'estadisticas_consultas.json'
+MENSAJES_DETALLADOS = True
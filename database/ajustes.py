@@ -0,0 +1,410 @@
+"""
+Ajustes masivos de productos con vista previa y bitácora para deshacer
+
+Una regla elige los productos y el valor nuevo de una columna:
+
+- PorcentajePrecio: sube o baja el precio de venta de una categoría (o de
+  todas) en un porcentaje, redondeando al centavo como Dinero.porcentaje.
+- StockPorConteo: pone el stock de una hoja de conteo físico (CSV o XLSX
+  con id o código de barras y la columna stock/conteo).
+- DesactivarVencidos: desactiva los productos ya vencidos.
+
+Aplicar un ajuste es una sola transacción: se anotan en
+ajustes_productos_detalle el valor anterior y el nuevo de cada producto
+(INSERT ... SELECT) y un solo UPDATE toma los valores nuevos de ahí. Para
+deshacerlo, otro UPDATE regresa los anteriores, pero solo en los productos
+que siguen con el valor que dejó el ajuste: lo que se vendió o se cambió
+después no se pisa.
+"""
+
+import logging
+import os
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+
+from database.dinero import a_centavos, formato
+from database.importacion import CONVERSIONES, leer_columnas
+from database.motores import Error
+
+# Mensajes ✓/✗; ver instrumentacion.configurar_mensajes
+registro = logging.getLogger(__name__)
+
+
+# Columnas de productos que puede tocar un ajuste
+CAMPOS = ('precio_venta', 'stock', 'activo')
+
+# {seleccion}: subconsulta con id, nombre, anterior, nuevo y lo que use {aplicable}
+SQL_VISTA_PREVIA = """
+    SELECT id, nombre, anterior, nuevo, CASE WHEN {aplicable} THEN 1 ELSE 0 END as aplicable
+    FROM ({seleccion}) t
+    WHERE nuevo <> anterior
+    ORDER BY nombre
+"""
+
+SQL_ANOTAR = """
+    INSERT INTO ajustes_productos_detalle (ajuste_id, producto_id, valor_anterior, valor_nuevo)
+    SELECT %s, id, anterior, nuevo
+    FROM ({seleccion}) t
+    WHERE nuevo <> anterior AND {aplicable}
+"""
+
+SQL_APLICAR = """
+    UPDATE productos
+    SET {campo} = (
+        SELECT d.valor_nuevo FROM ajustes_productos_detalle d
+        WHERE d.ajuste_id = %s AND d.producto_id = productos.id
+    )
+    WHERE id IN (SELECT d.producto_id FROM ajustes_productos_detalle d WHERE d.ajuste_id = %s)
+"""
+
+SQL_DESHACER = """
+    UPDATE productos
+    SET {campo} = (
+        SELECT d.valor_anterior FROM ajustes_productos_detalle d
+        WHERE d.ajuste_id = %s AND d.producto_id = productos.id
+    )
+    WHERE id IN (
+        SELECT d.producto_id FROM ajustes_productos_detalle d
+        WHERE d.ajuste_id = %s AND d.valor_nuevo = productos.{campo}
+    )
+"""
+
+
+def mostrar(campo, valor):
+    """Valor de la columna ajustada como texto"""
+    if campo == 'precio_venta':
+        return formato(a_centavos(valor))
+    if campo == 'activo':
+        return "sí" if int(valor) else "no"
+    return str(int(valor))
+
+
+class VistaPrevia:
+    """Productos que cambiaría un ajuste, sin haber escrito nada"""
+    
+    def __init__(self, regla, filas, errores=()):
+        """
+        Args:
+            regla: Regla evaluada
+            filas: Diccionarios con id, nombre, anterior, nuevo y aplicable
+            errores: Diccionarios con fila y detalle (filas de la hoja que no se usan)
+        """
+        self.regla = regla
+        self.filas = filas
+        self.errores = list(errores)
+    
+    @property
+    def aplicables(self):
+        """Cantidad de productos que cambiarían al aplicar"""
+        return sum(1 for fila in self.filas if fila['aplicable'])
+    
+    def resumen(self):
+        texto = f"{self.regla.descripcion}: {self.aplicables} productos cambian"
+        omitidos = len(self.filas) - self.aplicables
+        if omitidos:
+            texto += f", {omitidos} se omiten ({self.regla.motivo_omision})"
+        if self.errores:
+            texto += f", {len(self.errores)} filas con error"
+        return texto
+
+
+class ReglaSQL:
+    """Regla cuyo valor nuevo se calcula en la misma consulta"""
+    
+    campo = None
+    aplicable = "1 = 1"         # Condición sobre las columnas de la selección
+    motivo_omision = ""
+    descripcion = ""
+    
+    def preparar(self, bd):
+        """Nada que leer antes: todo se calcula en SQL"""
+        return True
+    
+    def seleccion(self, dialecto):
+        """
+        Subconsulta de los productos afectados
+        
+        Returns:
+            (sql con id, nombre, anterior y nuevo; parámetros)
+        """
+        raise NotImplementedError
+    
+    def vista_previa(self, bd):
+        """VistaPrevia o None si falló la consulta"""
+        sql, parametros = self.seleccion(bd.dialecto)
+        filas = bd.ejecutar_consulta(
+            SQL_VISTA_PREVIA.format(seleccion=sql, aplicable=self.aplicable), parametros
+        )
+        return None if filas is None else VistaPrevia(self, filas)
+    
+    def anotar(self, cursor, ajuste_id, dialecto):
+        """Escribe el detalle del ajuste (valor anterior y nuevo por producto)"""
+        sql, parametros = self.seleccion(dialecto)
+        cursor.execute(
+            SQL_ANOTAR.format(seleccion=sql, aplicable=self.aplicable),
+            (ajuste_id,) + parametros
+        )
+
+
+class PorcentajePrecio(ReglaSQL):
+    """Precio de venta de los productos activos de una categoría por un porcentaje"""
+    
+    campo = 'precio_venta'
+    aplicable = "nuevo > precio_compra"
+    motivo_omision = "quedarían en o por debajo del precio de compra"
+    
+    def __init__(self, porcentaje, categoria_id=None, categoria=None):
+        """
+        Args:
+            porcentaje: Texto o número con hasta dos decimales ('5' sube 5%, '-10' baja 10%)
+            categoria_id: Categoría a ajustar (None para todas)
+            categoria: Nombre de la categoría para la descripción
+        
+        Raises:
+            ValueError: Si el porcentaje no es válido
+        """
+        try:
+            centesimos = Decimal(str(porcentaje).strip().rstrip('%')) * 100
+        except InvalidOperation:
+            raise ValueError(f"Porcentaje inválido: {porcentaje!r}") from None
+        if centesimos != centesimos.to_integral_value() or not -10000 < centesimos <= 100000:
+            raise ValueError(f"Porcentaje inválido: {porcentaje!r}")
+        
+        # 10000 = 100%: el factor viaja como entero y se redondea en SQL
+        self.factor = 10000 + int(centesimos)
+        self.categoria_id = categoria_id
+        self.descripcion = f"Precio de {categoria or 'todas las categorías'} {centesimos / 100:+}%"
+    
+    def seleccion(self, dialecto):
+        sql = f"""
+            SELECT id, nombre, precio_venta as anterior, {dialecto.porcentaje('precio_venta')} as nuevo, precio_compra
+            FROM productos
+            WHERE activo = TRUE
+        """
+        parametros = (self.factor,)
+        if self.categoria_id is not None:
+            sql += " AND categoria_id = %s"
+            parametros += (self.categoria_id,)
+        return sql, parametros
+
+
+class DesactivarVencidos(ReglaSQL):
+    """Productos activos con fecha de vencimiento anterior a una fecha"""
+    
+    campo = 'activo'
+    
+    def __init__(self, fecha=None):
+        """
+        Args:
+            fecha: date; se desactiva lo que vence antes de ella (hoy por omisión)
+        """
+        self.fecha = fecha or date.today()
+        self.descripcion = f"Desactivar vencidos antes del {self.fecha.isoformat()}"
+    
+    def seleccion(self, dialecto):
+        sql = """
+            SELECT id, nombre, activo as anterior, 0 as nuevo
+            FROM productos
+            WHERE activo = TRUE AND fecha_vencimiento < %s
+        """
+        return sql, (self.fecha,)
+
+
+class StockPorConteo:
+    """
+    Stock de cada producto según una hoja de conteo físico
+    
+    Un producto que aparece en varias filas (contado en varios anaqueles)
+    suma sus cantidades. Conviene contar con los carritos vacíos: las
+    unidades reservadas ya están descontadas del stock.
+    """
+    
+    campo = 'stock'
+    motivo_omision = ""
+    
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self.descripcion = f"Stock desde el conteo {os.path.basename(ruta)}"
+        self.conteos = None         # producto_id -> unidades contadas
+        self.errores = []
+    
+    def preparar(self, bd):
+        """
+        Lee la hoja (una sola vez) y resuelve cada fila a un producto por ID o código de barras
+        
+        Returns:
+            False si no se pudieron leer los productos
+        
+        Raises:
+            ValueError, OSError: Si el archivo no se puede leer
+        """
+        if self.conteos is not None:
+            return True
+        productos = bd.ejecutar_consulta("SELECT id, codigo_barras FROM productos", filas='tupla')
+        if productos is None:
+            return False
+        ids = {producto_id for producto_id, _ in productos}
+        por_codigo = {codigo: producto_id for producto_id, codigo in productos if codigo}
+        
+        conteos = {}
+        errores = []
+        for numero, celdas in leer_columnas(self.ruta):
+            try:
+                if 'stock' not in celdas:
+                    raise ValueError("sin cantidad contada")
+                unidades = CONVERSIONES['stock'](celdas['stock'])
+                if unidades < 0:
+                    raise ValueError("cantidad negativa")
+                if 'id' in celdas:
+                    producto_id = CONVERSIONES['id'](celdas['id'])
+                    if producto_id not in ids:
+                        raise ValueError(f"no existe el producto con ID {producto_id}")
+                elif 'codigo_barras' in celdas:
+                    codigo = CONVERSIONES['codigo_barras'](celdas['codigo_barras'])
+                    producto_id = por_codigo.get(codigo)
+                    if producto_id is None:
+                        raise ValueError(f"no existe el código {codigo}")
+                else:
+                    raise ValueError("sin ID ni código de barras")
+            except ValueError as e:
+                errores.append({'fila': numero, 'detalle': str(e)})
+                continue
+            conteos[producto_id] = conteos.get(producto_id, 0) + unidades
+        
+        self.conteos = conteos
+        self.errores = errores
+        return True
+    
+    def vista_previa(self, bd):
+        """VistaPrevia o None si falló la consulta"""
+        if not self.preparar(bd):
+            return None
+        productos = bd.ejecutar_consulta("SELECT id, nombre, stock FROM productos", filas='tupla')
+        if productos is None:
+            return None
+        filas = [
+            {'id': producto_id, 'nombre': nombre, 'anterior': stock,
+             'nuevo': self.conteos[producto_id], 'aplicable': 1}
+            for producto_id, nombre, stock in productos
+            if producto_id in self.conteos and self.conteos[producto_id] != stock
+        ]
+        filas.sort(key=lambda fila: fila['nombre'])
+        return VistaPrevia(self, filas, self.errores)
+    
+    def anotar(self, cursor, ajuste_id, dialecto):
+        """Escribe el conteo y toma el stock anterior dentro de la transacción"""
+        cursor.executemany(
+            "INSERT INTO ajustes_productos_detalle (ajuste_id, producto_id, valor_nuevo) VALUES (%s, %s, %s)",
+            [(ajuste_id, producto_id, unidades) for producto_id, unidades in self.conteos.items()]
+        )
+        cursor.execute(
+            """
+            UPDATE ajustes_productos_detalle
+            SET valor_anterior = (SELECT p.stock FROM productos p WHERE p.id = ajustes_productos_detalle.producto_id)
+            WHERE ajuste_id = %s
+            """,
+            (ajuste_id,)
+        )
+        cursor.execute(
+            "DELETE FROM ajustes_productos_detalle WHERE ajuste_id = %s AND valor_anterior = valor_nuevo",
+            (ajuste_id,)
+        )
+
+
+class AjustesProductos:
+    """Aplica reglas en una transacción y las deshace desde la bitácora"""
+    
+    def __init__(self, bd):
+        self.bd = bd
+    
+    def aplicar(self, regla):
+        """
+        Aplica la regla a todos sus productos a la vez
+        
+        Returns:
+            (ajuste_id, productos modificados) o None si hubo un error
+        """
+        if regla.campo not in CAMPOS:
+            raise ValueError(f"Campo no ajustable: {regla.campo}")
+        if not regla.preparar(self.bd):
+            return None
+        
+        try:
+            with self.bd.obtener_conexion() as conexion:
+                cursor = conexion.cursor()
+                try:
+                    dialecto = self.bd.dialecto
+                    dialecto.iniciar_escritura(cursor)
+                    cursor.execute(
+                        "INSERT INTO ajustes_productos (descripcion, campo) VALUES (%s, %s)",
+                        (regla.descripcion, regla.campo)
+                    )
+                    ajuste_id = cursor.lastrowid
+                    regla.anotar(cursor, ajuste_id, dialecto)
+                    cursor.execute(SQL_APLICAR.format(campo=regla.campo), (ajuste_id, ajuste_id))
+                    modificados = cursor.rowcount
+                    cursor.execute(
+                        "UPDATE ajustes_productos SET productos = %s WHERE id = %s",
+                        (modificados, ajuste_id)
+                    )
+                    conexion.commit()
+                finally:
+                    cursor.close()
+            return ajuste_id, modificados
+        except Error as e:
+            registro.error("✗ Error al aplicar el ajuste: %s", e)
+            return None
+    
+    def deshacer(self, ajuste_id):
+        """
+        Regresa los productos del ajuste a su valor anterior
+        
+        Solo se revierten los productos que siguen con el valor que dejó el
+        ajuste; los que se vendieron o cambiaron después se dejan como están.
+        
+        Returns:
+            (productos revertidos, productos del ajuste) o None si no se pudo
+        """
+        try:
+            with self.bd.obtener_conexion() as conexion:
+                cursor = conexion.cursor()
+                try:
+                    dialecto = self.bd.dialecto
+                    dialecto.iniciar_escritura(cursor)
+                    cursor.execute(
+                        "SELECT campo, productos, fecha_reversion FROM ajustes_productos "
+                        f"WHERE id = %s{dialecto.para_actualizar}",
+                        (ajuste_id,)
+                    )
+                    ajuste = cursor.fetchall()
+                    if not ajuste or ajuste[0][2] is not None or ajuste[0][0] not in CAMPOS:
+                        conexion.rollback()
+                        registro.warning("✗ El ajuste %s no existe o ya se deshizo", ajuste_id)
+                        return None
+                    
+                    campo, total, _ = ajuste[0]
+                    cursor.execute(SQL_DESHACER.format(campo=campo), (ajuste_id, ajuste_id))
+                    revertidos = cursor.rowcount
+                    cursor.execute(
+                        "UPDATE ajustes_productos SET fecha_reversion = %s WHERE id = %s",
+                        (datetime.now(), ajuste_id)
+                    )
+                    conexion.commit()
+                finally:
+                    cursor.close()
+            return revertidos, total
+        except Error as e:
+            registro.error("✗ Error al deshacer el ajuste: %s", e)
+            return None
+    
+    def historial(self, limite=50):
+        """Ajustes más recientes primero (lista de diccionarios o None)"""
+        return self.bd.ejecutar_consulta(
+            """
+            SELECT id, fecha, descripcion, campo, productos, fecha_reversion
+            FROM ajustes_productos
+            ORDER BY id DESC
+            LIMIT %s
+            """,
+            (limite,)
+        )
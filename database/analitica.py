@@ -0,0 +1,241 @@
+"""
+Análisis columnar de las ventas para las gráficas
+
+Las líneas de venta (detalle_ventas unido con ventas y productos) se leen
+una sola vez a una tabla de columnas compactas: ids enteros, cantidades
+int32, importes en centavos int64 y el método de pago como categoría.
+Después solo se leen las líneas con id mayor al último cargado, así que
+pasar de una gráfica a otra no vuelve a consultar el historial.
+
+Las agregaciones (por hora, día, producto y categoría) son groupby de
+pandas sobre esa tabla. La categoría de cada línea es la que tenía el
+producto al cargarla, igual que en resumen_categorias_dia.
+"""
+
+import threading
+from itertools import islice
+
+import numpy as np
+import pandas as pd
+
+
+SQL_HECHOS = """
+    SELECT
+        dv.id,
+        dv.venta_id,
+        v.fecha,
+        {hora} as hora,
+        v.metodo_pago,
+        dv.producto_id,
+        p.categoria_id,
+        dv.cantidad,
+        {centavos} as centavos
+    FROM detalle_ventas dv
+    JOIN ventas v ON dv.venta_id = v.id
+    JOIN productos p ON dv.producto_id = p.id
+    WHERE dv.id > %s
+    ORDER BY dv.id
+"""
+
+SQL_VERSION_DIMENSIONES = """
+    SELECT
+        (SELECT COUNT(*) FROM productos) as productos,
+        (SELECT MAX(fecha_modificacion) FROM productos) as fecha,
+        (SELECT COUNT(*) FROM categorias) as categorias
+"""
+
+# Tipo de cada columna de la tabla de hechos, en el orden de SQL_HECHOS
+COLUMNAS = {
+    'id': 'int64',
+    'venta_id': 'int32',
+    'fecha': 'datetime64[ns]',
+    'hora': 'int8',
+    'metodo_pago': 'category',
+    'producto_id': 'int32',
+    'categoria_id': 'int16',
+    'cantidad': 'int32',
+    'centavos': 'int64',
+}
+
+TAMAÑO_LOTE = 5000
+
+# Una transacción larga puede confirmar una línea con id menor al último
+# leído; se vuelven a pedir estos ids y se descartan los ya cargados.
+MARGEN_IDS = 500
+
+
+def _tabla(filas):
+    """Tabla de hechos con sus tipos compactos a partir de tuplas"""
+    tabla = pd.DataFrame.from_records(filas, columns=list(COLUMNAS))
+    tabla['fecha'] = pd.to_datetime(tabla['fecha'])
+    return tabla.astype(COLUMNAS)
+
+
+class AnaliticaVentas:
+    """Tabla de líneas de venta en memoria con agregaciones vectorizadas"""
+    
+    def __init__(self, bd):
+        self.bd = bd
+        self.hechos = _tabla([])
+        self.productos = pd.DataFrame(columns=['nombre', 'categoria_id', 'activo'])
+        self.categorias = pd.Series(dtype=object)
+        self._version = None
+        self._candado = threading.Lock()
+    
+    @property
+    def ultimo_id(self):
+        """Id de la última línea de venta cargada (0 si no hay)"""
+        return int(self.hechos['id'].iat[-1]) if len(self.hechos) else 0
+    
+    def actualizar(self):
+        """
+        Lee las líneas de venta nuevas y, si cambiaron, productos y categorías
+        
+        La primera llamada carga todo el historial; las siguientes solo lo
+        que se vendió después.
+        
+        Returns:
+            Cantidad de líneas agregadas
+        
+        Raises:
+            Error: Si la lectura de las líneas falla a medio camino
+        """
+        with self._candado:
+            self._actualizar_dimensiones()
+            
+            hechos = self.hechos
+            desde = max(self.ultimo_id - MARGEN_IDS, 0) if len(hechos) else 0
+            sql = SQL_HECHOS.format(
+                hora=self.bd.dialecto.hora('v.hora'),
+                centavos=self.bd.dialecto.entero('ROUND(dv.subtotal * 100)')
+            )
+            filas = self.bd.iterar_consulta(sql, (desde,), tamaño_lote=TAMAÑO_LOTE, filas='tupla')
+            
+            lotes = []
+            while True:
+                lote = list(islice(filas, TAMAÑO_LOTE))
+                if not lote:
+                    break
+                lotes.append(_tabla(lote))
+            if not lotes:
+                return 0
+            
+            nuevos = pd.concat(lotes, ignore_index=True)
+            if desde:
+                nuevos = nuevos[~np.isin(nuevos['id'].to_numpy(), hechos['id'].to_numpy()[-MARGEN_IDS * 2:])]
+                if nuevos.empty:
+                    return 0
+            
+            combinados = pd.concat([hechos, nuevos], ignore_index=True)
+            # Las categorías distintas en cada parte dejan la columna como object
+            combinados['metodo_pago'] = combinados['metodo_pago'].astype('category')
+            if desde:
+                combinados = combinados.sort_values('id', ignore_index=True)
+            # Se reemplaza de una vez: las agregaciones en curso siguen con la tabla anterior
+            self.hechos = combinados
+            return len(nuevos)
+    
+    def _actualizar_dimensiones(self):
+        """Vuelve a leer productos y categorías solo si cambiaron"""
+        resultado = self.bd.ejecutar_consulta(SQL_VERSION_DIMENSIONES, filas='tupla')
+        if not resultado or tuple(resultado[0]) == self._version:
+            return
+        
+        productos = self.bd.ejecutar_consulta(
+            "SELECT id, nombre, categoria_id, activo FROM productos", filas='tupla'
+        )
+        categorias = self.bd.ejecutar_consulta("SELECT id, nombre FROM categorias", filas='tupla')
+        if productos is None or categorias is None:
+            return
+        
+        self.productos = pd.DataFrame.from_records(
+            productos, columns=['id', 'nombre', 'categoria_id', 'activo']
+        ).set_index('id').astype({'categoria_id': 'int16', 'activo': 'bool'})
+        self.categorias = pd.Series(
+            [nombre for _, nombre in categorias],
+            index=pd.Index([id_ for id_, _ in categorias], dtype='int16'),
+            name='nombre'
+        )
+        self._version = tuple(resultado[0])
+    
+    def _del_periodo(self, rango):
+        """Líneas del rango (todas si rango es None)"""
+        hechos = self.hechos
+        if rango is None:
+            return hechos
+        fechas = hechos['fecha']
+        return hechos[(fechas >= pd.Timestamp(rango.inicio)) & (fechas < pd.Timestamp(rango.fin))]
+    
+    def ventas_por_hora(self, rango):
+        """
+        Cantidad y total de ventas agrupados por hora del día
+        
+        Returns:
+            DataFrame con columnas hora, cantidad y total, ordenado por hora
+        """
+        grupos = self._del_periodo(rango).groupby('hora')
+        return pd.DataFrame({
+            'cantidad': grupos['venta_id'].nunique(),
+            'total': grupos['centavos'].sum() / 100,
+        }).reset_index()
+    
+    def tendencia_diaria(self, rango):
+        """
+        Cantidad de ventas e ingresos por día
+        
+        Returns:
+            DataFrame con columnas fecha, cantidad_ventas y total_ingresos
+        """
+        grupos = self._del_periodo(rango).groupby('fecha')
+        return pd.DataFrame({
+            'cantidad_ventas': grupos['venta_id'].nunique(),
+            'total_ingresos': grupos['centavos'].sum() / 100,
+        }).reset_index()
+    
+    def productos_mas_vendidos(self, rango=None, limite=20):
+        """
+        Productos activos con más unidades vendidas
+        
+        Returns:
+            DataFrame con columnas id, nombre, total_vendido e ingresos
+        """
+        sumas = self._del_periodo(rango).groupby('producto_id')[['cantidad', 'centavos']].sum()
+        productos = self.productos
+        activos = productos.index[productos['activo']]
+        sumas = sumas[sumas.index.isin(activos)].nlargest(limite, 'cantidad')
+        return pd.DataFrame({
+            'id': sumas.index,
+            'nombre': productos['nombre'].reindex(sumas.index).to_numpy(),
+            'total_vendido': sumas['cantidad'].to_numpy(),
+            'ingresos': (sumas['centavos'] / 100).to_numpy(),
+        })
+    
+    def tendencia_producto(self, producto_id, rango):
+        """
+        Unidades e ingresos diarios de un producto
+        
+        Returns:
+            DataFrame con columnas fecha, cantidad e ingresos
+        """
+        hechos = self._del_periodo(rango)
+        sumas = hechos[hechos['producto_id'] == producto_id].groupby('fecha')[['cantidad', 'centavos']].sum()
+        return pd.DataFrame({
+            'cantidad': sumas['cantidad'],
+            'ingresos': sumas['centavos'] / 100,
+        }).reset_index()
+    
+    def ingresos_por_categoria(self, rango=None):
+        """
+        Unidades e ingresos por categoría (todo el historial si no hay rango)
+        
+        Returns:
+            DataFrame con columnas nombre, total_cantidad y total_ingresos,
+            de mayor a menor ingreso
+        """
+        sumas = self._del_periodo(rango).groupby('categoria_id')[['cantidad', 'centavos']].sum()
+        sumas = sumas.sort_values('centavos', ascending=False)
+        return pd.DataFrame({
+            'nombre': self.categorias.reindex(sumas.index).to_numpy(),
+            'total_cantidad': sumas['cantidad'].to_numpy(),
+            'total_ingresos': (sumas['centavos'] / 100).to_numpy(),
+        })
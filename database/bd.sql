@@ -29,11 +29,15 @@ CREATE TABLE IF NOT EXISTS productos (
     stock_minimo INT DEFAULT 5,
     fecha_vencimiento DATE,
     activo BOOLEAN DEFAULT TRUE,
+    codigo_barras VARCHAR(32) NULL,
     fecha_creacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    fecha_modificacion TIMESTAMP(6) DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
     FOREIGN KEY (categoria_id) REFERENCES categorias(id),
+    UNIQUE KEY uk_codigo_barras (codigo_barras),
     INDEX idx_nombre (nombre),
     INDEX idx_categoria (categoria_id),
-    INDEX idx_stock (stock)
+    INDEX idx_stock (stock),
+    INDEX idx_modificacion (fecha_modificacion)
 );
 
 -- =====================================================
@@ -46,9 +50,12 @@ CREATE TABLE IF NOT EXISTS ventas (
     total DECIMAL(10,2) NOT NULL,
     metodo_pago VARCHAR(50) DEFAULT 'Efectivo',
     estado VARCHAR(20) DEFAULT 'Completada',
+    id_cliente CHAR(32) NULL,
     fecha_registro TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE KEY uk_id_cliente (id_cliente),
     INDEX idx_fecha (fecha),
-    INDEX idx_hora (hora)
+    INDEX idx_hora (hora),
+    INDEX idx_fecha_cubriente (fecha, hora, total, metodo_pago)
 );
 
 -- =====================================================
@@ -64,7 +71,81 @@ CREATE TABLE IF NOT EXISTS detalle_ventas (
     FOREIGN KEY (venta_id) REFERENCES ventas(id),
     FOREIGN KEY (producto_id) REFERENCES productos(id),
     INDEX idx_venta (venta_id),
-    INDEX idx_producto (producto_id)
+    INDEX idx_producto (producto_id),
+    INDEX idx_producto_cubriente (producto_id, venta_id, cantidad, subtotal)
+);
+
+-- =====================================================
+-- TABLA: RESERVAS_STOCK
+-- Unidades apartadas por un carrito abierto. El stock ya
+-- se descontó; si la reserva expira se repone.
+-- =====================================================
+CREATE TABLE IF NOT EXISTS reservas_stock (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    producto_id INT NOT NULL,
+    cantidad INT NOT NULL,
+    caja VARCHAR(50) NOT NULL,
+    expira DATETIME NOT NULL,
+    fecha_creacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (producto_id) REFERENCES productos(id),
+    INDEX idx_caja (caja),
+    INDEX idx_expira (expira)
+);
+
+-- =====================================================
+-- TABLAS DE RESUMEN (ROLLUPS) PARA REPORTES Y GRÁFICAS
+-- Se acumulan en la transacción de cada venta; para
+-- recalcularlas: python -m database.resumenes
+-- =====================================================
+CREATE TABLE IF NOT EXISTS resumen_ventas_hora (
+    fecha DATE NOT NULL,
+    hora TINYINT NOT NULL,
+    metodo_pago VARCHAR(50) NOT NULL,
+    cantidad_ventas INT NOT NULL DEFAULT 0,
+    total DECIMAL(12,2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (fecha, hora, metodo_pago)
+);
+
+CREATE TABLE IF NOT EXISTS resumen_productos_dia (
+    fecha DATE NOT NULL,
+    producto_id INT NOT NULL,
+    unidades INT NOT NULL DEFAULT 0,
+    ingresos DECIMAL(12,2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (fecha, producto_id),
+    INDEX idx_resumen_producto (producto_id, fecha)
+);
+
+CREATE TABLE IF NOT EXISTS resumen_categorias_dia (
+    fecha DATE NOT NULL,
+    categoria_id INT NOT NULL,
+    unidades INT NOT NULL DEFAULT 0,
+    ingresos DECIMAL(12,2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (fecha, categoria_id)
+);
+
+-- =====================================================
+-- TABLAS: AJUSTES MASIVOS DE PRODUCTOS
+-- Cada ajuste (precios por porcentaje, stock por conteo,
+-- desactivar vencidos) guarda el valor anterior y el nuevo
+-- de cada producto para poder deshacerlo.
+-- =====================================================
+CREATE TABLE IF NOT EXISTS ajustes_productos (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    descripcion VARCHAR(255) NOT NULL,
+    campo VARCHAR(30) NOT NULL,
+    productos INT NOT NULL DEFAULT 0,
+    fecha TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    fecha_reversion DATETIME NULL
+);
+
+CREATE TABLE IF NOT EXISTS ajustes_productos_detalle (
+    ajuste_id INT NOT NULL,
+    producto_id INT NOT NULL,
+    valor_anterior DECIMAL(12,2),
+    valor_nuevo DECIMAL(12,2) NOT NULL,
+    PRIMARY KEY (ajuste_id, producto_id),
+    FOREIGN KEY (ajuste_id) REFERENCES ajustes_productos(id),
+    FOREIGN KEY (producto_id) REFERENCES productos(id)
 );
 
 -- =====================================================
@@ -465,6 +546,29 @@ DELIMITER ;
 -- Ejecutar el procedimiento principal
 CALL generar_ventas_mes();
 
+-- Las ventas simuladas no pasan por la caja: calcular los resúmenes
+DELETE FROM resumen_ventas_hora;
+DELETE FROM resumen_productos_dia;
+DELETE FROM resumen_categorias_dia;
+
+INSERT INTO resumen_ventas_hora (fecha, hora, metodo_pago, cantidad_ventas, total)
+SELECT fecha, HOUR(hora), metodo_pago, COUNT(*), SUM(total)
+FROM ventas
+GROUP BY fecha, HOUR(hora), metodo_pago;
+
+INSERT INTO resumen_productos_dia (fecha, producto_id, unidades, ingresos)
+SELECT v.fecha, dv.producto_id, SUM(dv.cantidad), SUM(dv.subtotal)
+FROM detalle_ventas dv
+JOIN ventas v ON dv.venta_id = v.id
+GROUP BY v.fecha, dv.producto_id;
+
+INSERT INTO resumen_categorias_dia (fecha, categoria_id, unidades, ingresos)
+SELECT v.fecha, p.categoria_id, SUM(dv.cantidad), SUM(dv.subtotal)
+FROM detalle_ventas dv
+JOIN ventas v ON dv.venta_id = v.id
+JOIN productos p ON dv.producto_id = p.id
+GROUP BY v.fecha, p.categoria_id;
+
 -- =====================================================
 -- CONSULTAS DE VERIFICACIÓN
 -- =====================================================
@@ -0,0 +1,147 @@
+-- =====================================================
+-- MINI SUPER LAS BOTARGAS - ESQUEMA SQLITE
+-- Equivalente a las tablas de bd.sql para el motor local.
+-- No se ejecuta a mano: database/esquema.py lo aplica la
+-- primera vez y después carga los datos iniciales de bd.sql.
+-- =====================================================
+
+-- =====================================================
+-- TABLA: CATEGORIAS
+-- =====================================================
+CREATE TABLE IF NOT EXISTS categorias (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    nombre VARCHAR(100) NOT NULL UNIQUE,
+    descripcion VARCHAR(255),
+    fecha_creacion TIMESTAMP DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime'))
+);
+
+-- =====================================================
+-- TABLA: PRODUCTOS
+-- =====================================================
+CREATE TABLE IF NOT EXISTS productos (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    nombre VARCHAR(150) NOT NULL,
+    categoria_id INT NOT NULL REFERENCES categorias(id),
+    precio_compra DECIMAL(10,2) NOT NULL,
+    precio_venta DECIMAL(10,2) NOT NULL,
+    stock INT NOT NULL DEFAULT 0,
+    stock_minimo INT DEFAULT 5,
+    fecha_vencimiento DATE,
+    activo BOOLEAN DEFAULT TRUE,
+    codigo_barras VARCHAR(32),
+    fecha_creacion TIMESTAMP DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime')),
+    fecha_modificacion TIMESTAMP DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime'))
+);
+CREATE UNIQUE INDEX IF NOT EXISTS uk_codigo_barras ON productos(codigo_barras);
+CREATE INDEX IF NOT EXISTS idx_nombre ON productos(nombre);
+CREATE INDEX IF NOT EXISTS idx_categoria ON productos(categoria_id);
+CREATE INDEX IF NOT EXISTS idx_stock ON productos(stock);
+CREATE INDEX IF NOT EXISTS idx_modificacion ON productos(fecha_modificacion);
+CREATE INDEX IF NOT EXISTS idx_productos_fecha_vencimiento ON productos(fecha_vencimiento);
+
+-- Equivalente a ON UPDATE CURRENT_TIMESTAMP(6) de MySQL
+CREATE TRIGGER IF NOT EXISTS productos_fecha_modificacion
+AFTER UPDATE OF nombre, categoria_id, precio_compra, precio_venta, stock,
+                stock_minimo, fecha_vencimiento, activo, codigo_barras ON productos
+BEGIN
+    UPDATE productos
+    SET fecha_modificacion = strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime')
+    WHERE id = NEW.id;
+END;
+
+-- =====================================================
+-- TABLA: VENTAS
+-- =====================================================
+CREATE TABLE IF NOT EXISTS ventas (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    fecha DATE NOT NULL,
+    hora TIME NOT NULL,
+    total DECIMAL(10,2) NOT NULL,
+    metodo_pago VARCHAR(50) DEFAULT 'Efectivo',
+    estado VARCHAR(20) DEFAULT 'Completada',
+    id_cliente CHAR(32),
+    fecha_registro TIMESTAMP DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime'))
+);
+CREATE UNIQUE INDEX IF NOT EXISTS uk_id_cliente ON ventas(id_cliente);
+CREATE INDEX IF NOT EXISTS idx_fecha ON ventas(fecha);
+CREATE INDEX IF NOT EXISTS idx_hora ON ventas(hora);
+CREATE INDEX IF NOT EXISTS idx_fecha_cubriente ON ventas(fecha, hora, total, metodo_pago);
+CREATE INDEX IF NOT EXISTS idx_ventas_metodo_pago ON ventas(metodo_pago);
+
+-- =====================================================
+-- TABLA: DETALLE_VENTAS
+-- =====================================================
+CREATE TABLE IF NOT EXISTS detalle_ventas (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    venta_id INT NOT NULL REFERENCES ventas(id),
+    producto_id INT NOT NULL REFERENCES productos(id),
+    cantidad INT NOT NULL,
+    precio_unitario DECIMAL(10,2) NOT NULL,
+    subtotal DECIMAL(10,2) NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_venta ON detalle_ventas(venta_id);
+CREATE INDEX IF NOT EXISTS idx_producto ON detalle_ventas(producto_id);
+CREATE INDEX IF NOT EXISTS idx_producto_cubriente ON detalle_ventas(producto_id, venta_id, cantidad, subtotal);
+
+-- =====================================================
+-- TABLA: RESERVAS_STOCK
+-- =====================================================
+CREATE TABLE IF NOT EXISTS reservas_stock (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    producto_id INT NOT NULL REFERENCES productos(id),
+    cantidad INT NOT NULL,
+    caja VARCHAR(50) NOT NULL,
+    expira DATETIME NOT NULL,
+    fecha_creacion TIMESTAMP DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime'))
+);
+CREATE INDEX IF NOT EXISTS idx_caja ON reservas_stock(caja);
+CREATE INDEX IF NOT EXISTS idx_expira ON reservas_stock(expira);
+
+-- =====================================================
+-- TABLAS DE RESUMEN (ROLLUPS) PARA REPORTES Y GRÁFICAS
+-- =====================================================
+CREATE TABLE IF NOT EXISTS resumen_ventas_hora (
+    fecha DATE NOT NULL,
+    hora TINYINT NOT NULL,
+    metodo_pago VARCHAR(50) NOT NULL,
+    cantidad_ventas INT NOT NULL DEFAULT 0,
+    total DECIMAL(12,2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (fecha, hora, metodo_pago)
+);
+
+CREATE TABLE IF NOT EXISTS resumen_productos_dia (
+    fecha DATE NOT NULL,
+    producto_id INT NOT NULL,
+    unidades INT NOT NULL DEFAULT 0,
+    ingresos DECIMAL(12,2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (fecha, producto_id)
+);
+CREATE INDEX IF NOT EXISTS idx_resumen_producto ON resumen_productos_dia(producto_id, fecha);
+
+CREATE TABLE IF NOT EXISTS resumen_categorias_dia (
+    fecha DATE NOT NULL,
+    categoria_id INT NOT NULL,
+    unidades INT NOT NULL DEFAULT 0,
+    ingresos DECIMAL(12,2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (fecha, categoria_id)
+);
+
+-- =====================================================
+-- TABLAS: AJUSTES MASIVOS DE PRODUCTOS
+-- =====================================================
+CREATE TABLE IF NOT EXISTS ajustes_productos (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    descripcion VARCHAR(255) NOT NULL,
+    campo VARCHAR(30) NOT NULL,
+    productos INT NOT NULL DEFAULT 0,
+    fecha TIMESTAMP DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime')),
+    fecha_reversion DATETIME
+);
+
+CREATE TABLE IF NOT EXISTS ajustes_productos_detalle (
+    ajuste_id INT NOT NULL REFERENCES ajustes_productos(id),
+    producto_id INT NOT NULL REFERENCES productos(id),
+    valor_anterior DECIMAL(12,2),
+    valor_nuevo DECIMAL(12,2) NOT NULL,
+    PRIMARY KEY (ajuste_id, producto_id)
+);
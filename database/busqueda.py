@@ -0,0 +1,195 @@
+"""
+Índice de búsqueda de productos en memoria
+
+Normaliza los nombres sin acentos ni mayúsculas (á -> a, ñ -> n) y los
+indexa por trigramas y por prefijos de palabra, de modo que una búsqueda
+solo revisa los productos candidatos en lugar de recorrer todo el catálogo.
+El ID y el código de barras se resuelven directamente con un diccionario.
+"""
+
+import heapq
+import unicodedata
+
+
+def normalizar(texto):
+    """Pasa a minúsculas y quita acentos y diacríticos"""
+    descompuesto = unicodedata.normalize('NFKD', str(texto).lower())
+    return ''.join(c for c in descompuesto if not unicodedata.combining(c)).strip()
+
+
+def trigramas(texto):
+    """Conjunto de trigramas de un texto normalizado"""
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+
+class IndiceBusqueda:
+    """Índice por trigramas, prefijos, ID y código de barras"""
+    
+    # Los términos más cortos que un trigrama se buscan por prefijo de palabra
+    LARGO_PREFIJO = 2
+    
+    def __init__(self):
+        self.productos = {}         # id -> producto
+        self.nombres = {}           # id -> nombre normalizado
+        self.por_trigrama = {}      # trigrama -> set de ids
+        self.por_prefijo = {}       # prefijo corto de palabra -> set de ids
+        self.por_categoria = {}     # categoría normalizada -> set de ids
+        self.por_codigo = {}        # código de barras -> id
+    
+    def agregar(self, producto):
+        """Indexa un producto (o lo reindexa si ya existía)"""
+        producto_id = producto['id']
+        if producto_id in self.productos:
+            self.quitar(producto_id)
+        
+        nombre = normalizar(producto['nombre'])
+        self.productos[producto_id] = producto
+        self.nombres[producto_id] = nombre
+        
+        for trigrama in trigramas(nombre):
+            self.por_trigrama.setdefault(trigrama, set()).add(producto_id)
+        for prefijo in self._prefijos(nombre):
+            self.por_prefijo.setdefault(prefijo, set()).add(producto_id)
+        
+        categoria = normalizar(producto.get('categoria') or '')
+        self.por_categoria.setdefault(categoria, set()).add(producto_id)
+        
+        codigo = producto.get('codigo_barras')
+        if codigo:
+            self.por_codigo[str(codigo)] = producto_id
+    
+    def quitar(self, producto_id):
+        """Quita un producto del índice"""
+        producto = self.productos.pop(producto_id, None)
+        if producto is None:
+            return
+        nombre = self.nombres.pop(producto_id)
+        
+        for trigrama in trigramas(nombre):
+            self._descartar(self.por_trigrama, trigrama, producto_id)
+        for prefijo in self._prefijos(nombre):
+            self._descartar(self.por_prefijo, prefijo, producto_id)
+        self._descartar(self.por_categoria, normalizar(producto.get('categoria') or ''), producto_id)
+        
+        codigo = producto.get('codigo_barras')
+        if codigo and self.por_codigo.get(str(codigo)) == producto_id:
+            del self.por_codigo[str(codigo)]
+    
+    def exacto(self, termino):
+        """
+        Resuelve un ID o código de barras exacto
+        
+        Returns:
+            Producto o None
+        """
+        termino = str(termino).strip()
+        producto_id = self.por_codigo.get(termino)
+        if producto_id is None and termino.isdigit():
+            producto_id = int(termino)
+        return self.productos.get(producto_id)
+    
+    def coincidencias(self, termino, incluir_categoria=False):
+        """
+        IDs de los productos cuyo nombre contiene todas las palabras del término
+        
+        Args:
+            termino: Texto buscado
+            incluir_categoria: También aceptar productos cuya categoría coincida
+        
+        Returns:
+            Conjunto de IDs
+        """
+        termino = normalizar(termino)
+        if not termino:
+            return set(self.productos)
+        
+        ids = None
+        for palabra in termino.split():
+            encontrados = self._buscar_palabra(palabra)
+            ids = encontrados if ids is None else ids & encontrados
+            if not ids:
+                break
+        ids = set(ids or ())
+        
+        if incluir_categoria:
+            for categoria, ids_categoria in self.por_categoria.items():
+                if termino in categoria:
+                    ids |= ids_categoria
+        
+        exacto = self.exacto(termino)
+        if exacto is not None:
+            ids.add(exacto['id'])
+        return ids
+    
+    def buscar(self, termino, limite=20):
+        """
+        Busca productos y los ordena por relevancia
+        
+        Orden: ID o código exacto, nombre exacto, nombre que empieza con el
+        término, alguna palabra que empieza con el término, el resto.
+        
+        Args:
+            termino: Texto buscado (nombre, ID o código de barras)
+            limite: Máximo de resultados
+        
+        Returns:
+            Lista de productos (vacía si el término está vacío)
+        """
+        normalizado = normalizar(termino)
+        if not normalizado:
+            return []
+        exacto = self.exacto(termino)
+        ids = self.coincidencias(termino)
+        primera = normalizado.split()[0] if normalizado else ''
+        
+        def rango(producto_id):
+            nombre = self.nombres[producto_id]
+            if exacto is not None and producto_id == exacto['id']:
+                nivel = 0
+            elif nombre == normalizado:
+                nivel = 1
+            elif nombre.startswith(normalizado):
+                nivel = 2
+            elif (' ' + primera) in (' ' + nombre):
+                nivel = 3
+            else:
+                nivel = 4
+            return (nivel, len(nombre), nombre)
+        
+        mejores = heapq.nsmallest(limite, ids, key=rango)
+        return [self.productos[producto_id] for producto_id in mejores]
+    
+    def _buscar_palabra(self, palabra):
+        """IDs cuyo nombre contiene la palabra (verificando falsos positivos)"""
+        if len(palabra) <= self.LARGO_PREFIJO:
+            return self.por_prefijo.get(palabra, set())
+        
+        # Intersecar empezando por el trigrama menos frecuente
+        conjuntos = sorted(
+            (self.por_trigrama.get(t, set()) for t in trigramas(palabra)),
+            key=len
+        )
+        candidatos = set(conjuntos[0])
+        for conjunto in conjuntos[1:]:
+            candidatos &= conjunto
+            if not candidatos:
+                return candidatos
+        return {i for i in candidatos if palabra in self.nombres[i]}
+    
+    def _prefijos(self, nombre):
+        """Prefijos cortos de cada palabra del nombre"""
+        prefijos = set()
+        for palabra in nombre.split():
+            for largo in range(1, self.LARGO_PREFIJO + 1):
+                if len(palabra) >= largo:
+                    prefijos.add(palabra[:largo])
+        return prefijos
+    
+    @staticmethod
+    def _descartar(indice, clave, producto_id):
+        """Quita un ID de un conjunto del índice y borra el conjunto si queda vacío"""
+        conjunto = indice.get(clave)
+        if conjunto is not None:
+            conjunto.discard(producto_id)
+            if not conjunto:
+                del indice[clave]
@@ -0,0 +1,101 @@
+"""
+Carrito de la caja con una línea por producto
+
+Agregar otra vez un producto suma unidades a su línea. Las líneas son
+objetos con __slots__ (sin diccionario por instancia) e importes en
+centavos enteros (ver database/dinero.py); el total se lleva al día con
+cada cambio en lugar de volver a sumar todo el carrito.
+"""
+
+from database.dinero import Dinero, a_decimal
+
+
+class LineaCarrito:
+    """Un producto del carrito con sus unidades y su reserva de stock"""
+    
+    __slots__ = ('producto_id', 'nombre', 'cantidad', 'precio_centavos', 'reserva_id')
+    
+    def __init__(self, producto_id, nombre, precio_centavos, cantidad=0, reserva_id=None):
+        self.producto_id = producto_id
+        self.nombre = nombre
+        self.cantidad = cantidad
+        self.precio_centavos = precio_centavos
+        self.reserva_id = reserva_id
+    
+    @property
+    def subtotal_centavos(self):
+        return self.precio_centavos * self.cantidad
+
+
+class Carrito:
+    """Líneas indexadas por ID de producto, con total acumulado"""
+    
+    def __init__(self):
+        self.lineas = {}            # producto_id -> LineaCarrito, en orden de llegada
+        self.total_centavos = 0
+    
+    def __len__(self):
+        return len(self.lineas)
+    
+    def __iter__(self):
+        return iter(self.lineas.values())
+    
+    @property
+    def total(self):
+        """Total del carrito como Dinero"""
+        return Dinero(self.total_centavos)
+    
+    def linea(self, producto_id):
+        """Línea del producto o None"""
+        return self.lineas.get(producto_id)
+    
+    def agregar(self, producto_id, nombre, precio_centavos, cantidad, reserva_id=None):
+        """
+        Suma unidades a la línea del producto, o la crea si no estaba
+        
+        Args:
+            producto_id: ID del producto
+            nombre: Nombre a mostrar
+            precio_centavos: Precio unitario (solo se usa en una línea nueva)
+            cantidad: Unidades a sumar
+            reserva_id: Reserva de la línea nueva (las existentes conservan la suya)
+        
+        Returns:
+            (línea, True si la línea es nueva)
+        """
+        linea = self.lineas.get(producto_id)
+        nueva = linea is None
+        if nueva:
+            linea = LineaCarrito(producto_id, nombre, precio_centavos, reserva_id=reserva_id)
+            self.lineas[producto_id] = linea
+        linea.cantidad += cantidad
+        self.total_centavos += linea.precio_centavos * cantidad
+        return linea, nueva
+    
+    def quitar(self, producto_id):
+        """Quita la línea del producto y la devuelve (None si no estaba)"""
+        linea = self.lineas.pop(producto_id, None)
+        if linea is not None:
+            self.total_centavos -= linea.subtotal_centavos
+        return linea
+    
+    def vaciar(self):
+        """Deja el carrito sin líneas"""
+        self.lineas = {}
+        self.total_centavos = 0
+    
+    def lineas_venta(self):
+        """
+        Líneas en el formato de registrar_venta y del diario
+        
+        Returns:
+            Lista de diccionarios con producto_id, cantidad, precio_unitario,
+            subtotal (Decimal) y reserva_id
+        """
+        return [{
+            'producto_id': linea.producto_id,
+            'cantidad': linea.cantidad,
+            'precio_unitario': a_decimal(linea.precio_centavos),
+            'subtotal': a_decimal(linea.subtotal_centavos),
+            'reserva_id': linea.reserva_id
+        } for linea in self.lineas.values()]
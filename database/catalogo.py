@@ -0,0 +1,273 @@
+"""
+Caché en memoria del catálogo de productos
+
+Se carga una sola vez y después se mantiene al día con una consulta barata
+de versión (cantidad de productos y última fecha_modificacion). Cuando la
+versión cambia solo se vuelven a leer los productos modificados.
+
+El catálogo mantiene además el índice de búsqueda que comparten el punto
+de venta y la pantalla de productos, con el diccionario de códigos de
+barras que usa el escáner de la caja. Se puede guardar una copia local
+para abrir la caja sin conexión a la base de datos.
+"""
+
+import os
+import pickle
+import threading
+from datetime import datetime, timedelta
+
+from database.busqueda import IndiceBusqueda
+
+
+SQL_PRODUCTOS = """
+    SELECT
+        p.id,
+        p.nombre,
+        p.categoria_id,
+        c.nombre as categoria,
+        p.precio_venta,
+        p.stock,
+        p.stock_minimo,
+        p.activo,
+        p.codigo_barras,
+        p.fecha_modificacion
+    FROM productos p
+    JOIN categorias c ON p.categoria_id = c.id
+"""
+
+# Las transacciones largas pueden confirmar filas con una fecha anterior a
+# la última versión vista; este margen las vuelve a leer.
+MARGEN_VERSION = timedelta(seconds=5)
+
+
+class CatalogoProductos:
+    """Catálogo de productos activos indexado por ID y por nombre"""
+    
+    def __init__(self, bd):
+        self.bd = bd
+        self.por_id = {}
+        self.por_nombre = {}
+        self.indice = IndiceBusqueda()
+        self._version = None
+        self._ordenados = {}
+        self._candado = threading.RLock()
+    
+    def cargar(self):
+        """Carga el catálogo completo desde la base de datos"""
+        version = self._consultar_version()
+        productos = self.bd.ejecutar_consulta(SQL_PRODUCTOS + " WHERE p.activo = TRUE")
+        if productos is None:
+            return False
+        
+        with self._candado:
+            self.por_id = {}
+            self.por_nombre = {}
+            self.indice = IndiceBusqueda()
+            self._aplicar(productos)
+            self._version = version
+        return True
+    
+    def refrescar(self):
+        """
+        Pone el catálogo al día consultando solo la versión
+        
+        Returns:
+            True si hubo cambios
+        """
+        if self._version is None:
+            return self.cargar()
+        
+        version = self._consultar_version()
+        if version is None or version == self._version:
+            return False
+        
+        total_anterior, fecha_anterior = self._version
+        total, fecha = version
+        
+        # Si desaparecieron filas o cambió la cantidad sin nueva fecha,
+        # no hay forma segura de parchar: se recarga todo
+        if total < total_anterior or fecha is None or fecha_anterior is None or fecha == fecha_anterior:
+            return self.cargar()
+        
+        productos = self.bd.ejecutar_consulta(
+            SQL_PRODUCTOS + " WHERE p.fecha_modificacion >= %s",
+            (fecha_anterior - MARGEN_VERSION,)
+        )
+        if productos is None:
+            return False
+        
+        with self._candado:
+            self._aplicar(productos)
+            self._version = version
+        return True
+    
+    def recargar_productos(self, producto_ids):
+        """
+        Vuelve a leer solo los productos indicados (tras modificarlos)
+        
+        Args:
+            producto_ids: IDs de los productos afectados
+        """
+        producto_ids = list(set(producto_ids))
+        if not producto_ids:
+            return
+        
+        marcadores = ", ".join(["%s"] * len(producto_ids))
+        productos = self.bd.ejecutar_consulta(
+            SQL_PRODUCTOS + f" WHERE p.id IN ({marcadores})",
+            tuple(producto_ids)
+        )
+        if productos is None:
+            return
+        
+        with self._candado:
+            # Los que ya no existen se quitan del catálogo
+            encontrados = {prod['id'] for prod in productos}
+            for producto_id in producto_ids:
+                if producto_id not in encontrados:
+                    self._quitar(producto_id)
+            self._aplicar(productos)
+    
+    def descontar_local(self, lineas):
+        """
+        Descuenta el stock en memoria de una venta que aún no llega a la BD
+        
+        Args:
+            lineas: Lista de diccionarios con producto_id y cantidad
+        """
+        with self._candado:
+            for linea in lineas:
+                producto = self.por_id.get(linea['producto_id'])
+                if producto is not None:
+                    producto['stock'] -= linea['cantidad']
+    
+    def guardar_copia(self, ruta):
+        """Guarda los productos en un archivo local para trabajar sin conexión"""
+        with self._candado:
+            productos = list(self.por_id.values())
+        temporal = ruta + ".tmp"
+        with open(temporal, 'wb') as archivo:
+            pickle.dump(productos, archivo)
+        os.replace(temporal, ruta)
+    
+    def cargar_copia(self, ruta):
+        """
+        Carga el catálogo desde la copia local
+        
+        Returns:
+            True si había copia
+        """
+        try:
+            with open(ruta, 'rb') as archivo:
+                productos = pickle.load(archivo)
+        except (OSError, pickle.PickleError, EOFError):
+            return False
+        
+        with self._candado:
+            self.por_id = {}
+            self.por_nombre = {}
+            self.indice = IndiceBusqueda()
+            self._aplicar(productos)
+            # Sin versión: la próxima vez que haya conexión se recarga todo
+            self._version = None
+        return True
+    
+    def obtener(self, producto_id):
+        """Devuelve el producto con ese ID o None"""
+        return self.por_id.get(producto_id)
+    
+    def buscar_por_nombre(self, nombre):
+        """Devuelve el producto con ese nombre exacto (sin mayúsculas) o None"""
+        return self.por_nombre.get(nombre.strip().lower())
+    
+    def buscar_por_codigo(self, codigo):
+        """Devuelve el producto con ese código de barras exacto o None"""
+        with self._candado:
+            return self.por_id.get(self.indice.por_codigo.get(codigo.strip()))
+    
+    def buscar(self, termino, limite=20):
+        """Productos que coinciden con el término, ordenados por relevancia"""
+        with self._candado:
+            return self.indice.buscar(termino, limite)
+    
+    def coincidencias(self, termino, incluir_categoria=False):
+        """IDs de los productos que coinciden con el término"""
+        with self._candado:
+            return self.indice.coincidencias(termino, incluir_categoria)
+    
+    def filtrar(self, termino):
+        """
+        Productos que coinciden con el término por nombre o categoría
+        
+        Se filtra siempre el catálogo completo: el índice no garantiza que un
+        término más largo devuelva un subconjunto del anterior ("co" y "col",
+        "1" y "12"), así que no se puede reducir el resultado previo.
+        
+        Returns:
+            Lista de productos ordenada por categoría y nombre
+        """
+        with self._candado:
+            ids = self.indice.coincidencias(termino, incluir_categoria=True)
+            return [prod for prod in self.listar(por_categoria=True) if prod['id'] in ids]
+    
+    def listar(self, por_categoria=False):
+        """
+        Lista los productos activos
+        
+        Args:
+            por_categoria: Ordenar por categoría y nombre en lugar de solo nombre
+        
+        Returns:
+            Lista de diccionarios de producto (no modificar)
+        """
+        with self._candado:
+            lista = self._ordenados.get(por_categoria)
+            if lista is None:
+                if por_categoria:
+                    clave = lambda p: (p['categoria'].lower(), p['nombre'].lower())
+                else:
+                    clave = lambda p: p['nombre'].lower()
+                lista = sorted(self.por_id.values(), key=clave)
+                self._ordenados[por_categoria] = lista
+            return lista
+    
+    def _consultar_version(self):
+        """Consulta barata que cambia cuando cambia algún producto"""
+        resultado = self.bd.ejecutar_consulta(
+            "SELECT COUNT(*) as total, MAX(fecha_modificacion) as fecha FROM productos"
+        )
+        if not resultado:
+            return None
+        fecha = resultado[0]['fecha']
+        if isinstance(fecha, str):
+            # SQLite no conserva el tipo de la columna en MAX()
+            fecha = datetime.fromisoformat(fecha)
+        return (resultado[0]['total'], fecha)
+    
+    def _aplicar(self, productos):
+        """Inserta, actualiza o quita productos de los índices"""
+        for prod in productos:
+            if prod['activo']:
+                anterior = self.por_id.get(prod['id'])
+                if anterior is not None:
+                    self._quitar_nombre(anterior)
+                self.por_id[prod['id']] = prod
+                self.por_nombre[prod['nombre'].lower()] = prod
+                self.indice.agregar(prod)
+            else:
+                self._quitar(prod['id'])
+        self._ordenados = {}
+    
+    def _quitar(self, producto_id):
+        """Quita un producto de los índices"""
+        anterior = self.por_id.pop(producto_id, None)
+        if anterior is not None:
+            self._quitar_nombre(anterior)
+            self.indice.quitar(producto_id)
+            self._ordenados = {}
+    
+    def _quitar_nombre(self, producto):
+        """Quita el índice por nombre si apunta a este producto"""
+        clave = producto['nombre'].lower()
+        if self.por_nombre.get(clave) is producto:
+            del self.por_nombre[clave]
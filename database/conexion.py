@@ -1,66 +1,530 @@
-import mysql.connector
-from mysql.connector import Error
+import logging
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from database.dinero import a_centavos, a_decimal
+from database.instrumentacion import (ConexionInstrumentada, CursorInstrumentado,
+                                      EstadisticasConsultas, configurar_mensajes)
+from database.motores import Error, ErrorPool, MotorMySQL, MotorSQLite
+from database.reservas import StockInsuficienteError, descontar_stock
+from database.resumenes import acumular_venta
+
+
+# Tipo de fila de las consultas -> argumentos de conexion.cursor()
+FORMATOS_FILA = {
+    'dict': {'dictionary': True},
+    'tupla': {},
+    'nombrada': {'named_tuple': True},
+}
+
+# Mensajes ✓/✗ de cada operación; ver instrumentacion.configurar_mensajes
+registro = logging.getLogger(__name__)
+
+
+class PoolConexiones:
+    """
+    Pool acotado de conexiones a la base de datos
+    
+    Las conexiones se prestan con obtener() y se regresan con devolver().
+    Antes de prestar una conexión que lleva tiempo sin usarse se verifica
+    con un ping; si el servidor cerró el enlace se descarta y se abre otra
+    con espera exponencial. Las conexiones que superan el tiempo máximo de inactividad
+    se cierran en lugar de reutilizarse.
+    """
+    
+    def __init__(self, motor, tamaño_maximo=5, inactividad_maxima=300,
+                 intervalo_ping=30, reintentos=3, espera_inicial=0.5, maximo_preparadas=100):
+        self.motor = motor
+        self.tamaño_maximo = tamaño_maximo
+        self.inactividad_maxima = inactividad_maxima
+        self.intervalo_ping = intervalo_ping
+        self.reintentos = reintentos
+        self.espera_inicial = espera_inicial
+        self.maximo_preparadas = maximo_preparadas
+        
+        self._libres = []       # Lista de (conexion, ultimo_uso)
+        self._total = 0         # Conexiones abiertas (libres + prestadas)
+        self._condicion = threading.Condition()
+        self._cerrado = False
+        # id(conexion) -> OrderedDict((sql, formato) -> cursor preparado)
+        self._preparadas = {}
+    
+    def _crear_conexion(self):
+        """Abre una conexión nueva reintentando con espera exponencial"""
+        espera = self.espera_inicial
+        for intento in range(1, self.reintentos + 1):
+            try:
+                return self.motor.conectar()
+            except Error as e:
+                if intento == self.reintentos:
+                    raise
+                registro.warning("✗ Error de conexión (intento %s/%s): %s", intento, self.reintentos, e)
+                time.sleep(espera)
+                espera *= 2
+    
+    def _esta_viva(self, conexion, ultimo_uso):
+        """Verifica la conexión con un ping si lleva tiempo sin usarse"""
+        if time.monotonic() - ultimo_uso < self.intervalo_ping:
+            return True
+        try:
+            # Sin reconectar: reconectar el mismo objeto invalidaría en silencio
+            # sus sentencias preparadas; una caída se descarta con su caché
+            conexion.ping(reconnect=False)
+            return True
+        except Error:
+            return False
+    
+    def _cerrar_silencioso(self, conexion):
+        """Cierra una conexión ignorando errores de red"""
+        for cursor in self._preparadas.pop(id(conexion), {}).values():
+            try:
+                cursor.close()
+            except Error:
+                pass
+        try:
+            conexion.close()
+        except Error:
+            pass
+    
+    def cursor_preparado(self, conexion, sql, formato):
+        """
+        Cursor con la sentencia ya preparada en el servidor
+        
+        Cada conexión guarda sus últimas maximo_preparadas sentencias por
+        texto; repetir una sentencia solo envía los parámetros. La conexión
+        la usa un hilo a la vez, así que su caché no necesita candado.
+        
+        Args:
+            conexion: Conexión prestada por obtener()
+            sql: Texto de la sentencia
+            formato: Argumentos de tipo de fila (ver FORMATOS_FILA)
+        """
+        cache = self._preparadas.setdefault(id(conexion), OrderedDict())
+        clave = (sql, tuple(formato))
+        cursor = cache.get(clave)
+        if cursor is not None:
+            cache.move_to_end(clave)
+            return cursor
+        
+        cursor = conexion.cursor(prepared=True, **formato)
+        cache[clave] = cursor
+        if len(cache) > self.maximo_preparadas:
+            _, antiguo = cache.popitem(last=False)
+            try:
+                antiguo.close()
+            except Error:
+                pass
+        return cursor
+    
+    def olvidar_preparado(self, conexion, sql, formato):
+        """Saca de la caché un cursor que falló (su estado ya no es confiable)"""
+        cursor = self._preparadas.get(id(conexion), {}).pop((sql, tuple(formato)), None)
+        if cursor is not None:
+            try:
+                cursor.close()
+            except Error:
+                pass
+    
+    def obtener(self, tiempo_espera=10):
+        """
+        Presta una conexión del pool
+        
+        Args:
+            tiempo_espera: Segundos a esperar si el pool está lleno
+        
+        Returns:
+            Conexión lista para usar
+        """
+        limite = time.monotonic() + tiempo_espera
+        while True:
+            with self._condicion:
+                while True:
+                    if self._cerrado:
+                        raise ErrorPool("El pool de conexiones está cerrado")
+                    
+                    self.purgar_inactivas()
+                    if self._libres:
+                        # Sigue contada en _total: ya está prestada
+                        conexion, ultimo_uso = self._libres.pop()
+                        break
+                    
+                    if self._total < self.tamaño_maximo:
+                        self._total += 1
+                        conexion = None
+                        break
+                    
+                    restante = limite - time.monotonic()
+                    if restante <= 0:
+                        raise ErrorPool("No hay conexiones disponibles en el pool")
+                    self._condicion.wait(restante)
+            
+            if conexion is None:
+                break
+            
+            # El ping va fuera del candado: un servidor lento no detiene a
+            # los demás hilos que piden o devuelven conexiones
+            if self._esta_viva(conexion, ultimo_uso):
+                return conexion
+            # Conexión caída: se descarta y se libera el cupo
+            self._cerrar_silencioso(conexion)
+            with self._condicion:
+                self._total -= 1
+                self._condicion.notify()
+        
+        # La conexión se abre fuera del candado para no bloquear a otros hilos
+        try:
+            return self._crear_conexion()
+        except Error:
+            with self._condicion:
+                self._total -= 1
+                self._condicion.notify()
+            raise
+    
+    def devolver(self, conexion, descartar=False):
+        """
+        Regresa una conexión al pool
+        
+        Args:
+            conexion: Conexión obtenida con obtener()
+            descartar: True para cerrarla en lugar de reutilizarla
+        """
+        if not descartar:
+            try:
+                # No dejar transacciones abiertas para el siguiente usuario
+                if conexion.in_transaction:
+                    conexion.rollback()
+            except Error:
+                descartar = True
+        
+        with self._condicion:
+            if descartar or self._cerrado:
+                self._cerrar_silencioso(conexion)
+                self._total -= 1
+            else:
+                self._libres.append((conexion, time.monotonic()))
+            self._condicion.notify()
+    
+    def purgar_inactivas(self):
+        """Cierra las conexiones libres que superaron la inactividad máxima"""
+        ahora = time.monotonic()
+        with self._condicion:
+            vigentes = []
+            for conexion, ultimo_uso in self._libres:
+                if ahora - ultimo_uso >= self.inactividad_maxima:
+                    self._cerrar_silencioso(conexion)
+                    self._total -= 1
+                else:
+                    vigentes.append((conexion, ultimo_uso))
+            self._libres = vigentes
+            self._condicion.notify_all()
+    
+    def cerrar(self):
+        """Cierra todas las conexiones libres y rechaza nuevos préstamos"""
+        with self._condicion:
+            self._cerrado = True
+            for conexion, _ in self._libres:
+                self._cerrar_silencioso(conexion)
+                self._total -= 1
+            self._libres = []
+            self._condicion.notify_all()
 
 
 class ConexionBD:
-    def __init__(self, host, usuario, contraseña, base_datos):
+    def __init__(self, host, usuario, contraseña, base_datos, tamaño_pool=5,
+                 inactividad_maxima=300, motor=None, preparar_sentencias=False,
+                 instrumentacion=None):
+        """
+        Args:
+            host, usuario, contraseña, base_datos: Datos de acceso a MySQL
+            tamaño_pool: Conexiones máximas abiertas
+            inactividad_maxima: Segundos antes de cerrar una conexión libre
+            motor: MotorMySQL o MotorSQLite; por omisión MySQL con los datos anteriores
+            preparar_sentencias: Reutilizar sentencias preparadas en el servidor
+                                 (solo MySQL; SQLite ya las guarda)
+            instrumentacion: Objeto con registrar(sql, segundos, filas, error),
+                             por ejemplo EstadisticasConsultas; None para no medir
+        """
         self.host = host
         self.usuario = usuario
         self.contraseña = contraseña
         self.base_datos = base_datos
-        self.conexion = None
+        self.tamaño_pool = tamaño_pool
+        self.inactividad_maxima = inactividad_maxima
+        self.motor = motor or MotorMySQL(host, usuario, contraseña, base_datos)
+        self.dialecto = self.motor.dialecto
+        self.preparar_sentencias = preparar_sentencias and self.motor.prepara_sentencias
+        self.instrumentacion = instrumentacion
+        self.pool = None
+    
+    @classmethod
+    def desde_config(cls, base_datos=None, **opciones):
+        """
+        Crea la conexión con el motor elegido en config.py
+        
+        Args:
+            base_datos: Otra base de datos MySQL u otro archivo SQLite
+                        en lugar del configurado (opcional)
+            **opciones: tamaño_pool, inactividad_maxima, instrumentacion
+        """
+        import config
+        configurar_mensajes(config.MENSAJES_DETALLADOS)
+        motor = None
+        if config.MOTOR == 'sqlite':
+            motor = MotorSQLite(base_datos or config.RUTA_SQLITE)
+        if 'instrumentacion' not in opciones:
+            opciones['instrumentacion'] = EstadisticasConsultas() if config.INSTRUMENTAR_CONSULTAS else None
+        return cls(config.HOST, config.USUARIO, config.CONTRASEÑA,
+                   base_datos or config.BASE_DATOS, motor=motor,
+                   preparar_sentencias=config.SENTENCIAS_PREPARADAS, **opciones)
     
     def conectar(self):
-        """Establece conexión con MySQL"""
+        """Crea el pool de conexiones y verifica el acceso a la base de datos"""
+        pool = PoolConexiones(
+            self.motor,
+            tamaño_maximo=self.tamaño_pool,
+            inactividad_maxima=self.inactividad_maxima
+        )
         try:
-            self.conexion = mysql.connector.connect(
-                host=self.host,
-                user=self.usuario,
-                password=self.contraseña,
-                database=self.base_datos
-            )
-            print("✓ Conexión exitosa a MySQL")
-            return self.conexion
+            # Abrir la primera conexión valida las credenciales
+            pool.devolver(pool.obtener())
         except Error as e:
-            print(f"✗ Error de conexión: {e}")
+            registro.error("✗ Error de conexión: %s", e)
+            pool.cerrar()
             return None
+        
+        self.pool = pool
+        registro.info("✓ Conexión exitosa a %s", self.motor.nombre)
+        return self.pool
+    
+    def responde(self, tiempo_conexion=3):
+        """
+        Verifica que la base de datos conteste, sin reintentos
+        
+        Abre una conexión aparte del pool con un tiempo de espera corto, así
+        que no espera los reintentos de PoolConexiones. No llamar desde la
+        interfaz: con el servidor caído tarda hasta tiempo_conexion segundos.
+        
+        Args:
+            tiempo_conexion: Segundos máximos para conectar
+        
+        Returns:
+            True si la base de datos respondió
+        """
+        try:
+            conexion = self.motor.conectar(tiempo_conexion=tiempo_conexion)
+        except Error:
+            return False
+        try:
+            conexion.ping(reconnect=False)
+            return True
+        except Error:
+            return False
+        finally:
+            try:
+                conexion.close()
+            except Error:
+                pass
     
     def desconectar(self):
-        """Cierra la conexión"""
-        if self.conexion and self.conexion.is_connected():
-            self.conexion.close()
-            print("✓ Conexión cerrada")
+        """Cierra todas las conexiones del pool"""
+        if self.pool:
+            self.pool.cerrar()
+            self.pool = None
+            registro.info("✓ Conexión cerrada")
     
-    def ejecutar_consulta(self, sql, parametros=None):
+    @contextmanager
+    def obtener_conexion(self):
+        """
+        Presta una conexión del pool durante un bloque with
+        
+        Si la conexión falla a nivel de red se descarta en lugar de
+        regresarla al pool. Con instrumentación, sus cursores registran
+        cada sentencia.
+        """
+        with self._prestar() as conexion:
+            if self.instrumentacion:
+                yield ConexionInstrumentada(conexion, self.instrumentacion)
+            else:
+                yield conexion
+    
+    @contextmanager
+    def _prestar(self):
+        """Conexión del pool sin envolver (ver obtener_conexion)"""
+        conexion = self.pool.obtener()
+        descartar = False
+        try:
+            yield conexion
+        except Error:
+            descartar = not conexion.is_connected()
+            raise
+        finally:
+            self.pool.devolver(conexion, descartar)
+    
+    @contextmanager
+    def _cursor(self, conexion, sql, filas=None):
+        """
+        Cursor para ejecutar sql en una conexión de _prestar()
+        
+        Con sentencias preparadas el cursor sale de la caché de la conexión
+        y no se cierra al terminar.
+        """
+        formato = FORMATOS_FILA[filas] if filas else {}
+        if self.preparar_sentencias:
+            cursor = self.pool.cursor_preparado(conexion, sql, formato)
+        else:
+            cursor = conexion.cursor(**formato)
+        
+        try:
+            if self.instrumentacion:
+                yield CursorInstrumentado(cursor, self.instrumentacion)
+            else:
+                yield cursor
+        except Error:
+            if self.preparar_sentencias:
+                self.pool.olvidar_preparado(conexion, sql, formato)
+            raise
+        finally:
+            if not self.preparar_sentencias:
+                cursor.close()
+    
+    def ejecutar_consulta(self, sql, parametros=None, filas='dict'):
         """
         Ejecuta una consulta SELECT
         
         Args:
             sql: Consulta SQL SELECT
             parametros: Tupla de parámetros para la consulta (opcional)
+            filas: 'dict', 'tupla' o 'nombrada' (namedtuple, más ligera que dict)
         
         Returns:
-            Lista de resultados (diccionarios)
+            Lista de resultados (diccionarios por omisión)
         """
-        if not self.conexion:
-            print("✗ No hay conexión a la base de datos")
+        if not self.pool:
+            registro.error("✗ No hay conexión a la base de datos")
             return None
         
-        cursor = None
         try:
-            cursor = self.conexion.cursor(dictionary=True)
-            if parametros:
+            with self._prestar() as conexion, self._cursor(conexion, sql, filas) as cursor:
                 cursor.execute(sql, parametros)
-            else:
-                cursor.execute(sql)
-            resultados = cursor.fetchall()
-            return resultados
+                return cursor.fetchall()
         except Error as e:
-            print(f"✗ Error en consulta: {e}")
+            registro.error("✗ Error en consulta: %s", e)
             return None
+    
+    def iterar_consulta(self, sql, parametros=None, tamaño_lote=1000, filas='dict'):
+        """
+        Recorre el resultado de un SELECT sin cargarlo completo en memoria
+        
+        Usa un cursor sin buffer y lee de tamaño_lote en tamaño_lote filas;
+        la conexión queda prestada mientras se recorre. Si se deja de
+        recorrer antes del final, la conexión se cierra en lugar de volver
+        al pool (quedaron filas sin leer en el servidor).
+        
+        Args:
+            sql: Consulta SQL SELECT
+            parametros: Tupla de parámetros para la consulta (opcional)
+            tamaño_lote: Filas por lectura al servidor
+            filas: 'dict', 'tupla' o 'nombrada'
+        
+        Yields:
+            Una fila a la vez
+        
+        Raises:
+            Error: Si la consulta falla a medio recorrido (las filas ya
+                entregadas no estaban completas)
+        """
+        if not self.pool:
+            registro.error("✗ No hay conexión a la base de datos")
+            return
+        
+        conexion = self.pool.obtener()
+        completa = False
+        try:
+            cursor = conexion.cursor(**FORMATOS_FILA[filas])
+            if self.instrumentacion:
+                cursor = CursorInstrumentado(cursor, self.instrumentacion)
+            cursor.execute(sql, parametros)
+            while True:
+                lote = cursor.fetchmany(tamaño_lote)
+                if not lote:
+                    break
+                yield from lote
+            cursor.close()
+            completa = True
+        except Error as e:
+            registro.error("✗ Error en consulta: %s", e)
+            raise
         finally:
-            if cursor:
-                cursor.close()
+            self.pool.devolver(conexion, descartar=not completa)
+    
+    def consultar_pagina(self, sql, parametros=None, clave='id', despues_de=None,
+                         tamaño_pagina=200, filas='dict'):
+        """
+        Lee una página de resultados paginando por clave (keyset)
+        
+        La consulta marca con {pagina} el lugar de la condición sobre la
+        clave, después de todos sus demás parámetros. Aquí se completa con
+        "clave > %s" y se agrega ORDER BY clave LIMIT n: a diferencia de
+        OFFSET, cada página usa el índice y cuesta lo mismo sin importar
+        qué tan adelante esté.
+        
+        Args:
+            sql: SELECT con {pagina} en su WHERE y sin ORDER BY ni LIMIT
+            parametros: Parámetros de la consulta, sin los de la página
+            clave: Columna única por la que se pagina (por ejemplo 'v.id');
+                   con filas='tupla' debe ser la primera columna
+            despues_de: Clave de la última fila ya leída (None = primera página)
+            tamaño_pagina: Filas por página
+            filas: 'dict', 'tupla' o 'nombrada'
+        
+        Returns:
+            (filas, siguiente) donde siguiente es el despues_de de la
+            próxima página o None si ya no hay más; None si hubo un error
+        """
+        if despues_de is None:
+            condicion, extra = "TRUE", ()
+        else:
+            condicion, extra = f"{clave} > %s", (despues_de,)
+        consulta = sql.replace("{pagina}", condicion) + f" ORDER BY {clave} LIMIT %s"
+        
+        resultado = self.ejecutar_consulta(
+            consulta, tuple(parametros or ()) + extra + (tamaño_pagina,), filas
+        )
+        if resultado is None:
+            return None
+        if len(resultado) < tamaño_pagina:
+            return resultado, None
+        
+        ultima = resultado[-1]
+        columna = clave.split('.')[-1]
+        if filas == 'dict':
+            return resultado, ultima[columna]
+        if filas == 'nombrada':
+            return resultado, getattr(ultima, columna)
+        return resultado, ultima[0]
+    
+    def iterar_paginas(self, sql, parametros=None, clave='id', tamaño_pagina=200, filas='dict'):
+        """
+        Recorre todas las páginas de consultar_pagina
+        
+        Cada página es una consulta corta: entre páginas no se retiene
+        ninguna conexión, así que la primera puede mostrarse de inmediato.
+        
+        Yields:
+            Lista de filas de cada página
+        """
+        despues_de = None
+        while True:
+            pagina = self.consultar_pagina(sql, parametros, clave, despues_de, tamaño_pagina, filas)
+            if pagina is None:
+                return
+            resultado, despues_de = pagina
+            if resultado:
+                yield resultado
+            if despues_de is None:
+                return
     
     def ejecutar_insertar(self, sql, parametros=None):
         """
@@ -73,28 +537,21 @@ class ConexionBD:
         Returns:
             ID del registro insertado
         """
-        if not self.conexion:
-            print("✗ No hay conexión a la base de datos")
+        if not self.pool:
+            registro.error("✗ No hay conexión a la base de datos")
             return 0
         
-        cursor = None
         try:
-            cursor = self.conexion.cursor()
-            if parametros:
+            # Si algo falla, devolver() hace rollback de lo pendiente
+            with self._prestar() as conexion, self._cursor(conexion, sql) as cursor:
                 cursor.execute(sql, parametros)
-            else:
-                cursor.execute(sql)
-            self.conexion.commit()
-            id_insertado = cursor.lastrowid
-            print(f"✓ Registro insertado con ID: {id_insertado}")
+                conexion.commit()
+                id_insertado = cursor.lastrowid
+            registro.info("✓ Registro insertado con ID: %s", id_insertado)
             return id_insertado
         except Error as e:
-            print(f"✗ Error al insertar: {e}")
-            self.conexion.rollback()
+            registro.error("✗ Error al insertar: %s", e)
             return 0
-        finally:
-            if cursor:
-                cursor.close()
     
     def ejecutar_actualizar(self, sql, parametros=None):
         """
@@ -107,28 +564,20 @@ class ConexionBD:
         Returns:
             Número de registros actualizados
         """
-        if not self.conexion:
-            print("✗ No hay conexión a la base de datos")
+        if not self.pool:
+            registro.error("✗ No hay conexión a la base de datos")
             return 0
         
-        cursor = None
         try:
-            cursor = self.conexion.cursor()
-            if parametros:
+            with self._prestar() as conexion, self._cursor(conexion, sql) as cursor:
                 cursor.execute(sql, parametros)
-            else:
-                cursor.execute(sql)
-            self.conexion.commit()
-            filas_afectadas = cursor.rowcount
-            print(f"✓ Registros actualizados: {filas_afectadas}")
+                conexion.commit()
+                filas_afectadas = cursor.rowcount
+            registro.info("✓ Registros actualizados: %s", filas_afectadas)
             return filas_afectadas
         except Error as e:
-            print(f"✗ Error al actualizar: {e}")
-            self.conexion.rollback()
+            registro.error("✗ Error al actualizar: %s", e)
             return 0
-        finally:
-            if cursor:
-                cursor.close()
     
     def ejecutar_eliminar(self, sql, parametros=None):
         """
@@ -141,25 +590,104 @@ class ConexionBD:
         Returns:
             Número de registros eliminados
         """
-        if not self.conexion:
-            print("✗ No hay conexión a la base de datos")
+        if not self.pool:
+            registro.error("✗ No hay conexión a la base de datos")
             return 0
         
-        cursor = None
         try:
-            cursor = self.conexion.cursor()
-            if parametros:
+            with self._prestar() as conexion, self._cursor(conexion, sql) as cursor:
                 cursor.execute(sql, parametros)
-            else:
-                cursor.execute(sql)
-            self.conexion.commit()
-            filas_afectadas = cursor.rowcount
-            print(f"✓ Registros eliminados: {filas_afectadas}")
+                conexion.commit()
+                filas_afectadas = cursor.rowcount
+            registro.info("✓ Registros eliminados: %s", filas_afectadas)
             return filas_afectadas
         except Error as e:
-            print(f"✗ Error al eliminar: {e}")
-            self.conexion.rollback()
+            registro.error("✗ Error al eliminar: %s", e)
+            return 0
+    
+    def registrar_venta(self, fecha, hora, metodo_pago, lineas, id_cliente=None, forzar_stock=False):
+        """
+        Registra una venta completa en una sola transacción
+        
+        Descuenta el stock con un UPDATE condicional por producto, inserta el
+        encabezado en ventas y todas las líneas de detalle_ventas en un solo
+        INSERT de varias filas, y suma la venta a las tablas de resumen.
+        Si algo falla se hace rollback de todo.
+        
+        Args:
+            fecha: Fecha de la venta
+            hora: Hora de la venta
+            metodo_pago: Método de pago
+            lineas: Lista de diccionarios con producto_id, cantidad,
+                    precio_unitario, subtotal y opcionalmente reserva_id
+            id_cliente: ID generado por la caja; si ya existe una venta con
+                        ese ID se devuelve la existente sin registrar otra
+            forzar_stock: Registrar aunque falte stock (ver descontar_stock)
+        
+        Returns:
+            ID de la venta (número de factura), 0 si no se registró
+        
+        Raises:
+            StockInsuficienteError: Si algún producto ya no tiene stock;
+                su atributo fallidos indica cuáles
+        """
+        if not self.pool:
+            registro.error("✗ No hay conexión a la base de datos")
+            return 0
+        
+        if not lineas:
+            registro.error("✗ La venta no tiene productos")
+            return 0
+        
+        # Importes en centavos: el total es exactamente la suma de las líneas,
+        # aunque lleguen como float (SQLite) o texto (diario)
+        detalles = [
+            (linea['producto_id'], linea['cantidad'], a_centavos(linea['precio_unitario']), a_centavos(linea['subtotal']))
+            for linea in lineas
+        ]
+        total = a_decimal(sum(subtotal for _, _, _, subtotal in detalles))
+        
+        try:
+            # Si algo falla, devolver() hace rollback de toda la venta
+            with self.obtener_conexion() as conexion:
+                cursor = conexion.cursor()
+                try:
+                    if id_cliente:
+                        # Venta reenviada desde el diario: no duplicarla
+                        cursor.execute("SELECT id FROM ventas WHERE id_cliente = %s", (id_cliente,))
+                        existente = cursor.fetchall()
+                        if existente:
+                            conexion.rollback()
+                            return existente[0][0]
+                    
+                    # Primero el stock: si falta algo no se escribe nada más
+                    fallidos = descontar_stock(cursor, lineas, forzar_stock)
+                    if fallidos and not forzar_stock:
+                        conexion.rollback()
+                        raise StockInsuficienteError(fallidos)
+                    
+                    cursor.execute(
+                        "INSERT INTO ventas (fecha, hora, total, metodo_pago, id_cliente) VALUES (%s, %s, %s, %s, %s)",
+                        (fecha, hora, total, metodo_pago, id_cliente)
+                    )
+                    venta_id = cursor.lastrowid
+                    
+                    cursor.executemany(
+                        """
+                        INSERT INTO detalle_ventas (venta_id, producto_id, cantidad, precio_unitario, subtotal)
+                        VALUES (%s, %s, %s, %s, %s)
+                        """,
+                        [(venta_id, producto_id, cantidad, a_decimal(precio), a_decimal(subtotal))
+                         for producto_id, cantidad, precio, subtotal in detalles]
+                    )
+                    
+                    acumular_venta(cursor, venta_id, self.dialecto)
+                    
+                    conexion.commit()
+                finally:
+                    cursor.close()
+            registro.info("✓ Venta registrada con ID: %s", venta_id)
+            return venta_id
+        except Error as e:
+            registro.error("✗ Error al registrar la venta: %s", e)
             return 0
-        finally:
-            if cursor:
-                cursor.close()
\ No newline at end of file
@@ -0,0 +1,148 @@
+"""
+Consultas de reportes por rango de fechas
+
+Todas las consultas filtran con rangos semiabiertos (fecha >= inicio AND
+fecha < fin) sobre la columna sin envolverla en funciones, para que MySQL
+pueda usar los índices por fecha. Las agregaciones leen de las tablas de
+resumen (ver database/resumenes.py).
+"""
+
+from datetime import datetime, timedelta
+
+
+class RangoFechas:
+    """Periodo [inicio, fin) de fechas"""
+    
+    def __init__(self, inicio, fin):
+        if fin <= inicio:
+            raise ValueError("La fecha final debe ser posterior a la inicial")
+        self.inicio = inicio
+        self.fin = fin
+    
+    @classmethod
+    def dia(cls, fecha):
+        """Un solo día"""
+        return cls(fecha, fecha + timedelta(days=1))
+    
+    @classmethod
+    def mes(cls, fecha):
+        """El mes calendario que contiene la fecha"""
+        inicio = fecha.replace(day=1)
+        fin = (inicio + timedelta(days=32)).replace(day=1)
+        return cls(inicio, fin)
+    
+    @classmethod
+    def hoy(cls):
+        """El día de hoy"""
+        return cls.dia(datetime.now().date())
+    
+    @classmethod
+    def mes_actual(cls):
+        """El mes en curso"""
+        return cls.mes(datetime.now().date())
+    
+    @classmethod
+    def desde_texto(cls, desde, hasta):
+        """
+        Crea un rango desde texto YYYY-MM-DD; hasta es inclusivo
+        
+        Raises:
+            ValueError: Si las fechas no son válidas
+        """
+        inicio = datetime.strptime(desde.strip(), '%Y-%m-%d').date()
+        final = datetime.strptime(hasta.strip(), '%Y-%m-%d').date() if hasta.strip() else inicio
+        return cls(inicio, final + timedelta(days=1))
+    
+    def condicion(self, columna):
+        """Condición SQL semiabierta y sus parámetros"""
+        return f"{columna} >= %s AND {columna} < %s", (self.inicio, self.fin)
+    
+    def __eq__(self, otro):
+        return isinstance(otro, RangoFechas) and (self.inicio, self.fin) == (otro.inicio, otro.fin)
+    
+    def __hash__(self):
+        return hash((self.inicio, self.fin))
+    
+    def __str__(self):
+        ultimo = self.fin - timedelta(days=1)
+        if ultimo == self.inicio:
+            return str(self.inicio)
+        return f"{self.inicio} a {ultimo}"
+
+
+SQL_VENTAS = """
+    SELECT
+        v.id,
+        v.fecha,
+        v.hora,
+        v.total,
+        v.metodo_pago,
+        COUNT(dv.id) as cantidad_productos
+    FROM ventas v
+    LEFT JOIN detalle_ventas dv ON v.id = dv.venta_id
+    WHERE {condicion}
+    GROUP BY v.id
+"""
+
+
+def ventas_del_periodo(bd, rango):
+    """Ventas individuales del periodo con su cantidad de líneas"""
+    condicion, parametros = rango.condicion("v.fecha")
+    sql = SQL_VENTAS.format(condicion=condicion) + " ORDER BY v.fecha, v.hora"
+    return bd.ejecutar_consulta(sql, parametros)
+
+
+def pagina_ventas_del_periodo(bd, rango, despues_de=None, tamaño_pagina=500):
+    """
+    Una página de las ventas del periodo, en orden de factura
+    
+    Returns:
+        (ventas, siguiente) como ConexionBD.consultar_pagina
+    """
+    condicion, parametros = rango.condicion("v.fecha")
+    sql = SQL_VENTAS.format(condicion=f"{condicion} AND {{pagina}}")
+    return bd.consultar_pagina(sql, parametros, 'v.id', despues_de, tamaño_pagina)
+
+
+def ventas_nuevas(bd, rango, despues_de):
+    """Ventas del periodo con id mayor a despues_de, en orden de id"""
+    condicion, parametros = rango.condicion("v.fecha")
+    sql = SQL_VENTAS.format(condicion=f"v.id > %s AND {condicion}") + " ORDER BY v.id"
+    return bd.ejecutar_consulta(sql, (despues_de,) + parametros)
+
+
+def productos_stock_bajo(bd):
+    """Productos activos con stock en o por debajo del mínimo"""
+    sql = """
+        SELECT
+            p.id,
+            p.nombre,
+            c.nombre as categoria,
+            p.stock,
+            p.stock_minimo,
+            p.fecha_vencimiento
+        FROM productos p
+        JOIN categorias c ON p.categoria_id = c.id
+        WHERE p.stock <= p.stock_minimo AND p.activo = TRUE
+        ORDER BY p.stock ASC
+    """
+    return bd.ejecutar_consulta(sql)
+
+
+def totales_del_periodo(bd, rango):
+    """
+    Cantidad y total de ventas del periodo según resumen_ventas_hora
+    
+    Returns:
+        Diccionario con cantidad y total, o None si la consulta falló
+    """
+    condicion, parametros = rango.condicion("fecha")
+    sql = f"""
+        SELECT
+            SUM(cantidad_ventas) as cantidad,
+            SUM(total) as total
+        FROM resumen_ventas_hora
+        WHERE {condicion}
+    """
+    resultado = bd.ejecutar_consulta(sql, parametros)
+    return resultado[0] if resultado else None
@@ -0,0 +1,391 @@
+"""
+Diario local de ventas y sincronización en segundo plano
+
+Con la base de datos en línea la caja registra cada venta directamente
+(el stock se valida en la transacción, como sin diario). Solo si la base
+de datos no responde, la venta se escribe en un archivo de solo agregado
+(una línea JSON por venta, con fsync) y la caja sigue vendiendo. Un hilo
+sincronizador, el único que prueba la conexión, reenvía las ventas pendientes por lotes con
+ConexionBD.registrar_venta; cada venta lleva un id_cliente generado por
+la caja, así que reenviar una venta ya registrada no la duplica.
+
+Archivos (junto a la ruta del diario):
+    diario_ventas.jsonl             Ventas cobradas
+    diario_ventas.jsonl.pos         Bytes del diario ya sincronizados
+    diario_ventas.jsonl.conflictos  Ventas registradas con stock insuficiente
+                                    o que la base de datos rechazó
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import date, datetime
+from decimal import Decimal
+
+from database.reservas import StockInsuficienteError
+
+# Mensajes ✓/✗; ver instrumentacion.configurar_mensajes
+registro = logging.getLogger(__name__)
+
+
+class DiarioVentas:
+    """Archivo de solo agregado con las ventas cobradas en esta caja"""
+    
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self.ruta_posicion = ruta + ".pos"
+        self.ruta_conflictos = ruta + ".conflictos"
+        self._candado = threading.Lock()
+        
+        with self._candado:
+            self._reparar_cola()
+            self.posicion = self._leer_posicion()
+            self.pendientes = self._contar_pendientes()
+    
+    def registrar(self, fecha, hora, metodo_pago, lineas, id_cliente=None):
+        """
+        Agrega una venta al diario y espera a que llegue al disco
+        
+        Args:
+            fecha: Fecha de la venta
+            hora: Hora de la venta
+            metodo_pago: Método de pago
+            lineas: Lista de diccionarios con producto_id, cantidad,
+                    precio_unitario, subtotal y opcionalmente reserva_id
+            id_cliente: ID ya generado por la caja (uno nuevo si no se da)
+        
+        Returns:
+            id_cliente de la venta
+        """
+        venta = {
+            'id_cliente': id_cliente or uuid.uuid4().hex,
+            'fecha': str(fecha),
+            'hora': hora.strftime('%H:%M:%S') if hasattr(hora, 'strftime') else str(hora),
+            'metodo_pago': metodo_pago,
+            'lineas': [
+                {
+                    'producto_id': linea['producto_id'],
+                    'cantidad': linea['cantidad'],
+                    'precio_unitario': str(linea['precio_unitario']),
+                    'subtotal': str(linea['subtotal']),
+                    'reserva_id': linea.get('reserva_id')
+                }
+                for linea in lineas
+            ]
+        }
+        texto = json.dumps(venta, ensure_ascii=False) + "\n"
+        
+        with self._candado:
+            with open(self.ruta, 'a', encoding='utf-8') as archivo:
+                archivo.write(texto)
+                archivo.flush()
+                os.fsync(archivo.fileno())
+            self.pendientes += 1
+        return venta['id_cliente']
+    
+    def leer_pendientes(self, limite):
+        """
+        Lee las primeras ventas aún no sincronizadas
+        
+        Returns:
+            Lista de (venta, posición al final de su línea)
+        """
+        with self._candado:
+            if not os.path.exists(self.ruta):
+                return []
+            ventas = []
+            with open(self.ruta, 'rb') as archivo:
+                archivo.seek(self.posicion)
+                posicion = self.posicion
+                for linea in archivo:
+                    posicion += len(linea)
+                    ventas.append((self._decodificar(linea), posicion))
+                    if len(ventas) >= limite:
+                        break
+            return ventas
+    
+    def confirmar(self, posicion, cantidad):
+        """
+        Marca como sincronizado todo lo anterior a la posición
+        
+        Si ya no queda nada pendiente el diario se vacía.
+        """
+        with self._candado:
+            self.pendientes -= cantidad
+            if self.pendientes == 0 and posicion == os.path.getsize(self.ruta):
+                # Todo sincronizado: empezar un diario nuevo
+                with open(self.ruta, 'w', encoding='utf-8') as archivo:
+                    os.fsync(archivo.fileno())
+                posicion = 0
+            self.posicion = posicion
+            self._guardar_posicion()
+    
+    def registrar_conflicto(self, venta, motivo, detalle):
+        """Anota una venta que se sincronizó con problemas"""
+        registro = {
+            'fecha_sincronizacion': datetime.now().isoformat(timespec='seconds'),
+            'id_cliente': venta['id_cliente'],
+            'motivo': motivo,
+            'detalle': detalle,
+            'venta': venta
+        }
+        with self._candado:
+            with open(self.ruta_conflictos, 'a', encoding='utf-8') as archivo:
+                archivo.write(json.dumps(registro, ensure_ascii=False, default=str) + "\n")
+    
+    def _decodificar(self, linea):
+        """Convierte una línea del diario en los tipos de registrar_venta"""
+        venta = json.loads(linea)
+        venta['fecha'] = date.fromisoformat(venta['fecha'])
+        for detalle in venta['lineas']:
+            detalle['precio_unitario'] = Decimal(detalle['precio_unitario'])
+            detalle['subtotal'] = Decimal(detalle['subtotal'])
+        return venta
+    
+    def _reparar_cola(self):
+        """Quita una última línea incompleta (corte de luz a media escritura)"""
+        if not os.path.exists(self.ruta):
+            return
+        with open(self.ruta, 'rb+') as archivo:
+            contenido = archivo.read()
+            if contenido and not contenido.endswith(b"\n"):
+                # Esa venta no llegó a confirmarse en la caja
+                archivo.truncate(contenido.rfind(b"\n") + 1)
+                os.fsync(archivo.fileno())
+    
+    def _leer_posicion(self):
+        """Posición sincronizada guardada, 0 si no hay"""
+        try:
+            with open(self.ruta_posicion, encoding='utf-8') as archivo:
+                posicion = int(archivo.read().strip() or 0)
+        except (OSError, ValueError):
+            return 0
+        tamaño = os.path.getsize(self.ruta) if os.path.exists(self.ruta) else 0
+        return posicion if posicion <= tamaño else 0
+    
+    def _guardar_posicion(self):
+        """Guarda la posición de forma atómica (archivo temporal + replace)"""
+        temporal = self.ruta_posicion + ".tmp"
+        with open(temporal, 'w', encoding='utf-8') as archivo:
+            archivo.write(str(self.posicion))
+            archivo.flush()
+            os.fsync(archivo.fileno())
+        os.replace(temporal, self.ruta_posicion)
+    
+    def _contar_pendientes(self):
+        """Cantidad de líneas después de la posición sincronizada"""
+        if not os.path.exists(self.ruta):
+            return 0
+        with open(self.ruta, 'rb') as archivo:
+            archivo.seek(self.posicion)
+            return sum(1 for _ in archivo)
+
+
+class SincronizadorVentas:
+    """Hilo que reenvía las ventas del diario a la base de datos"""
+    
+    INTENTOS_POR_VENTA = 3      # Rechazos con la BD en línea antes de apartarla
+    ESPERA_MAXIMA = 60          # Segundos entre reintentos de conexión
+    
+    def __init__(self, bd, diario, intervalo=5, tamaño_lote=50):
+        """
+        Args:
+            bd: ConexionBD (puede estar desconectada)
+            diario: DiarioVentas de esta caja
+            intervalo: Segundos entre revisiones si nadie avisa
+            tamaño_lote: Ventas por lote antes de guardar la posición
+        """
+        self.bd = bd
+        self.diario = diario
+        self.intervalo = intervalo
+        self.tamaño_lote = tamaño_lote
+        
+        self.sincronizadas = 0
+        self.conflictos = 0
+        self.en_linea = bd.pool is not None
+        self.ultimo_lote = None     # {'ventas', 'segundos', 'ventas_por_segundo'}
+        
+        self._intentos = {}         # id_cliente -> rechazos
+        self._sobreventas = deque() # Ventas forzadas aún no mostradas en la caja
+        self._aviso = threading.Event()
+        self._detener = threading.Event()
+        self._hilo = None
+    
+    def iniciar(self):
+        """Arranca el hilo sincronizador"""
+        self._hilo = threading.Thread(target=self._ciclo, name="sincronizador", daemon=True)
+        self._hilo.start()
+    
+    def avisar(self):
+        """Pide sincronizar ya (por ejemplo, después de cobrar)"""
+        self._aviso.set()
+    
+    def detener(self, tiempo_espera=5):
+        """Detiene el hilo; lo pendiente queda en el diario"""
+        self._detener.set()
+        self._aviso.set()
+        if self._hilo:
+            self._hilo.join(tiempo_espera)
+    
+    def cobrar(self, fecha, hora, metodo_pago, lineas):
+        """
+        Registra una venta en la base de datos o, si no responde, en el diario
+        
+        En línea el stock se valida en la misma transacción, así que dos
+        cajas no venden las mismas últimas unidades. Sin conexión la venta
+        va directo al diario: solo el hilo sincronizador prueba la conexión,
+        para que la caja no espere tiempos de conexión al cobrar.
+        
+        Returns:
+            (venta_id, None) si se registró en línea, (None, id_cliente) si
+            quedó en el diario
+        
+        Raises:
+            StockInsuficienteError: Si otra caja vendió las unidades
+        """
+        id_cliente = uuid.uuid4().hex
+        if self.en_linea and self.bd.pool is not None:
+            venta_id = self.bd.registrar_venta(fecha, hora, metodo_pago, lineas, id_cliente=id_cliente)
+            if venta_id:
+                return venta_id, None
+            # Sin probar la conexión aquí: el sincronizador decide si volvió.
+            # Si la base de datos rechaza la venta, se aparta como conflicto
+            # después de INTENTOS_POR_VENTA
+            self.en_linea = False
+        
+        # Mismo id_cliente: si la venta sí alcanzó a registrarse no se duplica
+        self.diario.registrar(fecha, hora, metodo_pago, lineas, id_cliente)
+        self.avisar()
+        return None, id_cliente
+    
+    def tomar_sobreventas(self):
+        """
+        Ventas del diario registradas con stock insuficiente desde la última llamada
+        
+        Returns:
+            Lista de diccionarios con id_cliente, fecha, hora y fallidos
+        """
+        sobreventas = []
+        while self._sobreventas:
+            sobreventas.append(self._sobreventas.popleft())
+        return sobreventas
+    
+    def estado(self):
+        """Resumen para mostrar en la caja"""
+        return {
+            'en_linea': self.en_linea,
+            'pendientes': self.diario.pendientes,
+            'sincronizadas': self.sincronizadas,
+            'conflictos': self.conflictos,
+            'ultimo_lote': self.ultimo_lote
+        }
+    
+    def sincronizar(self):
+        """
+        Reenvía todas las ventas pendientes, lote por lote
+        
+        Returns:
+            Cantidad de ventas sincronizadas en esta pasada
+        """
+        total = 0
+        while not self._detener.is_set():
+            lote = self.diario.leer_pendientes(self.tamaño_lote)
+            if not lote:
+                break
+            
+            inicio = time.perf_counter()
+            procesadas, posicion = 0, None
+            for venta, fin in lote:
+                if not self._enviar(venta):
+                    break
+                procesadas += 1
+                posicion = fin
+            
+            if procesadas:
+                self.diario.confirmar(posicion, procesadas)
+                segundos = time.perf_counter() - inicio
+                self.ultimo_lote = {
+                    'ventas': procesadas,
+                    'segundos': round(segundos, 4),
+                    'ventas_por_segundo': round(procesadas / segundos, 1) if segundos else None
+                }
+                total += procesadas
+            if procesadas < len(lote):
+                # La base de datos dejó de responder: reintentar después
+                break
+        return total
+    
+    def _enviar(self, venta):
+        """
+        Registra una venta del diario
+        
+        Returns:
+            True si la venta quedó resuelta (registrada o apartada como
+            conflicto), False si hay que reintentar más tarde
+        """
+        argumentos = (venta['fecha'], venta['hora'], venta['metodo_pago'], venta['lineas'])
+        try:
+            venta_id = self.bd.registrar_venta(*argumentos, id_cliente=venta['id_cliente'])
+        except StockInsuficienteError as e:
+            # La mercancía ya salió de la tienda: se registra igual y se avisa
+            venta_id = self.bd.registrar_venta(*argumentos, id_cliente=venta['id_cliente'], forzar_stock=True)
+            if venta_id:
+                self.diario.registrar_conflicto(venta, 'stock_insuficiente', e.fallidos)
+                self.conflictos += 1
+                self._sobreventas.append({
+                    'id_cliente': venta['id_cliente'],
+                    'fecha': venta['fecha'],
+                    'hora': venta['hora'],
+                    'fallidos': e.fallidos
+                })
+        
+        if venta_id:
+            self._intentos.pop(venta['id_cliente'], None)
+            self.sincronizadas += 1
+            return True
+        
+        # ¿Se cayó la conexión o la base de datos rechaza esta venta?
+        self.en_linea = self.bd.responde()
+        if not self.en_linea:
+            return False
+        
+        intentos = self._intentos.get(venta['id_cliente'], 0) + 1
+        self._intentos[venta['id_cliente']] = intentos
+        if intentos < self.INTENTOS_POR_VENTA:
+            return False
+        
+        # No bloquear el resto del diario por una venta que siempre falla
+        self._intentos.pop(venta['id_cliente'], None)
+        self.diario.registrar_conflicto(venta, 'rechazada', "La base de datos no aceptó la venta")
+        self.conflictos += 1
+        return True
+    
+    def _ciclo(self):
+        """Cuerpo del hilo: sincroniza al recibir aviso o cada intervalo"""
+        espera = self.intervalo
+        while not self._detener.is_set():
+            self._aviso.wait(espera)
+            self._aviso.clear()
+            if self._detener.is_set():
+                break
+            
+            # Única prueba de conexión, con tiempo de espera corto; la caja
+            # solo lee en_linea y sin conexión cobra directo al diario
+            en_linea = self.bd.responde()
+            if en_linea and self.bd.pool is None:
+                en_linea = self.bd.conectar() is not None
+            self.en_linea = en_linea
+            if not en_linea:
+                espera = min(espera * 2, self.ESPERA_MAXIMA)
+                continue
+            
+            espera = self.intervalo
+            try:
+                self.sincronizar()
+            except Exception as e:
+                # El hilo no debe morir: lo pendiente sigue en el diario
+                registro.error("✗ Error al sincronizar ventas: %s", e)
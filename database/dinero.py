@@ -0,0 +1,153 @@
+"""
+Importes en centavos enteros
+
+El dinero se guarda y se suma como enteros de centavos: sumar miles de
+ventas no acumula errores de redondeo y los caminos calientes (carrito,
+tablero, ranking) hacen aritmética de int en lugar de Decimal. Se redondea
+solo al entrar (precios de la BD como Decimal, float de SQLite o texto
+capturado) y se convierte solo al salir: a Decimal para la BD o a texto
+para la pantalla.
+
+Reglas de redondeo, siempre al centavo y con la mitad hacia arriba:
+- Precios leídos o capturados: a_centavos / Dinero.de.
+- Impuestos y descuentos por porcentaje: Dinero.porcentaje sobre el
+  subtotal de cada línea, y después se suman las líneas (nunca sobre el
+  total ya sumado).
+- Un importe repartido entre líneas (un descuento global): Dinero.repartir
+  asigna los centavos sobrantes a las primeras partes, de modo que la suma
+  de las partes es exactamente el importe.
+"""
+
+import functools
+import operator
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+
+def a_centavos(valor):
+    """
+    Centavos enteros de un importe en pesos (Decimal, float, int o texto)
+    
+    Raises:
+        ValueError: Si el texto no es un número
+    """
+    try:
+        return int((Decimal(str(valor).strip()) * 100).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+    except InvalidOperation:
+        raise ValueError(f"Importe inválido: {valor!r}") from None
+
+
+def a_decimal(centavos):
+    """Decimal con dos decimales a partir de centavos (1234 -> 12.34)"""
+    return Decimal(centavos).scaleb(-2)
+
+
+def formato(centavos):
+    """Texto para la pantalla ($12.34), sin pasar por float"""
+    signo = "-" if centavos < 0 else ""
+    pesos, resto = divmod(abs(centavos), 100)
+    return f"${signo}{pesos}.{resto:02d}"
+
+
+@functools.total_ordering
+class Dinero:
+    """Importe inmutable en centavos enteros"""
+    
+    __slots__ = ('centavos',)
+    
+    def __init__(self, centavos=0):
+        """
+        Args:
+            centavos: Entero (también numpy); para pesos usar Dinero.de
+        """
+        object.__setattr__(self, 'centavos', operator.index(centavos))
+    
+    @classmethod
+    def de(cls, valor):
+        """Dinero a partir de pesos, redondeando al centavo"""
+        return cls(a_centavos(valor))
+    
+    def a_decimal(self):
+        """Decimal para guardar en columnas DECIMAL(…, 2)"""
+        return a_decimal(self.centavos)
+    
+    def porcentaje(self, tasa):
+        """
+        Parte proporcional redondeada al centavo (impuestos y descuentos)
+        
+        Args:
+            tasa: Fracción como Decimal, texto o int ('0.16' para 16%)
+        """
+        parte = Decimal(self.centavos) * Decimal(str(tasa))
+        return Dinero(int(parte.quantize(Decimal(1), rounding=ROUND_HALF_UP)))
+    
+    def repartir(self, pesos):
+        """
+        Reparte el importe en proporción a los pesos sin perder centavos
+        
+        Args:
+            pesos: Enteros no negativos (por ejemplo, subtotales en centavos)
+        
+        Returns:
+            Lista de Dinero, una parte por peso, que suma exactamente el importe
+        """
+        suma = sum(pesos)
+        if not suma:
+            return [Dinero() for _ in pesos]
+        partes = [self.centavos * peso // suma for peso in pesos]
+        for i in range(self.centavos - sum(partes)):
+            partes[i] += 1
+        return [Dinero(parte) for parte in partes]
+    
+    def __setattr__(self, nombre, valor):
+        raise AttributeError("Dinero es inmutable")
+    
+    def __add__(self, otro):
+        if isinstance(otro, Dinero):
+            return Dinero(self.centavos + otro.centavos)
+        if isinstance(otro, int) and otro == 0:
+            # sum() empieza con 0
+            return self
+        return NotImplemented
+    
+    __radd__ = __add__
+    
+    def __sub__(self, otro):
+        if isinstance(otro, Dinero):
+            return Dinero(self.centavos - otro.centavos)
+        return NotImplemented
+    
+    def __neg__(self):
+        return Dinero(-self.centavos)
+    
+    def __mul__(self, cantidad):
+        if isinstance(cantidad, int) and not isinstance(cantidad, bool):
+            return Dinero(self.centavos * cantidad)
+        return NotImplemented
+    
+    __rmul__ = __mul__
+    
+    def __eq__(self, otro):
+        if isinstance(otro, Dinero):
+            return self.centavos == otro.centavos
+        return NotImplemented
+    
+    def __lt__(self, otro):
+        if isinstance(otro, Dinero):
+            return self.centavos < otro.centavos
+        return NotImplemented
+    
+    def __hash__(self):
+        return hash(self.centavos)
+    
+    def __bool__(self):
+        return self.centavos != 0
+    
+    def __float__(self):
+        """Solo para gráficas y cálculos aproximados"""
+        return self.centavos / 100
+    
+    def __str__(self):
+        return formato(self.centavos)
+    
+    def __repr__(self):
+        return f"Dinero('{self.a_decimal()}')"
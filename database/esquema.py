@@ -0,0 +1,125 @@
+"""
+Creación del esquema para el motor SQLite
+
+Aplica bd_sqlite.sql y carga las mismas categorías y productos iniciales
+que bd.sql, tomando sus INSERT y traduciendo las fechas de MySQL. Si la
+base de datos ya existía solo agrega las columnas que le falten
+(equivalente a migraciones.sql).
+"""
+
+import logging
+import os
+import re
+
+
+CARPETA = os.path.dirname(os.path.abspath(__file__))
+
+# INSERT de datos iniciales dentro de bd.sql
+PATRON_SEMILLAS = re.compile(r"^INSERT INTO (?:categorias|productos) .*?;\s*$", re.S | re.M)
+
+# DATE_ADD(CURDATE(), INTERVAL 180 DAY) -> date('now', 'localtime', '+180 days')
+PATRON_FECHA = re.compile(r"DATE_ADD\(CURDATE\(\), INTERVAL (\d+) DAY\)")
+
+# Mensajes ✓/✗; ver instrumentacion.configurar_mensajes
+registro = logging.getLogger(__name__)
+
+# (tabla, columna, sentencias) para bases creadas con una versión anterior
+MIGRACIONES_SQLITE = [
+    ('ventas', 'id_cliente', [
+        "ALTER TABLE ventas ADD COLUMN id_cliente CHAR(32)",
+        "CREATE UNIQUE INDEX IF NOT EXISTS uk_id_cliente ON ventas(id_cliente)",
+    ]),
+    ('productos', 'codigo_barras', [
+        "ALTER TABLE productos ADD COLUMN codigo_barras VARCHAR(32)",
+        "CREATE UNIQUE INDEX IF NOT EXISTS uk_codigo_barras ON productos(codigo_barras)",
+        # El disparador también debe reaccionar a la columna nueva
+        "DROP TRIGGER IF EXISTS productos_fecha_modificacion",
+        """
+        CREATE TRIGGER productos_fecha_modificacion
+        AFTER UPDATE OF nombre, categoria_id, precio_compra, precio_venta, stock,
+                        stock_minimo, fecha_vencimiento, activo, codigo_barras ON productos
+        BEGIN
+            UPDATE productos
+            SET fecha_modificacion = strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime')
+            WHERE id = NEW.id;
+        END
+        """,
+    ]),
+    # Tabla nueva: PRAGMA table_info de una tabla inexistente no trae columnas
+    ('ajustes_productos', 'id', [
+        """
+        CREATE TABLE ajustes_productos (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            descripcion VARCHAR(255) NOT NULL,
+            campo VARCHAR(30) NOT NULL,
+            productos INT NOT NULL DEFAULT 0,
+            fecha TIMESTAMP DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime')),
+            fecha_reversion DATETIME
+        )
+        """,
+        """
+        CREATE TABLE ajustes_productos_detalle (
+            ajuste_id INT NOT NULL REFERENCES ajustes_productos(id),
+            producto_id INT NOT NULL REFERENCES productos(id),
+            valor_anterior DECIMAL(12,2),
+            valor_nuevo DECIMAL(12,2) NOT NULL,
+            PRIMARY KEY (ajuste_id, producto_id)
+        )
+        """,
+    ]),
+]
+
+# Índices agregados después; IF NOT EXISTS permite ejecutarlos en cada apertura
+INDICES_SQLITE = [
+    "CREATE INDEX IF NOT EXISTS idx_producto_cubriente "
+    "ON detalle_ventas(producto_id, venta_id, cantidad, subtotal)",
+]
+
+
+def leer_sql(nombre):
+    """Contenido de un archivo .sql de esta carpeta"""
+    with open(os.path.join(CARPETA, nombre), encoding='utf-8') as archivo:
+        return archivo.read()
+
+
+def semillas_sqlite():
+    """INSERT de categorías y productos de bd.sql traducidos a SQLite"""
+    sentencias = PATRON_SEMILLAS.findall(leer_sql('bd.sql'))
+    return [PATRON_FECHA.sub(r"date('now', 'localtime', '+\1 days')", s) for s in sentencias]
+
+
+def crear_esquema_sqlite(conexion):
+    """
+    Crea tablas, índices y datos iniciales si la base de datos está vacía
+    
+    Args:
+        conexion: Conexión sqlite3
+    
+    Returns:
+        True si se creó el esquema
+    """
+    existe = conexion.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'productos'"
+    ).fetchone()
+    if existe:
+        migrar_sqlite(conexion)
+        return False
+    
+    conexion.executescript(leer_sql('bd_sqlite.sql'))
+    with conexion:
+        for sentencia in semillas_sqlite():
+            conexion.execute(sentencia)
+    registro.info("✓ Base de datos SQLite creada con los datos iniciales")
+    return True
+
+
+def migrar_sqlite(conexion):
+    """Agrega las columnas e índices nuevos a una base de datos SQLite existente"""
+    with conexion:
+        for tabla, columna, sentencias in MIGRACIONES_SQLITE:
+            columnas = {fila[1] for fila in conexion.execute(f"PRAGMA table_info({tabla})")}
+            if columna not in columnas:
+                for sentencia in sentencias:
+                    conexion.execute(sentencia)
+        for sentencia in INDICES_SQLITE:
+            conexion.execute(sentencia)
@@ -0,0 +1,669 @@
+"""
+Importación y exportación masiva del catálogo (CSV o XLSX)
+
+El archivo se lee fila por fila y se escribe en lotes de TAMAÑO_LOTE con
+INSERT ... ON DUPLICATE KEY UPDATE (ON CONFLICT en SQLite), todo dentro de
+una sola transacción: si algo falla no queda media lista aplicada.
+
+Cada fila se identifica por su id o, si no trae id, por su código de
+barras (las listas de proveedores traen solo el código). Las celdas vacías
+y las columnas que no vienen conservan el valor actual del producto, de
+modo que una lista con código y precios basta para actualizar precios.
+Una fila que no coincide con ningún producto se da de alta y necesita
+nombre, categoría y ambos precios.
+
+Antes de escribir se compara cada fila con el producto actual (cargado
+una vez en memoria, junto con las categorías por nombre sin acentos): las
+filas sin cambios no se envían y la simulación muestra qué cambiaría sin
+tocar la base de datos.
+
+    python -m database.importacion importar lista.csv --simular
+    python -m database.importacion importar lista.xlsx
+    python -m database.importacion exportar catalogo.csv
+
+XLSX requiere openpyxl (opcional); CSV no necesita nada adicional.
+"""
+
+import argparse
+import csv
+import logging
+import os
+import sys
+import time
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+
+from database.busqueda import normalizar
+from database.dinero import a_centavos, a_decimal, formato
+from database.motores import Error
+
+# Mensajes ✓/✗; ver instrumentacion.configurar_mensajes
+registro = logging.getLogger(__name__)
+
+
+TAMAÑO_LOTE = 1000          # Filas por executemany
+MAXIMO_MUESTRAS = 500       # Cambios y errores que se guardan para mostrar
+
+# Columnas del archivo, en el orden en que se exportan
+COLUMNAS = (
+    'id', 'codigo_barras', 'nombre', 'categoria', 'precio_compra', 'precio_venta',
+    'stock', 'stock_minimo', 'fecha_vencimiento', 'activo'
+)
+
+# Otros encabezados aceptados (ya normalizados: sin acentos, con _)
+SINONIMOS = {
+    'codigo': 'codigo_barras',
+    'codigo_de_barras': 'codigo_barras',
+    'producto': 'nombre',
+    'costo': 'precio_compra',
+    'precio': 'precio_venta',
+    'existencia': 'stock',
+    'conteo': 'stock',
+    'minimo': 'stock_minimo',
+    'vencimiento': 'fecha_vencimiento',
+}
+
+# Campos de productos que se comparan y se escriben
+CAMPOS = (
+    'codigo_barras', 'nombre', 'categoria_id', 'precio_compra', 'precio_venta',
+    'stock', 'stock_minimo', 'fecha_vencimiento', 'activo'
+)
+
+PRECIOS = ('precio_compra', 'precio_venta')
+
+REQUERIDOS_NUEVO = ('nombre', 'categoria', 'precio_compra', 'precio_venta')
+
+VALORES_NUEVO = {
+    'codigo_barras': None,
+    'stock': 0,
+    'stock_minimo': 5,
+    'fecha_vencimiento': None,
+    'activo': True,
+}
+
+SQL_EXISTENTES = f"SELECT id, {', '.join(CAMPOS)} FROM productos"
+
+SQL_EXPORTAR = """
+    SELECT p.id, p.codigo_barras, p.nombre, c.nombre as categoria,
+           p.precio_compra, p.precio_venta, p.stock, p.stock_minimo,
+           p.fecha_vencimiento, p.activo
+    FROM productos p
+    JOIN categorias c ON p.categoria_id = c.id
+    ORDER BY p.id
+"""
+
+VERDADEROS = {'1', 'si', 'true', 'verdadero', 'x'}
+FALSOS = {'0', 'no', 'false', 'falso'}
+
+
+# ---------------------------------------------------------------------------
+# Lectura y escritura de archivos
+# ---------------------------------------------------------------------------
+
+def leer_filas(ruta, detalles=None):
+    """
+    Recorre las filas de un CSV o XLSX sin cargarlo completo
+    
+    Args:
+        ruta: Archivo CSV o XLSX
+        detalles: Diccionario donde anotar el 'delimitador' del CSV (opcional)
+    
+    Yields:
+        Diccionario encabezado -> celda por fila (la primera fila son los encabezados)
+    
+    Raises:
+        ValueError: Si el formato no se reconoce o falta openpyxl para XLSX
+    """
+    if _es_xlsx(ruta):
+        yield from _leer_xlsx(ruta)
+        return
+    
+    # utf-8-sig: los CSV guardados desde Excel empiezan con BOM
+    with open(ruta, newline='', encoding='utf-8-sig') as archivo:
+        muestra = archivo.read(4096)
+        archivo.seek(0)
+        try:
+            # Excel en español separa con punto y coma
+            formato_csv = csv.Sniffer().sniff(muestra, delimiters=',;\t')
+        except csv.Error:
+            formato_csv = csv.excel
+        if detalles is not None:
+            detalles['delimitador'] = formato_csv.delimiter
+        yield from csv.DictReader(archivo, dialect=formato_csv)
+
+
+def leer_columnas(ruta, ignoradas=None):
+    """
+    Filas de leer_filas con los encabezados traducidos a COLUMNAS
+    
+    Args:
+        ruta: Archivo CSV o XLSX
+        ignoradas: Lista donde anotar los encabezados desconocidos (opcional)
+    
+    Yields:
+        (número de fila en el archivo, {columna: celda}) sin las celdas vacías
+    """
+    columnas = None
+    detalles = {}
+    for numero, fila in enumerate(leer_filas(ruta, detalles), start=2):
+        if columnas is None:
+            columnas = {}
+            for encabezado in fila:
+                nombre = normalizar(encabezado or "").replace(" ", "_")
+                nombre = SINONIMOS.get(nombre, nombre)
+                if nombre in COLUMNAS:
+                    columnas[encabezado] = nombre
+                elif ignoradas is not None:
+                    ignoradas.append(str(encabezado))
+            if not columnas:
+                raise ValueError(f"El archivo no tiene ninguna columna conocida ({', '.join(COLUMNAS)})")
+            # Excel en español separa con punto y coma y escribe 1.234,50
+            coma_decimal = detalles.get('delimitador') == ';'
+        celdas = {columnas[k]: v for k, v in fila.items() if k in columnas and not _vacia(v)}
+        if coma_decimal:
+            for columna in PRECIOS:
+                texto = celdas.get(columna)
+                if isinstance(texto, str) and ',' in texto:
+                    celdas[columna] = texto.replace('.', '').replace(',', '.')
+        yield numero, celdas
+
+
+def _leer_xlsx(ruta):
+    openpyxl = _importar_openpyxl()
+    libro = openpyxl.load_workbook(ruta, read_only=True, data_only=True)
+    try:
+        filas = libro.active.iter_rows(values_only=True)
+        encabezados = [str(celda or "") for celda in next(filas, ())]
+        for fila in filas:
+            if any(celda is not None for celda in fila):
+                yield dict(zip(encabezados, fila))
+    finally:
+        libro.close()
+
+
+def escribir_filas(ruta, encabezados, filas):
+    """
+    Escribe un CSV o XLSX fila por fila
+    
+    Args:
+        ruta: Archivo de salida (.csv o .xlsx)
+        encabezados: Primera fila
+        filas: Iterable de tuplas (puede ser un generador)
+    
+    Returns:
+        Cantidad de filas escritas (sin contar encabezados)
+    """
+    escritas = 0
+    if _es_xlsx(ruta):
+        openpyxl = _importar_openpyxl()
+        # write_only: las filas van directo al archivo en lugar de quedar en memoria
+        libro = openpyxl.Workbook(write_only=True)
+        hoja = libro.create_sheet("Productos")
+        hoja.append(list(encabezados))
+        for fila in filas:
+            hoja.append(list(fila))
+            escritas += 1
+        libro.save(ruta)
+        return escritas
+    
+    with open(ruta, 'w', newline='', encoding='utf-8-sig') as archivo:
+        escritor = csv.writer(archivo)
+        escritor.writerow(encabezados)
+        for fila in filas:
+            escritor.writerow(fila)
+            escritas += 1
+    return escritas
+
+
+def _es_xlsx(ruta):
+    return os.path.splitext(ruta)[1].lower() in ('.xlsx', '.xlsm')
+
+
+def _importar_openpyxl():
+    try:
+        import openpyxl
+    except ImportError:
+        raise ValueError("Para archivos XLSX instala openpyxl (pip install openpyxl) o usa CSV") from None
+    return openpyxl
+
+
+# ---------------------------------------------------------------------------
+# Conversión de celdas
+# ---------------------------------------------------------------------------
+
+def _vacia(valor):
+    return valor is None or (isinstance(valor, str) and not valor.strip())
+
+
+def _entero(valor):
+    """int desde texto o número de Excel (12.0), sin aceptar fracciones"""
+    try:
+        numero = Decimal(str(valor).strip())
+    except InvalidOperation:
+        raise ValueError(f"no es un número: {valor!r}") from None
+    if numero != numero.to_integral_value():
+        raise ValueError(f"no es un entero: {valor!r}")
+    return int(numero)
+
+
+def _precio(valor):
+    """Centavos desde la celda; '3,50' sin punto es coma decimal y '1,234.50' lleva miles"""
+    texto = str(valor).strip().lstrip('$').strip()
+    if ',' in texto:
+        texto = texto.replace(',', '' if '.' in texto else '.')
+    return a_centavos(texto)
+
+
+def _fecha(valor):
+    """date desde celda de Excel, AAAA-MM-DD o DD/MM/AAAA"""
+    if isinstance(valor, datetime):
+        return valor.date()
+    if isinstance(valor, date):
+        return valor
+    texto = str(valor).strip()
+    for formato_fecha in ('%Y-%m-%d', '%d/%m/%Y'):
+        try:
+            return datetime.strptime(texto[:10], formato_fecha).date()
+        except ValueError:
+            pass
+    raise ValueError(f"fecha inválida: {valor!r}")
+
+
+def _booleano(valor):
+    if isinstance(valor, (bool, int, float)):
+        return bool(valor)
+    texto = normalizar(valor)
+    if texto in VERDADEROS:
+        return True
+    if texto in FALSOS:
+        return False
+    raise ValueError(f"se esperaba sí/no: {valor!r}")
+
+
+def _codigo(valor):
+    # Excel guarda los códigos como número: 7501234567890.0
+    if isinstance(valor, float) and valor.is_integer():
+        valor = int(valor)
+    return str(valor).strip()
+
+
+CONVERSIONES = {
+    'id': _entero,
+    'codigo_barras': _codigo,
+    'nombre': lambda valor: str(valor).strip(),
+    'categoria': lambda valor: str(valor).strip(),
+    'precio_compra': _precio,
+    'precio_venta': _precio,
+    'stock': _entero,
+    'stock_minimo': _entero,
+    'fecha_vencimiento': _fecha,
+    'activo': _booleano,
+}
+
+
+def _mostrar(campo, valor, categorias):
+    """Valor de un campo de producto como texto para el diff"""
+    if valor is None:
+        return "—"
+    if campo == 'categoria_id':
+        return categorias.get(valor, str(valor))
+    if campo in PRECIOS:
+        return formato(valor)
+    if campo == 'activo':
+        return "sí" if valor else "no"
+    return str(valor)
+
+
+# ---------------------------------------------------------------------------
+# Importación
+# ---------------------------------------------------------------------------
+
+class ResultadoImportacion:
+    """Conteos y muestras de lo que hizo (o haría) una importación"""
+    
+    def __init__(self, simulada):
+        self.simulada = simulada
+        self.nuevos = 0
+        self.modificados = 0
+        self.sin_cambios = 0
+        self.errores = 0
+        self.cambios = []               # {'fila', 'accion', 'producto', 'detalle'}
+        self.filas_con_error = []       # {'fila', 'producto', 'detalle'}
+        self.columnas_ignoradas = []
+        self.aplicada = False
+        self.segundos = 0.0
+    
+    @property
+    def leidas(self):
+        return self.nuevos + self.modificados + self.sin_cambios + self.errores
+    
+    def resumen(self):
+        """Texto de una línea con los conteos"""
+        texto = (f"{self.leidas} filas: {self.nuevos} nuevos, {self.modificados} modificados, "
+                 f"{self.sin_cambios} sin cambios, {self.errores} con error")
+        if self.columnas_ignoradas:
+            texto += f" (columnas ignoradas: {', '.join(self.columnas_ignoradas)})"
+        return texto
+    
+    def agregar_cambio(self, fila, accion, producto, detalle):
+        if len(self.cambios) < MAXIMO_MUESTRAS:
+            self.cambios.append({'fila': fila, 'accion': accion, 'producto': producto, 'detalle': detalle})
+    
+    def agregar_error(self, fila, producto, detalle):
+        self.errores += 1
+        if len(self.filas_con_error) < MAXIMO_MUESTRAS:
+            self.filas_con_error.append({'fila': fila, 'producto': producto, 'detalle': detalle})
+
+
+class ImportadorProductos:
+    """Importa listas de productos comparándolas con el catálogo actual"""
+    
+    def __init__(self, bd):
+        self.bd = bd
+        self.categorias = None      # nombre normalizado -> id
+        self.nombres_categoria = {} # id -> nombre
+        self._existentes = {}       # id -> {campo: valor}
+        self._por_codigo = {}       # código de barras -> id
+        
+        columnas = ", ".join(CAMPOS)
+        marcadores = ", ".join(["%s"] * len(CAMPOS))
+        dialecto = bd.dialecto
+        self.sql_nuevo = (
+            f"INSERT INTO productos ({columnas}) VALUES ({marcadores}) "
+            + dialecto.reemplazar(('codigo_barras',), CAMPOS)
+        )
+        self.sql_existente = (
+            f"INSERT INTO productos (id, {columnas}) VALUES (%s, {marcadores}) "
+            + dialecto.reemplazar(('id',), CAMPOS)
+        )
+    
+    def importar(self, ruta, simular=False, omitir_errores=False, cancelacion=None):
+        """
+        Importa (o simula importar) un archivo de productos
+        
+        Args:
+            ruta: Archivo CSV o XLSX
+            simular: True para solo comparar, sin escribir
+            omitir_errores: Aplicar las filas válidas aunque otras tengan error
+                (si es False, una sola fila con error deshace todo)
+            cancelacion: Cancelacion opcional que se revisa entre lotes
+        
+        Returns:
+            ResultadoImportacion, o None si falló la base de datos o se canceló
+        
+        Raises:
+            ValueError: Si el archivo no tiene columnas reconocibles o es XLSX sin openpyxl
+            OSError: Si el archivo no se puede leer
+        """
+        inicio = time.perf_counter()
+        if not self._cargar_catalogo():
+            return None
+        
+        resultado = ResultadoImportacion(simular)
+        filas = leer_columnas(ruta, resultado.columnas_ignoradas)
+        try:
+            if simular:
+                # Solo validar y comparar: los lotes se descartan
+                for _ in self._lotes(filas, resultado, cancelacion):
+                    pass
+            else:
+                with self.bd.obtener_conexion() as conexion:
+                    cursor = conexion.cursor()
+                    try:
+                        for nuevos, existentes in self._lotes(filas, resultado, cancelacion):
+                            if nuevos:
+                                cursor.executemany(self.sql_nuevo, nuevos)
+                            if existentes:
+                                cursor.executemany(self.sql_existente, existentes)
+                        if cancelacion and cancelacion.cancelada:
+                            # Sin commit: devolver() deshace la transacción
+                            return None
+                        if resultado.errores and not omitir_errores:
+                            registro.warning("✗ Importación no aplicada: %s filas con error", resultado.errores)
+                        else:
+                            conexion.commit()
+                            resultado.aplicada = True
+                    finally:
+                        cursor.close()
+        except Error as e:
+            registro.error("✗ Error al importar: %s", e)
+            return None
+        
+        if cancelacion and cancelacion.cancelada:
+            return None
+        resultado.segundos = time.perf_counter() - inicio
+        return resultado
+    
+    def _cargar_catalogo(self):
+        """Categorías (una vez) y el estado actual de todos los productos"""
+        if self.categorias is None:
+            categorias = self.bd.ejecutar_consulta("SELECT id, nombre FROM categorias")
+            if categorias is None:
+                return False
+            self.categorias = {normalizar(cat['nombre']): cat['id'] for cat in categorias}
+            self.nombres_categoria = {cat['id']: cat['nombre'] for cat in categorias}
+        
+        existentes = {}
+        por_codigo = {}
+        try:
+            for fila in self.bd.iterar_consulta(SQL_EXISTENTES, tamaño_lote=5000, filas='tupla'):
+                producto = dict(zip(CAMPOS, fila[1:]))
+                producto['precio_compra'] = a_centavos(producto['precio_compra'])
+                producto['precio_venta'] = a_centavos(producto['precio_venta'])
+                producto['activo'] = bool(producto['activo'])
+                if producto['fecha_vencimiento'] is not None:
+                    producto['fecha_vencimiento'] = _fecha(producto['fecha_vencimiento'])
+                existentes[fila[0]] = producto
+                if producto['codigo_barras']:
+                    por_codigo[producto['codigo_barras']] = fila[0]
+        except Error as e:
+            registro.error("✗ Error al leer productos: %s", e)
+            return False
+        
+        self._existentes = existentes
+        self._por_codigo = por_codigo
+        return True
+    
+    def _lotes(self, filas, resultado, cancelacion):
+        """
+        Valida y compara las filas de TAMAÑO_LOTE en TAMAÑO_LOTE
+        
+        Yields:
+            (parámetros de productos nuevos, parámetros de productos existentes)
+        """
+        productos_vistos = {}       # id -> fila del archivo
+        codigos_vistos = {}         # código -> fila del archivo
+        while True:
+            lote = list(islice(filas, TAMAÑO_LOTE))
+            if not lote or (cancelacion and cancelacion.cancelada):
+                return
+            
+            nuevos = []
+            existentes = []
+            for numero, celdas in lote:
+                producto_id, valores, detalle = self._validar(celdas)
+                nombre = celdas.get('nombre') or celdas.get('codigo_barras') or f"ID {celdas.get('id', '—')}"
+                
+                if valores is not None:
+                    codigo = valores['codigo_barras']
+                    if producto_id in productos_vistos:
+                        valores, detalle = None, f"Repite el producto de la fila {productos_vistos[producto_id]}"
+                    elif codigo in codigos_vistos:
+                        valores, detalle = None, f"El código {codigo} ya está en la fila {codigos_vistos[codigo]}"
+                if valores is None:
+                    resultado.agregar_error(numero, nombre, detalle)
+                    continue
+                
+                if producto_id is not None:
+                    productos_vistos[producto_id] = numero
+                if valores['codigo_barras']:
+                    codigos_vistos[valores['codigo_barras']] = numero
+                
+                parametros = tuple(
+                    a_decimal(valores[c]) if c in PRECIOS else valores[c]
+                    for c in CAMPOS
+                )
+                if producto_id is None:
+                    resultado.nuevos += 1
+                    resultado.agregar_cambio(numero, "nuevo", valores['nombre'], "")
+                    nuevos.append(parametros)
+                    continue
+                
+                actual = self._existentes[producto_id]
+                cambios = [c for c in CAMPOS if valores[c] != actual[c]]
+                if not cambios:
+                    resultado.sin_cambios += 1
+                    continue
+                resultado.modificados += 1
+                resultado.agregar_cambio(numero, "modificado", valores['nombre'], "; ".join(
+                    f"{c}: {_mostrar(c, actual[c], self.nombres_categoria)} → "
+                    f"{_mostrar(c, valores[c], self.nombres_categoria)}" for c in cambios
+                ))
+                existentes.append((producto_id,) + parametros)
+            
+            yield nuevos, existentes
+    
+    def _validar(self, celdas):
+        """
+        Convierte las celdas de una fila y las combina con el producto actual
+        
+        Returns:
+            (id del producto o None si es nuevo, {campo: valor} o None, mensaje de error)
+        """
+        datos = {}
+        for columna, valor in celdas.items():
+            try:
+                datos[columna] = CONVERSIONES[columna](valor)
+            except ValueError as e:
+                return None, None, f"{columna}: {e}"
+        
+        codigo = datos.get('codigo_barras')
+        if 'id' in datos:
+            producto_id = datos.pop('id')
+            if producto_id not in self._existentes:
+                return None, None, f"No existe el producto con ID {producto_id}"
+            dueño = self._por_codigo.get(codigo)
+            if dueño is not None and dueño != producto_id:
+                return None, None, f"El código {codigo} ya es del producto {dueño}"
+        else:
+            producto_id = self._por_codigo.get(codigo)
+        
+        if producto_id is None:
+            faltan = [c for c in REQUERIDOS_NUEVO if c not in datos]
+            if faltan:
+                return None, None, f"Producto nuevo sin {', '.join(faltan)}"
+            valores = dict(VALORES_NUEVO)
+        else:
+            valores = dict(self._existentes[producto_id])
+        
+        if 'categoria' in datos:
+            categoria = datos.pop('categoria')
+            datos['categoria_id'] = self.categorias.get(normalizar(categoria))
+            if datos['categoria_id'] is None:
+                return None, None, f"No existe la categoría '{categoria}'"
+        valores.update(datos)
+        
+        if valores['precio_venta'] <= valores['precio_compra']:
+            return None, None, "El precio de venta debe ser mayor al de compra"
+        if valores['stock'] < 0 or valores['stock_minimo'] < 0:
+            return None, None, "Stock negativo"
+        if codigo is not None and len(codigo) > 32:
+            return None, None, "Código de barras de más de 32 caracteres"
+        return producto_id, valores, None
+
+
+# ---------------------------------------------------------------------------
+# Exportación
+# ---------------------------------------------------------------------------
+
+def exportar_productos(bd, ruta):
+    """
+    Escribe todo el catálogo (incluidos los inactivos) en CSV o XLSX
+    
+    Se lee con iterar_consulta y se escribe al mismo paso: la memoria no
+    crece con el tamaño del catálogo. El archivo se puede volver a importar.
+    
+    Returns:
+        Cantidad de productos exportados, o None si hubo un error
+    """
+    def filas():
+        for fila in bd.iterar_consulta(SQL_EXPORTAR, tamaño_lote=5000, filas='tupla'):
+            (producto_id, codigo, nombre, categoria, compra, venta,
+             stock, minimo, vencimiento, activo) = fila
+            yield (producto_id, codigo or "", nombre, categoria,
+                   a_decimal(a_centavos(compra)), a_decimal(a_centavos(venta)),
+                   stock, minimo, vencimiento or "", 1 if activo else 0)
+    
+    try:
+        return escribir_filas(ruta, COLUMNAS, filas())
+    except Error as e:
+        registro.error("✗ Error al exportar: %s", e)
+        return None
+
+
+# ---------------------------------------------------------------------------
+# Línea de comandos
+# ---------------------------------------------------------------------------
+
+def crear_parser():
+    """Argumentos de los subcomandos importar y exportar"""
+    parser = argparse.ArgumentParser(prog="python -m database.importacion",
+                                     description="Importación y exportación masiva de productos")
+    parser.add_argument("--base-datos",
+                        help="Base de datos MySQL o archivo SQLite (por omisión el de config.py)")
+    subcomandos = parser.add_subparsers(dest="comando", required=True)
+    
+    importar = subcomandos.add_parser("importar", help="Da de alta o actualiza productos desde un archivo")
+    importar.add_argument("archivo", help="CSV o XLSX")
+    importar.add_argument("--simular", action="store_true", help="Solo mostrar qué cambiaría")
+    importar.add_argument("--omitir-errores", action="store_true",
+                          help="Aplicar las filas válidas aunque otras tengan error")
+    
+    exportar = subcomandos.add_parser("exportar", help="Escribe el catálogo en un archivo")
+    exportar.add_argument("archivo", help="CSV o XLSX")
+    return parser
+
+
+def main(argumentos=None):
+    args = crear_parser().parse_args(argumentos)
+    
+    from database.conexion import ConexionBD
+    bd = ConexionBD.desde_config(args.base_datos, tamaño_pool=1)
+    if not bd.conectar():
+        return 1
+    
+    try:
+        if args.comando == "exportar":
+            inicio = time.perf_counter()
+            exportados = exportar_productos(bd, args.archivo)
+            if exportados is None:
+                return 1
+            print(f"✓ {exportados} productos exportados a {args.archivo} "
+                  f"en {time.perf_counter() - inicio:.1f} s")
+            return 0
+        
+        try:
+            resultado = ImportadorProductos(bd).importar(args.archivo, args.simular, args.omitir_errores)
+        except (ValueError, OSError) as e:
+            print(f"✗ {e}")
+            return 1
+        if resultado is None:
+            return 1
+        
+        for cambio in resultado.cambios:
+            print(f"  fila {cambio['fila']}: {cambio['accion']} {cambio['producto']} {cambio['detalle']}")
+        for error in resultado.filas_con_error:
+            print(f"✗ fila {error['fila']}: {error['producto']} {error['detalle']}")
+        print(resultado.resumen())
+        if resultado.aplicada:
+            print(f"✓ Importación aplicada en {resultado.segundos:.1f} s")
+        elif resultado.simulada:
+            print("Simulación: no se escribió nada")
+        return 0 if resultado.aplicada or resultado.simulada else 1
+    finally:
+        bd.desconectar()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,309 @@
+"""
+Instrumentación de consultas y mensajes de la capa de datos
+
+ConexionBD acepta en instrumentacion cualquier objeto con un método
+registrar(sql, segundos, filas, error); EstadisticasConsultas es el de
+uso normal y acumula por sentencia: ejecuciones, errores, filas, tiempo
+total y máximo y un histograma de latencias. Cada sentencia se mide desde
+el execute hasta leer su última fila.
+
+Ver las estadísticas guardadas al cerrar la aplicación:
+
+    python -m database.instrumentacion estadisticas_consultas.json --limite 20
+"""
+
+import argparse
+import json
+import logging
+import sys
+import threading
+import time
+from bisect import bisect_left
+from datetime import datetime
+from functools import lru_cache
+
+
+@lru_cache(maxsize=1024)
+def normalizar(sql):
+    """SQL en una sola línea, para agrupar la misma sentencia"""
+    return " ".join(sql.split())
+
+
+class EstadisticasConsultas:
+    """Contadores y latencias por sentencia SQL"""
+    
+    LIMITES_MS = (1, 5, 10, 50, 100, 500, 1000)     # Cubetas del histograma
+    
+    def __init__(self):
+        self.sentencias = {}        # sql normalizado -> contadores
+        self.desde = datetime.now()
+        self._candado = threading.Lock()
+    
+    def registrar(self, sql, segundos, filas=0, error=False):
+        """
+        Suma una ejecución de la sentencia
+        
+        Args:
+            sql: Texto de la sentencia
+            segundos: Tiempo desde el execute hasta leer la última fila
+            filas: Filas leídas (SELECT) o afectadas (INSERT, UPDATE, DELETE)
+            error: True si la sentencia falló
+        """
+        clave = normalizar(sql)
+        ms = segundos * 1000
+        with self._candado:
+            datos = self.sentencias.get(clave)
+            if datos is None:
+                datos = self.sentencias[clave] = {
+                    'ejecuciones': 0,
+                    'errores': 0,
+                    'filas': 0,
+                    'total_ms': 0.0,
+                    'max_ms': 0.0,
+                    'histograma': [0] * (len(self.LIMITES_MS) + 1)
+                }
+            datos['ejecuciones'] += 1
+            datos['errores'] += 1 if error else 0
+            datos['filas'] += max(filas, 0)
+            datos['total_ms'] += ms
+            datos['max_ms'] = max(datos['max_ms'], ms)
+            datos['histograma'][bisect_left(self.LIMITES_MS, ms)] += 1
+    
+    def reiniciar(self):
+        """Borra lo acumulado"""
+        with self._candado:
+            self.sentencias = {}
+            self.desde = datetime.now()
+    
+    def resumen(self, orden='total_ms', limite=None):
+        """
+        Sentencias ordenadas de mayor a menor
+        
+        Args:
+            orden: 'total_ms', 'ejecuciones', 'p95_ms', 'max_ms', 'errores' o 'filas'
+            limite: Cantidad máxima de sentencias
+        
+        Returns:
+            Lista de diccionarios con sql, contadores, promedio_ms y p95_ms
+        """
+        with self._candado:
+            copia = {sql: dict(datos, histograma=list(datos['histograma']))
+                     for sql, datos in self.sentencias.items()}
+        
+        filas = []
+        for sql, datos in copia.items():
+            datos['sql'] = sql
+            datos['promedio_ms'] = round(datos['total_ms'] / datos['ejecuciones'], 3)
+            datos['p95_ms'] = self._percentil(datos, 95)
+            datos['total_ms'] = round(datos['total_ms'], 3)
+            datos['max_ms'] = round(datos['max_ms'], 3)
+            filas.append(datos)
+        filas.sort(key=lambda d: d[orden], reverse=True)
+        return filas[:limite] if limite else filas
+    
+    def tabla(self, orden='total_ms', limite=20):
+        """Resumen en texto para la consola"""
+        return formatear_tabla(self.resumen(orden, limite), self.desde)
+    
+    def guardar(self, ruta):
+        """Escribe el resumen completo en un archivo JSON"""
+        informe = {
+            'desde': self.desde.isoformat(timespec='seconds'),
+            'hasta': datetime.now().isoformat(timespec='seconds'),
+            'limites_ms': list(self.LIMITES_MS),
+            'sentencias': self.resumen()
+        }
+        with open(ruta, 'w', encoding='utf-8') as archivo:
+            json.dump(informe, archivo, indent=2, ensure_ascii=False)
+    
+    def _percentil(self, datos, p):
+        """Percentil aproximado: límite superior de la cubeta que lo contiene"""
+        objetivo = datos['ejecuciones'] * p / 100
+        acumulado = 0
+        for i, cantidad in enumerate(datos['histograma']):
+            acumulado += cantidad
+            if acumulado >= objetivo:
+                if i < len(self.LIMITES_MS):
+                    return min(self.LIMITES_MS[i], round(datos['max_ms'], 3))
+                break
+        return round(datos['max_ms'], 3)
+
+
+def formatear_tabla(sentencias, desde=None):
+    """Tabla de texto con una sentencia por renglón"""
+    renglones = []
+    if desde:
+        renglones.append(f"Consultas desde {desde}")
+    renglones.append(f"{'Ejec.':>7} {'Errores':>7} {'Filas':>9} {'Total ms':>10} "
+                     f"{'Prom. ms':>9} {'p95 ms':>8} {'Máx ms':>9}  Sentencia")
+    for d in sentencias:
+        sql = d['sql'] if len(d['sql']) <= 90 else d['sql'][:87] + "..."
+        renglones.append(f"{d['ejecuciones']:>7} {d['errores']:>7} {d['filas']:>9} {d['total_ms']:>10.1f} "
+                         f"{d['promedio_ms']:>9.3f} {d['p95_ms']:>8} {d['max_ms']:>9.1f}  {sql}")
+    return "\n".join(renglones)
+
+
+class CursorInstrumentado:
+    """Cursor que informa cada sentencia a la instrumentación"""
+    
+    def __init__(self, cursor, instrumentacion):
+        self._cursor = cursor
+        self._instrumentacion = instrumentacion
+        self._pendiente = None      # [sql, segundos, filas] de un SELECT sin leer completo
+    
+    def execute(self, sql, parametros=None):
+        self._terminar()
+        inicio = time.perf_counter()
+        try:
+            self._cursor.execute(sql, parametros)
+        except Exception:
+            self._instrumentacion.registrar(sql, time.perf_counter() - inicio, 0, True)
+            raise
+        segundos = time.perf_counter() - inicio
+        if self._cursor.description is None:
+            # Sin resultado (INSERT, UPDATE, DELETE): filas afectadas
+            self._instrumentacion.registrar(sql, segundos, self._cursor.rowcount)
+        else:
+            # SELECT: se termina de medir al leer la última fila
+            self._pendiente = [sql, segundos, 0]
+    
+    def executemany(self, sql, filas):
+        self._terminar()
+        inicio = time.perf_counter()
+        try:
+            self._cursor.executemany(sql, filas)
+        except Exception:
+            self._instrumentacion.registrar(sql, time.perf_counter() - inicio, 0, True)
+            raise
+        self._instrumentacion.registrar(sql, time.perf_counter() - inicio, self._cursor.rowcount)
+    
+    def fetchall(self):
+        filas = self._leer(self._cursor.fetchall)
+        self._terminar(len(filas))
+        return filas
+    
+    def fetchmany(self, cantidad):
+        filas = self._leer(self._cursor.fetchmany, cantidad)
+        if filas:
+            self._sumar(len(filas))
+        else:
+            self._terminar()
+        return filas
+    
+    def fetchone(self):
+        fila = self._leer(self._cursor.fetchone)
+        if fila is None:
+            self._terminar()
+        else:
+            self._sumar(1)
+        return fila
+    
+    def close(self):
+        self._terminar()
+        self._cursor.close()
+    
+    def __getattr__(self, nombre):
+        # lastrowid, rowcount, description...
+        return getattr(self._cursor, nombre)
+    
+    def _leer(self, funcion, *args):
+        """Llama a un fetch sumando su tiempo al SELECT pendiente"""
+        inicio = time.perf_counter()
+        try:
+            return funcion(*args)
+        except Exception:
+            if self._pendiente:
+                sql, segundos, filas = self._pendiente
+                self._pendiente = None
+                self._instrumentacion.registrar(sql, segundos + time.perf_counter() - inicio, filas, True)
+            raise
+        finally:
+            if self._pendiente:
+                self._pendiente[1] += time.perf_counter() - inicio
+    
+    def _sumar(self, filas):
+        if self._pendiente:
+            self._pendiente[2] += filas
+    
+    def _terminar(self, filas=0):
+        """Registra el SELECT pendiente con todas sus filas leídas"""
+        if self._pendiente:
+            sql, segundos, leidas = self._pendiente
+            self._pendiente = None
+            self._instrumentacion.registrar(sql, segundos, leidas + filas)
+
+
+class ConexionInstrumentada:
+    """Conexión cuyos cursores pasan por la instrumentación"""
+    
+    def __init__(self, conexion, instrumentacion):
+        self.conexion = conexion
+        self._instrumentacion = instrumentacion
+    
+    def cursor(self, *args, **kwargs):
+        return CursorInstrumentado(self.conexion.cursor(*args, **kwargs), self._instrumentacion)
+    
+    def __getattr__(self, nombre):
+        # commit, rollback, in_transaction...
+        return getattr(self.conexion, nombre)
+
+
+class SalidaConsola(logging.StreamHandler):
+    """
+    StreamHandler que escribe en el sys.stderr vigente (respeta redirect_stderr)
+    
+    Los mensajes no van a stdout para no mezclarse con lo que imprimen las
+    herramientas de línea de comandos (por ejemplo el JSON del benchmark).
+    """
+    
+    @property
+    def stream(self):
+        return sys.stderr
+    
+    @stream.setter
+    def stream(self, valor):
+        pass
+
+
+def configurar_mensajes(detallados=True):
+    """
+    Muestra en consola los mensajes de la capa de datos y de la interfaz
+    
+    Args:
+        detallados: True para ver cada "✓ Registro insertado..." y demás;
+                    False para ver solo los errores
+    """
+    for paquete in ('database', 'gui'):
+        registro = logging.getLogger(paquete)
+        if not registro.handlers:
+            manejador = SalidaConsola()
+            manejador.setFormatter(logging.Formatter('%(message)s'))
+            registro.addHandler(manejador)
+            registro.propagate = False
+        registro.setLevel(logging.INFO if detallados else logging.WARNING)
+
+
+def main(argumentos=None):
+    import config
+    parser = argparse.ArgumentParser(prog="python -m database.instrumentacion",
+                                     description="Muestra las estadísticas de consultas guardadas")
+    parser.add_argument("archivo", nargs="?", default=config.RUTA_ESTADISTICAS)
+    parser.add_argument("--orden", default="total_ms",
+                        choices=['total_ms', 'ejecuciones', 'p95_ms', 'max_ms', 'errores', 'filas'])
+    parser.add_argument("--limite", type=int, default=20)
+    args = parser.parse_args(argumentos)
+    
+    try:
+        with open(args.archivo, encoding='utf-8') as archivo:
+            informe = json.load(archivo)
+    except (OSError, ValueError) as e:
+        print(f"✗ No se pudieron leer las estadísticas: {e}")
+        return 1
+    
+    sentencias = sorted(informe['sentencias'], key=lambda d: d[args.orden], reverse=True)
+    print(formatear_tabla(sentencias[:args.limite], f"{informe['desde']} hasta {informe['hasta']}"))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+-- =====================================================
+-- MINI SUPER LAS BOTARGAS - MIGRACIONES
+-- Para bases de datos creadas con una versión anterior de bd.sql.
+-- Ejecutar solo las secciones que falten:
+--   mysql -u root -p mini_super_botargas < database/migraciones.sql
+-- =====================================================
+
+USE mini_super_botargas;
+
+-- =====================================================
+-- 001: RESERVAS DE STOCK
+-- =====================================================
+CREATE TABLE IF NOT EXISTS reservas_stock (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    producto_id INT NOT NULL,
+    cantidad INT NOT NULL,
+    caja VARCHAR(50) NOT NULL,
+    expira DATETIME NOT NULL,
+    fecha_creacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (producto_id) REFERENCES productos(id),
+    INDEX idx_caja (caja),
+    INDEX idx_expira (expira)
+);
+
+-- =====================================================
+-- 002: VERSIÓN DEL CATÁLOGO (caché de productos)
+-- =====================================================
+ALTER TABLE productos
+    ADD COLUMN fecha_modificacion TIMESTAMP(6) DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+    ADD INDEX idx_modificacion (fecha_modificacion);
+
+-- =====================================================
+-- 003: TABLAS DE RESUMEN DE VENTAS
+-- Después de crearlas: python -m database.resumenes
+-- =====================================================
+CREATE TABLE IF NOT EXISTS resumen_ventas_hora (
+    fecha DATE NOT NULL,
+    hora TINYINT NOT NULL,
+    metodo_pago VARCHAR(50) NOT NULL,
+    cantidad_ventas INT NOT NULL DEFAULT 0,
+    total DECIMAL(12,2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (fecha, hora, metodo_pago)
+);
+
+CREATE TABLE IF NOT EXISTS resumen_productos_dia (
+    fecha DATE NOT NULL,
+    producto_id INT NOT NULL,
+    unidades INT NOT NULL DEFAULT 0,
+    ingresos DECIMAL(12,2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (fecha, producto_id),
+    INDEX idx_resumen_producto (producto_id, fecha)
+);
+
+CREATE TABLE IF NOT EXISTS resumen_categorias_dia (
+    fecha DATE NOT NULL,
+    categoria_id INT NOT NULL,
+    unidades INT NOT NULL DEFAULT 0,
+    ingresos DECIMAL(12,2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (fecha, categoria_id)
+);
+
+-- =====================================================
+-- 004: ÍNDICE CUBRIENTE PARA REPORTES POR FECHA
+-- =====================================================
+ALTER TABLE ventas ADD INDEX idx_fecha_cubriente (fecha, hora, total, metodo_pago);
+
+-- =====================================================
+-- 005: ID DE VENTA GENERADO POR LA CAJA (DIARIO SIN CONEXIÓN)
+-- =====================================================
+ALTER TABLE ventas ADD COLUMN id_cliente CHAR(32) NULL AFTER estado;
+ALTER TABLE ventas ADD UNIQUE KEY uk_id_cliente (id_cliente);
+
+-- =====================================================
+-- 006: CÓDIGO DE BARRAS (CAJA CON ESCÁNER)
+-- =====================================================
+ALTER TABLE productos ADD COLUMN codigo_barras VARCHAR(32) NULL AFTER activo;
+ALTER TABLE productos ADD UNIQUE KEY uk_codigo_barras (codigo_barras);
+
+-- =====================================================
+-- 007: AJUSTES MASIVOS DE PRODUCTOS (BITÁCORA PARA DESHACER)
+-- =====================================================
+CREATE TABLE IF NOT EXISTS ajustes_productos (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    descripcion VARCHAR(255) NOT NULL,
+    campo VARCHAR(30) NOT NULL,
+    productos INT NOT NULL DEFAULT 0,
+    fecha TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    fecha_reversion DATETIME NULL
+);
+
+CREATE TABLE IF NOT EXISTS ajustes_productos_detalle (
+    ajuste_id INT NOT NULL,
+    producto_id INT NOT NULL,
+    valor_anterior DECIMAL(12,2),
+    valor_nuevo DECIMAL(12,2) NOT NULL,
+    PRIMARY KEY (ajuste_id, producto_id),
+    FOREIGN KEY (ajuste_id) REFERENCES ajustes_productos(id),
+    FOREIGN KEY (producto_id) REFERENCES productos(id)
+);
+
+-- =====================================================
+-- 008: ÍNDICE CUBRIENTE PARA VENTAS POR PRODUCTO
+-- =====================================================
+ALTER TABLE detalle_ventas ADD INDEX idx_producto_cubriente (producto_id, venta_id, cantidad, subtotal);
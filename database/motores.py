@@ -0,0 +1,301 @@
+"""
+Motores de base de datos: MySQL (servidor) y SQLite (archivo local)
+
+ConexionBD habla con el motor a través de dos piezas:
+
+- conectar(): abre una conexión con la interfaz de mysql.connector
+  (cursor(dictionary=True), commit, rollback, in_transaction, ping...).
+  Para SQLite, ConexionSQLite adapta sqlite3 a esa misma interfaz y
+  traduce los marcadores %s a ?.
+- dialecto: las pocas partes del SQL que cambian entre motores (hora de
+  una columna TIME, conversión a entero, upserts y bloqueo de filas).
+
+SQLite corre en modo WAL dentro del mismo proceso: sin servidor ni red.
+El esquema se crea solo la primera vez (ver database/esquema.py).
+"""
+
+import sqlite3
+import threading
+from collections import namedtuple
+from datetime import date, datetime, time
+from decimal import Decimal
+from functools import lru_cache
+
+try:
+    import mysql.connector
+    from mysql.connector import Error as ErrorMySQL
+except ImportError:
+    # Sin el conector de MySQL solo queda disponible SQLite
+    mysql = None
+    
+    class ErrorMySQL(Exception):
+        """Sustituto cuando mysql-connector-python no está instalado"""
+
+
+class ErrorPool(Exception):
+    """El pool está cerrado o no tiene conexiones disponibles"""
+
+
+# Usar en except: cubre errores de cualquier motor y del pool
+Error = (ErrorMySQL, sqlite3.Error, ErrorPool)
+
+
+class DialectoMySQL:
+    """SQL propio de MySQL"""
+    
+    nombre = 'mysql'
+    para_actualizar = " FOR UPDATE"
+    
+    def hora(self, columna):
+        """Hora (0-23) de una columna TIME"""
+        return f"HOUR({columna})"
+    
+    def entero(self, expresion):
+        """Conversión de una expresión a entero"""
+        return f"CAST({expresion} AS SIGNED)"
+    
+    def acumular(self, tabla, clave, columnas):
+        """Cláusula para sumar a la fila existente si la clave ya existe"""
+        # Calificadas con la tabla: en INSERT ... SELECT la columna puede
+        # existir también en el origen (ventas.total) y MySQL la rechaza
+        # como ambigua (error 1052)
+        return "ON DUPLICATE KEY UPDATE " + ", ".join(
+            f"{tabla}.{c} = {tabla}.{c} + VALUES({c})" for c in columnas
+        )
+    
+    def reemplazar(self, clave, columnas):
+        """Cláusula para sobrescribir la fila existente si la clave ya existe"""
+        return "ON DUPLICATE KEY UPDATE " + ", ".join(
+            f"{c} = VALUES({c})" for c in columnas
+        )
+    
+    def porcentaje(self, columna):
+        """Importe por %s diezmilésimos (10500 = +5%) redondeado al centavo"""
+        # DECIMAL es exacto: ROUND redondea la mitad hacia arriba
+        return f"ROUND({columna} * %s / 10000, 2)"
+    
+    def iniciar_escritura(self, cursor):
+        """Nada que hacer: SELECT ... FOR UPDATE bloquea las filas"""
+
+
+class DialectoSQLite:
+    """SQL propio de SQLite"""
+    
+    nombre = 'sqlite'
+    para_actualizar = ""
+    
+    def hora(self, columna):
+        """Hora (0-23) de una columna TIME guardada como texto HH:MM:SS"""
+        return f"CAST(strftime('%H', {columna}) AS INTEGER)"
+    
+    def entero(self, expresion):
+        """Conversión de una expresión a entero"""
+        return f"CAST({expresion} AS INTEGER)"
+    
+    def acumular(self, tabla, clave, columnas):
+        """Cláusula para sumar a la fila existente si la clave ya existe"""
+        return f"ON CONFLICT ({', '.join(clave)}) DO UPDATE SET " + ", ".join(
+            f"{c} = {tabla}.{c} + excluded.{c}" for c in columnas
+        )
+    
+    def reemplazar(self, clave, columnas):
+        """Cláusula para sobrescribir la fila existente si la clave ya existe"""
+        return f"ON CONFLICT ({', '.join(clave)}) DO UPDATE SET " + ", ".join(
+            f"{c} = excluded.{c}" for c in columnas
+        )
+    
+    def porcentaje(self, columna):
+        """Importe por %s diezmilésimos (10500 = +5%) redondeado al centavo"""
+        # Los importes son REAL: se opera en centavos enteros para redondear
+        # la mitad hacia arriba como Dinero.porcentaje
+        return f"(CAST(ROUND({columna} * 100) AS INTEGER) * %s + 5000) / 10000 / 100.0"
+    
+    def iniciar_escritura(self, cursor):
+        """SQLite no tiene FOR UPDATE: se toma el candado de escritura antes de leer"""
+        cursor.execute("BEGIN IMMEDIATE")
+
+
+class MotorMySQL:
+    """Servidor MySQL vía mysql.connector"""
+    
+    nombre = 'MySQL'
+    dialecto = DialectoMySQL()
+    prepara_sentencias = True   # cursor(prepared=True) reutilizable por conexión
+    
+    def __init__(self, host, usuario, contraseña, base_datos):
+        self.destino = f"{host}/{base_datos}"
+        self.parametros = {
+            'host': host,
+            'user': usuario,
+            'password': contraseña,
+            'database': base_datos
+        }
+    
+    def conectar(self, tiempo_conexion=None):
+        """
+        Abre una conexión nueva
+        
+        Args:
+            tiempo_conexion: Segundos máximos para establecer la conexión
+                             (por omisión, los del conector)
+        """
+        if mysql is None:
+            raise ErrorMySQL("mysql-connector-python no está instalado")
+        if tiempo_conexion is None:
+            return mysql.connector.connect(**self.parametros)
+        return mysql.connector.connect(connection_timeout=tiempo_conexion, **self.parametros)
+
+
+class MotorSQLite:
+    """Base de datos en un archivo local con SQLite en modo WAL"""
+    
+    nombre = 'SQLite'
+    dialecto = DialectoSQLite()
+    prepara_sentencias = False  # sqlite3 ya guarda compiladas las sentencias por texto
+    SENTENCIAS_EN_CACHE = 256
+    
+    def __init__(self, ruta, tiempo_espera=5):
+        """
+        Args:
+            ruta: Archivo de la base de datos (se crea si no existe)
+            tiempo_espera: Segundos a esperar si otra conexión está escribiendo
+        """
+        self.ruta = ruta
+        self.destino = ruta
+        self.tiempo_espera = tiempo_espera
+        self._preparada = False
+        self._candado = threading.Lock()
+    
+    def conectar(self, tiempo_conexion=None):
+        """
+        Abre una conexión nueva y crea el esquema si hace falta
+        
+        Args:
+            tiempo_conexion: Sin efecto: el archivo es local (igual que MotorMySQL)
+        """
+        conexion = sqlite3.connect(
+            self.ruta,
+            timeout=self.tiempo_espera,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            cached_statements=self.SENTENCIAS_EN_CACHE,
+            # El pool presta la conexión a un hilo a la vez
+            check_same_thread=False
+        )
+        conexion.execute("PRAGMA foreign_keys = ON")
+        conexion.execute("PRAGMA synchronous = NORMAL")
+        
+        with self._candado:
+            if not self._preparada:
+                # WAL queda guardado en el archivo; basta con activarlo una vez
+                conexion.execute("PRAGMA journal_mode = WAL")
+                from database.esquema import crear_esquema_sqlite
+                crear_esquema_sqlite(conexion)
+                self._preparada = True
+        return ConexionSQLite(conexion)
+
+
+class ConexionSQLite:
+    """Conexión sqlite3 con la interfaz de mysql.connector que usa ConexionBD"""
+    
+    def __init__(self, conexion):
+        self._conexion = conexion
+        self._abierta = True
+    
+    def cursor(self, dictionary=False, named_tuple=False):
+        """Cursor que acepta %s y opcionalmente devuelve diccionarios o tuplas con nombre"""
+        return CursorSQLite(self._conexion.cursor(), dictionary, named_tuple)
+    
+    def commit(self):
+        self._conexion.commit()
+    
+    def rollback(self):
+        self._conexion.rollback()
+    
+    @property
+    def in_transaction(self):
+        return self._conexion.in_transaction
+    
+    def is_connected(self):
+        return self._abierta
+    
+    def ping(self, reconnect=False, attempts=1, delay=0):
+        """Un archivo local no se desconecta; solo se verifica que siga abierto"""
+        self._conexion.execute("SELECT 1")
+    
+    def close(self):
+        self._abierta = False
+        self._conexion.close()
+
+
+class CursorSQLite:
+    """Cursor sqlite3 que traduce %s a ? y arma diccionarios por columna"""
+    
+    def __init__(self, cursor, diccionario, nombrada=False):
+        self._cursor = cursor
+        self._diccionario = diccionario
+        self._nombrada = nombrada
+    
+    def execute(self, sql, parametros=None):
+        self._cursor.execute(traducir_marcadores(sql), parametros or ())
+    
+    def executemany(self, sql, filas):
+        self._cursor.executemany(traducir_marcadores(sql), filas)
+    
+    def fetchall(self):
+        return self._armar(self._cursor.fetchall())
+    
+    def fetchmany(self, cantidad):
+        return self._armar(self._cursor.fetchmany(cantidad))
+    
+    def fetchone(self):
+        fila = self._cursor.fetchone()
+        return fila if fila is None else self._armar([fila])[0]
+    
+    def _armar(self, filas):
+        """Convierte las tuplas de sqlite3 al tipo de fila pedido"""
+        if not filas or not (self._diccionario or self._nombrada):
+            return filas
+        columnas = tuple(d[0] for d in self._cursor.description)
+        if self._diccionario:
+            return [dict(zip(columnas, fila)) for fila in filas]
+        tipo = tipo_fila(columnas)
+        return [tipo._make(fila) for fila in filas]
+    
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+    
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+    
+    @property
+    def description(self):
+        return self._cursor.description
+    
+    def close(self):
+        self._cursor.close()
+
+
+@lru_cache(maxsize=128)
+def tipo_fila(columnas):
+    """namedtuple para un juego de columnas (como named_tuple=True de MySQL)"""
+    return namedtuple('Fila', columnas, rename=True)
+
+
+@lru_cache(maxsize=512)
+def traducir_marcadores(sql):
+    """Cambia los marcadores de MySQL (%s) por los de SQLite (?)"""
+    return sql.replace("%s", "?")
+
+
+# Tipos de Python <-> texto en SQLite, iguales a los que devuelve MySQL
+sqlite3.register_adapter(Decimal, str)
+sqlite3.register_adapter(date, date.isoformat)
+sqlite3.register_adapter(datetime, lambda d: d.isoformat(" "))
+# Sin microsegundos: la columna hora guarda HH:MM:SS como el TIME de MySQL
+sqlite3.register_adapter(time, lambda t: t.strftime("%H:%M:%S"))
+sqlite3.register_converter("date", lambda b: date.fromisoformat(b.decode()))
+sqlite3.register_converter("datetime", lambda b: datetime.fromisoformat(b.decode()))
+sqlite3.register_converter("timestamp", lambda b: datetime.fromisoformat(b.decode()))
+sqlite3.register_converter("decimal", lambda b: Decimal(b.decode()))
@@ -0,0 +1,217 @@
+"""
+Productos más y menos vendidos desde contadores en memoria
+
+Las unidades e ingresos (en centavos) de cada producto se guardan en
+cubetas por día, semana (desde el lunes) y mes, cargadas una vez desde
+resumen_productos_dia. Un periodo se arma con las cubetas más grandes que
+caben en él, y el top-N sale de un heap sobre los productos activos,
+incluidos los que no tuvieron ventas.
+
+Antes de responder se revisa con una consulta barata si hay ventas nuevas
+(de esta caja, de otras o sincronizadas del diario); de haberlas, solo se
+vuelven a leer los días que tocaron.
+"""
+
+import heapq
+import threading
+from collections import Counter
+from datetime import date, datetime, timedelta
+
+from database.dinero import a_centavos
+
+
+# Una venta puede confirmarse después de otra con id mayor (dos cajas a la
+# vez); la revisión incluye estos ids para no perderla.
+MARGEN_IDS = 50
+
+SQL_CAMBIOS = """
+    SELECT COUNT(*) as cantidad, MAX(id) as ultimo, MIN(fecha) as desde
+    FROM ventas
+    WHERE id > %s
+"""
+
+SQL_VERSION_PRODUCTOS = "SELECT COUNT(*) as total, MAX(fecha_modificacion) as fecha FROM productos"
+
+
+def _fecha(valor):
+    """date desde lo que devuelve el motor (SQLite no conserva el tipo en MIN())"""
+    if isinstance(valor, datetime):
+        return valor.date()
+    if isinstance(valor, date):
+        return valor
+    return date.fromisoformat(str(valor)[:10])
+
+
+def _inicio_semana(fecha):
+    return fecha - timedelta(days=fecha.weekday())
+
+
+def _inicio_mes(fecha):
+    return fecha.replace(day=1)
+
+
+def _mes_siguiente(fecha):
+    return (fecha + timedelta(days=32)).replace(day=1)
+
+
+class RankingProductos:
+    """Contadores por producto y periodo con consultas de top-N"""
+    
+    def __init__(self, bd):
+        self.bd = bd
+        self.por_dia = {}           # fecha -> {producto_id: [unidades, centavos]}
+        self.por_semana = {}        # lunes -> {producto_id: [unidades, centavos]}
+        self.por_mes = {}           # día 1 -> {producto_id: [unidades, centavos]}
+        self.productos = {}         # producto_id -> nombre (solo activos)
+        self._cambios = None        # (desde id, cantidad, último id) de la última revisión
+        self._revisado_hasta = 0    # Último id de venta visto
+        self._version_productos = None
+        self._candado = threading.RLock()
+    
+    def actualizar(self):
+        """
+        Pone al día los contadores y la lista de productos activos
+        
+        Returns:
+            True si hubo cambios en las ventas
+        """
+        with self._candado:
+            self._actualizar_productos()
+            
+            desde_id = max(self._revisado_hasta - MARGEN_IDS, 0)
+            resultado = self.bd.ejecutar_consulta(SQL_CAMBIOS, (desde_id,))
+            if not resultado:
+                return False
+            fila = resultado[0]
+            cambios = (desde_id, fila['cantidad'], fila['ultimo'])
+            if cambios == self._cambios:
+                return False
+            
+            # La primera vez se lee todo; después, desde el día más antiguo con ventas nuevas.
+            # Los días se reemplazan completos, así que releer uno no duplica nada.
+            if self._cambios is None:
+                leido = self._cargar_dias(None)
+            elif fila['desde'] is not None:
+                leido = self._cargar_dias(_fecha(fila['desde']))
+            else:
+                leido = True
+            if not leido:
+                return False
+            
+            self._cambios = cambios
+            self._revisado_hasta = fila['ultimo'] or self._revisado_hasta
+            return True
+    
+    def mas_vendidos(self, rango=None, limite=20):
+        """
+        Productos activos con más unidades vendidas (todo el historial si no hay rango)
+        
+        Returns:
+            Lista de diccionarios con id, nombre, total_vendido e ingresos
+        """
+        with self._candado:
+            self.actualizar()
+            unidades, centavos = self._sumar(rango)
+            vendidos = (pid for pid in self.productos if unidades[pid] > 0)
+            ids = heapq.nlargest(limite, vendidos, key=lambda pid: (unidades[pid], centavos[pid]))
+            return self._filas(ids, unidades, centavos)
+    
+    def menos_vendidos(self, rango=None, limite=20):
+        """
+        Productos activos con menos unidades vendidas, incluyendo los que no se vendieron
+        
+        Returns:
+            Lista de diccionarios con id, nombre, total_vendido e ingresos
+        """
+        with self._candado:
+            self.actualizar()
+            unidades, centavos = self._sumar(rango)
+            ids = heapq.nsmallest(limite, self.productos, key=lambda pid: (unidades[pid], centavos[pid]))
+            return self._filas(ids, unidades, centavos)
+    
+    def _filas(self, ids, unidades, centavos):
+        return [{
+            'id': pid,
+            'nombre': self.productos[pid],
+            'total_vendido': unidades[pid],
+            'ingresos': centavos[pid] / 100
+        } for pid in ids]
+    
+    def _sumar(self, rango):
+        """Unidades y centavos por producto en el periodo"""
+        unidades = Counter()
+        centavos = Counter()
+        for cubeta in self._cubetas(rango):
+            for pid, (u, c) in cubeta.items():
+                unidades[pid] += u
+                centavos[pid] += c
+        return unidades, centavos
+    
+    def _cubetas(self, rango):
+        """Las cubetas que cubren el periodo, de mes en mes donde se pueda"""
+        if rango is None:
+            yield from self.por_mes.values()
+            return
+        
+        dia, fin = _fecha(rango.inicio), _fecha(rango.fin)
+        while dia < fin:
+            if dia.day == 1 and _mes_siguiente(dia) <= fin:
+                yield self.por_mes.get(dia, {})
+                dia = _mes_siguiente(dia)
+            elif dia.weekday() == 0 and dia + timedelta(days=7) <= fin:
+                yield self.por_semana.get(dia, {})
+                dia += timedelta(days=7)
+            else:
+                yield self.por_dia.get(dia, {})
+                dia += timedelta(days=1)
+    
+    def _cargar_dias(self, desde):
+        """Vuelve a leer los días desde la fecha indicada (todos si es None)"""
+        condicion, parametros = ("fecha >= %s", (desde,)) if desde else ("TRUE", ())
+        filas = self.bd.ejecutar_consulta(
+            f"SELECT fecha, producto_id, unidades, ingresos FROM resumen_productos_dia WHERE {condicion}",
+            parametros
+        )
+        if filas is None:
+            return False
+        
+        dias = {}
+        for fila in filas:
+            dia = dias.setdefault(_fecha(fila['fecha']), {})
+            dia[fila['producto_id']] = [int(fila['unidades']), a_centavos(fila['ingresos'])]
+        
+        # Los días releídos que ya no tienen filas quedan vacíos
+        if desde is not None:
+            for fecha in [f for f in self.por_dia if f >= desde and f not in dias]:
+                dias[fecha] = {}
+        for fecha, contadores in dias.items():
+            self._reemplazar_dia(fecha, contadores)
+        return True
+    
+    def _reemplazar_dia(self, fecha, contadores):
+        """Cambia los contadores de un día y corrige su semana y su mes"""
+        anterior = self.por_dia.pop(fecha, {})
+        for cubetas, inicio in ((self.por_semana, _inicio_semana(fecha)), (self.por_mes, _inicio_mes(fecha))):
+            cubeta = cubetas.setdefault(inicio, {})
+            for pid, (u, c) in anterior.items():
+                cubeta[pid][0] -= u
+                cubeta[pid][1] -= c
+            for pid, (u, c) in contadores.items():
+                acumulado = cubeta.setdefault(pid, [0, 0])
+                acumulado[0] += u
+                acumulado[1] += c
+        if contadores:
+            self.por_dia[fecha] = contadores
+    
+    def _actualizar_productos(self):
+        """Vuelve a leer los productos activos solo si cambiaron"""
+        resultado = self.bd.ejecutar_consulta(SQL_VERSION_PRODUCTOS)
+        if not resultado:
+            return
+        version = (resultado[0]['total'], resultado[0]['fecha'])
+        if version == self._version_productos:
+            return
+        productos = self.bd.ejecutar_consulta("SELECT id, nombre FROM productos WHERE activo = TRUE")
+        if productos is not None:
+            self.productos = {prod['id']: prod['nombre'] for prod in productos}
+            self._version_productos = version
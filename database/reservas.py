@@ -0,0 +1,220 @@
+"""
+Reservas de stock para varias cajas trabajando al mismo tiempo
+
+El stock se descuenta con un UPDATE condicional (WHERE stock >= cantidad),
+de modo que dos cajas nunca pueden vender las mismas últimas unidades.
+InnoDB solo bloquea la fila del producto afectado, sin bloquear la tabla;
+SQLite serializa las escrituras de todo el archivo.
+
+Opcionalmente, al agregar un producto al carrito se crea una reserva corta
+que aparta las unidades; si el carrito se abandona, la reserva expira y
+las unidades regresan al stock.
+"""
+
+import logging
+from datetime import datetime, timedelta
+
+from database.motores import Error
+
+# Mensajes ✓/✗; ver instrumentacion.configurar_mensajes
+registro = logging.getLogger(__name__)
+
+
+class StockInsuficienteError(Exception):
+    """Una o más líneas de la venta no tienen stock suficiente"""
+    
+    def __init__(self, fallidos):
+        self.fallidos = fallidos
+        detalle = ", ".join(f"ID {f['producto_id']} (pedido {f['cantidad']})" for f in fallidos)
+        super().__init__(f"Stock insuficiente: {detalle}")
+
+
+def descontar_stock(cursor, lineas, forzar=False):
+    """
+    Descuenta el stock de las líneas de una venta dentro de una transacción
+    
+    Las líneas con reserva_id consumen su reserva (el stock ya se apartó).
+    Las demás, o aquellas cuya reserva ya expiró, se descuentan con un
+    UPDATE condicional que solo afecta la fila si alcanza el stock.
+    
+    Args:
+        cursor: Cursor de la transacción en curso
+        lineas: Lista de diccionarios con producto_id, cantidad y
+                opcionalmente reserva_id
+        forzar: Descontar aunque el stock quede negativo (ventas que ya
+                ocurrieron sin conexión); igual se reportan como fallidas
+    
+    Returns:
+        Lista de líneas que no se pudieron descontar (vacía si todo salió bien)
+    """
+    pendientes = {}
+    for linea in lineas:
+        reserva_id = linea.get('reserva_id')
+        if reserva_id:
+            cursor.execute("DELETE FROM reservas_stock WHERE id = %s", (reserva_id,))
+            if cursor.rowcount == 1:
+                continue
+        # Agrupar por producto para una sola sentencia por producto
+        producto_id = linea['producto_id']
+        pendientes[producto_id] = pendientes.get(producto_id, 0) + linea['cantidad']
+    
+    fallidos = []
+    for producto_id, cantidad in pendientes.items():
+        cursor.execute(
+            "UPDATE productos SET stock = stock - %s WHERE id = %s AND stock >= %s",
+            (cantidad, producto_id, cantidad)
+        )
+        if cursor.rowcount != 1:
+            fallidos.append({'producto_id': producto_id, 'cantidad': cantidad})
+            if forzar:
+                cursor.execute(
+                    "UPDATE productos SET stock = stock - %s WHERE id = %s",
+                    (cantidad, producto_id)
+                )
+    
+    return fallidos
+
+
+class MotorReservas:
+    """Reservas temporales de stock para los carritos de una caja"""
+    
+    def __init__(self, bd, caja, duracion_minutos=15):
+        self.bd = bd
+        self.caja = caja
+        self.duracion = timedelta(minutes=duracion_minutos)
+    
+    def reservar(self, producto_id, cantidad):
+        """
+        Aparta unidades de un producto para el carrito
+        
+        Args:
+            producto_id: ID del producto
+            cantidad: Unidades a apartar
+        
+        Returns:
+            ID de la reserva, 0 si no hay stock suficiente o hubo error
+        """
+        try:
+            with self.bd.obtener_conexion() as conexion:
+                cursor = conexion.cursor()
+                try:
+                    fallidos = descontar_stock(cursor, [{'producto_id': producto_id, 'cantidad': cantidad}])
+                    if fallidos:
+                        conexion.rollback()
+                        return 0
+                    
+                    cursor.execute(
+                        "INSERT INTO reservas_stock (producto_id, cantidad, caja, expira) VALUES (%s, %s, %s, %s)",
+                        (producto_id, cantidad, self.caja, datetime.now() + self.duracion)
+                    )
+                    reserva_id = cursor.lastrowid
+                    conexion.commit()
+                finally:
+                    cursor.close()
+            return reserva_id
+        except Error as e:
+            registro.error("✗ Error al reservar: %s", e)
+            return 0
+    
+    def ampliar(self, reserva_id, producto_id, cantidad):
+        """
+        Aparta más unidades en una reserva existente (el mismo producto otra vez)
+        
+        Args:
+            reserva_id: ID de la reserva de la línea del carrito
+            producto_id: ID del producto de la reserva
+            cantidad: Unidades adicionales
+        
+        Returns:
+            True si se apartaron; False si no hay stock, la reserva ya expiró o hubo error
+        """
+        try:
+            with self.bd.obtener_conexion() as conexion:
+                cursor = conexion.cursor()
+                try:
+                    cursor.execute(
+                        "UPDATE reservas_stock SET cantidad = cantidad + %s, expira = %s WHERE id = %s",
+                        (cantidad, datetime.now() + self.duracion, reserva_id)
+                    )
+                    if cursor.rowcount != 1:
+                        conexion.rollback()
+                        return False
+                    
+                    fallidos = descontar_stock(cursor, [{'producto_id': producto_id, 'cantidad': cantidad}])
+                    if fallidos:
+                        conexion.rollback()
+                        return False
+                    conexion.commit()
+                finally:
+                    cursor.close()
+            return True
+        except Error as e:
+            registro.error("✗ Error al ampliar la reserva: %s", e)
+            return False
+    
+    def liberar(self, reserva_ids):
+        """
+        Cancela reservas y regresa sus unidades al stock
+        
+        Args:
+            reserva_ids: Lista de IDs de reserva
+        
+        Returns:
+            Número de reservas liberadas
+        """
+        if not reserva_ids:
+            return 0
+        marcadores = ", ".join(["%s"] * len(reserva_ids))
+        return self._devolver_reservas(f"id IN ({marcadores})", tuple(reserva_ids))
+    
+    def liberar_caja(self):
+        """Cancela todas las reservas de esta caja (por ejemplo al cerrar)"""
+        return self._devolver_reservas("caja = %s", (self.caja,))
+    
+    def expirar_reservas(self):
+        """
+        Regresa al stock las reservas vencidas de cualquier caja
+        
+        Returns:
+            Número de reservas expiradas
+        """
+        return self._devolver_reservas("expira < %s", (datetime.now(),))
+    
+    def _devolver_reservas(self, condicion, parametros):
+        """Borra las reservas que cumplen la condición y repone su stock"""
+        try:
+            with self.bd.obtener_conexion() as conexion:
+                cursor = conexion.cursor()
+                try:
+                    # El bloqueo evita que dos cajas repongan la misma reserva
+                    dialecto = self.bd.dialecto
+                    dialecto.iniciar_escritura(cursor)
+                    cursor.execute(
+                        f"SELECT id, producto_id, cantidad FROM reservas_stock WHERE {condicion}{dialecto.para_actualizar}",
+                        parametros
+                    )
+                    reservas = cursor.fetchall()
+                    if not reservas:
+                        conexion.rollback()
+                        return 0
+                    
+                    marcadores = ", ".join(["%s"] * len(reservas))
+                    cursor.execute(
+                        f"DELETE FROM reservas_stock WHERE id IN ({marcadores})",
+                        tuple(r[0] for r in reservas)
+                    )
+                    
+                    reponer = {}
+                    for _, producto_id, cantidad in reservas:
+                        reponer[producto_id] = reponer.get(producto_id, 0) + cantidad
+                    cursor.executemany(
+                        "UPDATE productos SET stock = stock + %s WHERE id = %s",
+                        [(cantidad, producto_id) for producto_id, cantidad in reponer.items()]
+                    )
+                    conexion.commit()
+                finally:
+                    cursor.close()
+            return len(reservas)
+        except Error as e:
+            registro.error("✗ Error al liberar reservas: %s", e)
+            return 0
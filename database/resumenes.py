@@ -0,0 +1,225 @@
+"""
+Tablas de resumen de ventas (rollups)
+
+Los reportes y gráficas leen de tablas pre-agregadas por día, hora, método
+de pago, producto y categoría, de modo que su costo depende del rango de
+fechas consultado y no de todo el historial de ventas.
+
+Los resúmenes se acumulan dentro de la misma transacción de cada venta
+(acumular_venta). Si se insertan ventas por otro medio (script SQL,
+cargas masivas) se reconstruyen con:
+
+    python -m database.resumenes
+
+Para comparar, al centavo, el total de cada venta (calculado en Python al
+cobrar) con la suma de sus líneas y los resúmenes con las ventas por día:
+
+    python -m database.resumenes --verificar
+"""
+
+import logging
+import sys
+from functools import lru_cache
+
+from database.dinero import a_centavos, formato
+from database.motores import Error
+
+# Mensajes ✓/✗; ver instrumentacion.configurar_mensajes
+registro = logging.getLogger(__name__)
+
+
+SQL_ACUMULAR_HORA = """
+    INSERT INTO resumen_ventas_hora (fecha, hora, metodo_pago, cantidad_ventas, total)
+    SELECT fecha, {hora}, metodo_pago, 1, total
+    FROM ventas
+    WHERE id = %s
+    {acumular}
+"""
+
+SQL_ACUMULAR_PRODUCTOS = """
+    INSERT INTO resumen_productos_dia (fecha, producto_id, unidades, ingresos)
+    SELECT v.fecha, dv.producto_id, SUM(dv.cantidad), SUM(dv.subtotal)
+    FROM detalle_ventas dv
+    JOIN ventas v ON dv.venta_id = v.id
+    WHERE dv.venta_id = %s
+    GROUP BY v.fecha, dv.producto_id
+    {acumular}
+"""
+
+SQL_ACUMULAR_CATEGORIAS = """
+    INSERT INTO resumen_categorias_dia (fecha, categoria_id, unidades, ingresos)
+    SELECT v.fecha, p.categoria_id, SUM(dv.cantidad), SUM(dv.subtotal)
+    FROM detalle_ventas dv
+    JOIN ventas v ON dv.venta_id = v.id
+    JOIN productos p ON dv.producto_id = p.id
+    WHERE dv.venta_id = %s
+    GROUP BY v.fecha, p.categoria_id
+    {acumular}
+"""
+
+SQL_RECONSTRUIR = [
+    "DELETE FROM resumen_ventas_hora",
+    "DELETE FROM resumen_productos_dia",
+    "DELETE FROM resumen_categorias_dia",
+    """
+    INSERT INTO resumen_ventas_hora (fecha, hora, metodo_pago, cantidad_ventas, total)
+    SELECT fecha, {hora}, metodo_pago, COUNT(*), SUM(total)
+    FROM ventas
+    GROUP BY fecha, {hora}, metodo_pago
+    """,
+    """
+    INSERT INTO resumen_productos_dia (fecha, producto_id, unidades, ingresos)
+    SELECT v.fecha, dv.producto_id, SUM(dv.cantidad), SUM(dv.subtotal)
+    FROM detalle_ventas dv
+    JOIN ventas v ON dv.venta_id = v.id
+    GROUP BY v.fecha, dv.producto_id
+    """,
+    """
+    INSERT INTO resumen_categorias_dia (fecha, categoria_id, unidades, ingresos)
+    SELECT v.fecha, p.categoria_id, SUM(dv.cantidad), SUM(dv.subtotal)
+    FROM detalle_ventas dv
+    JOIN ventas v ON dv.venta_id = v.id
+    JOIN productos p ON dv.producto_id = p.id
+    GROUP BY v.fecha, p.categoria_id
+    """,
+]
+
+
+# Ventas cuyo total no es la suma de sus líneas (comparado en centavos)
+SQL_VENTAS_DESCUADRADAS = """
+    SELECT v.id, v.total, SUM(dv.subtotal) as suma_lineas
+    FROM ventas v
+    JOIN detalle_ventas dv ON dv.venta_id = v.id
+    GROUP BY v.id, v.total
+    HAVING ROUND(v.total * 100) <> ROUND(SUM(dv.subtotal) * 100)
+    ORDER BY v.id
+"""
+
+# (descripción, total por día del resumen, total por día desde las ventas)
+SQL_COMPARAR_POR_DIA = [
+    ("resumen_ventas_hora vs ventas",
+     "SELECT fecha, SUM(total) as total FROM resumen_ventas_hora GROUP BY fecha",
+     "SELECT fecha, SUM(total) as total FROM ventas GROUP BY fecha"),
+    ("resumen_productos_dia vs detalle_ventas",
+     "SELECT fecha, SUM(ingresos) as total FROM resumen_productos_dia GROUP BY fecha",
+     """SELECT v.fecha, SUM(dv.subtotal) as total
+        FROM detalle_ventas dv JOIN ventas v ON dv.venta_id = v.id
+        GROUP BY v.fecha"""),
+    ("resumen_categorias_dia vs detalle_ventas",
+     "SELECT fecha, SUM(ingresos) as total FROM resumen_categorias_dia GROUP BY fecha",
+     """SELECT v.fecha, SUM(dv.subtotal) as total
+        FROM detalle_ventas dv JOIN ventas v ON dv.venta_id = v.id
+        GROUP BY v.fecha"""),
+]
+
+
+@lru_cache(maxsize=None)
+def sentencias_acumular(dialecto):
+    """Las tres sentencias de acumulado escritas para el motor"""
+    hora = dialecto.hora('hora')
+    return [
+        SQL_ACUMULAR_HORA.format(
+            hora=hora,
+            acumular=dialecto.acumular('resumen_ventas_hora', ('fecha', 'hora', 'metodo_pago'),
+                                      ('cantidad_ventas', 'total'))
+        ),
+        SQL_ACUMULAR_PRODUCTOS.format(
+            acumular=dialecto.acumular('resumen_productos_dia', ('fecha', 'producto_id'), ('unidades', 'ingresos'))
+        ),
+        SQL_ACUMULAR_CATEGORIAS.format(
+            acumular=dialecto.acumular('resumen_categorias_dia', ('fecha', 'categoria_id'), ('unidades', 'ingresos'))
+        ),
+    ]
+
+
+def acumular_venta(cursor, venta_id, dialecto):
+    """
+    Suma una venta recién insertada a las tablas de resumen
+    
+    Se llama dentro de la transacción de la venta, después de insertar el
+    encabezado y los detalles.
+    
+    Args:
+        cursor: Cursor de la transacción en curso
+        venta_id: ID de la venta
+        dialecto: Dialecto SQL del motor (ConexionBD.dialecto)
+    """
+    for sql in sentencias_acumular(dialecto):
+        cursor.execute(sql, (venta_id,))
+
+
+def reconstruir_resumenes(bd):
+    """
+    Recalcula todas las tablas de resumen desde ventas y detalle_ventas
+    
+    Args:
+        bd: ConexionBD conectada
+    
+    Returns:
+        True si se reconstruyeron
+    """
+    try:
+        with bd.obtener_conexion() as conexion:
+            cursor = conexion.cursor()
+            try:
+                for sql in SQL_RECONSTRUIR:
+                    cursor.execute(sql.format(hora=bd.dialecto.hora('hora')))
+                conexion.commit()
+            finally:
+                cursor.close()
+        registro.info("✓ Resúmenes de ventas reconstruidos")
+        return True
+    except Error as e:
+        registro.error("✗ Error al reconstruir resúmenes: %s", e)
+        return False
+
+
+def verificar_totales(bd):
+    """
+    Compara en centavos los totales de las ventas con sus líneas y con los resúmenes
+    
+    Args:
+        bd: ConexionBD conectada
+    
+    Returns:
+        Lista de diferencias como texto (vacía si todo cuadra), None si falló una consulta
+    """
+    descuadradas = bd.ejecutar_consulta(SQL_VENTAS_DESCUADRADAS)
+    if descuadradas is None:
+        return None
+    diferencias = [
+        f"Venta {venta['id']}: total {formato(a_centavos(venta['total']))}, "
+        f"líneas {formato(a_centavos(venta['suma_lineas']))}"
+        for venta in descuadradas
+    ]
+    
+    for descripcion, sql_resumen, sql_ventas in SQL_COMPARAR_POR_DIA:
+        resumen = bd.ejecutar_consulta(sql_resumen)
+        ventas = bd.ejecutar_consulta(sql_ventas)
+        if resumen is None or ventas is None:
+            return None
+        por_dia_resumen = {str(fila['fecha']): a_centavos(fila['total'] or 0) for fila in resumen}
+        por_dia_ventas = {str(fila['fecha']): a_centavos(fila['total'] or 0) for fila in ventas}
+        for fecha in sorted(por_dia_resumen.keys() | por_dia_ventas.keys()):
+            en_resumen = por_dia_resumen.get(fecha, 0)
+            en_ventas = por_dia_ventas.get(fecha, 0)
+            if en_resumen != en_ventas:
+                diferencias.append(f"{descripcion} {fecha}: {formato(en_resumen)} vs {formato(en_ventas)}")
+    return diferencias
+
+
+if __name__ == "__main__":
+    from database.conexion import ConexionBD
+    
+    bd = ConexionBD.desde_config(tamaño_pool=1)
+    if bd.conectar():
+        if "--verificar" in sys.argv[1:]:
+            diferencias = verificar_totales(bd)
+            if diferencias is not None:
+                for diferencia in diferencias:
+                    print(f"✗ {diferencia}")
+                if not diferencias:
+                    print("✓ Los totales cuadran al centavo")
+        else:
+            reconstruir_resumenes(bd)
+        bd.desconectar()
@@ -0,0 +1,93 @@
+"""
+Tablero en vivo de las ventas del día
+
+Cada actualización pide solo las ventas con id mayor a la última vista y
+las suma (en centavos) a los totales por hora que ya tiene, así el costo
+de cada vuelta depende de cuántas ventas llegaron desde la anterior y no
+de las ventas del día. Se consulta la base de datos (y no un aviso del punto de venta)
+para ver también las ventas de las otras cajas y las que sincroniza el
+diario.
+"""
+
+import threading
+from datetime import date, time, timedelta
+
+import numpy as np
+
+from database import consultas
+from database.consultas import RangoFechas
+from database.dinero import Dinero, a_centavos
+
+
+# Una venta puede confirmarse después de otra con id mayor (dos cajas a la
+# vez); se vuelven a pedir estos ids y se descartan los ya sumados.
+MARGEN_IDS = 50
+
+
+def hora_de(valor):
+    """Hora (0-23) de una columna TIME: timedelta en MySQL, texto en SQLite"""
+    if isinstance(valor, timedelta):
+        return int(valor.total_seconds()) // 3600
+    if isinstance(valor, time):
+        return valor.hour
+    return int(str(valor).split(':')[0])
+
+
+class TableroVentas:
+    """Ventas del día con totales por hora que se ponen al día por diferencias"""
+    
+    def __init__(self, bd):
+        self.bd = bd
+        self._candado = threading.Lock()
+        self._reiniciar(None)
+    
+    def _reiniciar(self, dia):
+        self.dia = dia
+        self.ultimo_id = 0
+        self.ids = set()
+        self.cantidad_por_hora = np.zeros(24, dtype=np.int64)
+        self.centavos_por_hora = np.zeros(24, dtype=np.int64)
+        self.cantidad = 0
+        self.total_centavos = 0
+    
+    def actualizar(self):
+        """
+        Suma las ventas del día que llegaron desde la última actualización
+        
+        Al cambiar el día se empieza de cero con las ventas del día nuevo.
+        
+        Returns:
+            (nuevo_dia, ventas nuevas en orden de id), o None si la consulta falló
+        """
+        with self._candado:
+            hoy = date.today()
+            nuevo_dia = hoy != self.dia
+            desde = 0 if nuevo_dia else max(self.ultimo_id - MARGEN_IDS, 0)
+            ventas = consultas.ventas_nuevas(self.bd, RangoFechas.dia(hoy), desde)
+            if ventas is None:
+                return None
+            
+            if nuevo_dia:
+                self._reiniciar(hoy)
+            nuevas = [venta for venta in ventas if venta['id'] not in self.ids]
+            for venta in nuevas:
+                hora = hora_de(venta['hora'])
+                self.cantidad_por_hora[hora] += 1
+                centavos = a_centavos(venta['total'])
+                self.centavos_por_hora[hora] += centavos
+                self.total_centavos += centavos
+                self.ids.add(venta['id'])
+            self.cantidad += len(nuevas)
+            if ventas:
+                self.ultimo_id = max(self.ultimo_id, ventas[-1]['id'])
+            return nuevo_dia, nuevas
+    
+    @property
+    def total(self):
+        """Total del día como Dinero"""
+        return Dinero(self.total_centavos)
+    
+    def totales_por_hora(self):
+        """Copia de (cantidad de ventas, total en pesos) por hora del día, para la gráfica"""
+        with self._candado:
+            return self.cantidad_por_hora.copy(), self.centavos_por_hora / 100
@@ -0,0 +1,279 @@
+"""
+Ventana de ajustes masivos de productos
+
+Se elige una regla, se revisa la vista previa (qué productos cambian y
+cómo) y se aplica de una vez; el historial permite deshacer un ajuste.
+Las consultas corren en el EjecutorTareas de la pestaña de productos y el
+catálogo se refresca una sola vez al terminar, no por producto.
+"""
+
+import tkinter as tk
+from tkinter import ttk, messagebox, filedialog
+from datetime import date
+
+from database.ajustes import (AjustesProductos, DesactivarVencidos, PorcentajePrecio,
+                              StockPorConteo, mostrar)
+from gui.tabla_virtual import TablaVirtual
+
+
+class VentanaAjustes:
+    """Reglas de ajuste masivo con vista previa, aplicar y deshacer"""
+    
+    TODAS = "Todas"
+    
+    def __init__(self, parent, bd, tareas, al_aplicar):
+        """
+        Args:
+            parent: Widget dueño de la ventana
+            bd: ConexionBD
+            tareas: EjecutorTareas para las consultas
+            al_aplicar: Se llama tras aplicar o deshacer (refrescar el catálogo)
+        """
+        self.bd = bd
+        self.tareas = tareas
+        self.al_aplicar = al_aplicar
+        self.ajustes = AjustesProductos(bd)
+        self.vista = None           # Última VistaPrevia, la que se aplica
+        self.ruta_conteo = None
+        
+        categorias = self.bd.ejecutar_consulta("SELECT id, nombre FROM categorias ORDER BY nombre")
+        self.categorias = {cat['nombre']: cat['id'] for cat in categorias} if categorias else {}
+        
+        self.ventana = tk.Toplevel(parent)
+        self.ventana.title("Ajustes masivos")
+        self.ventana.geometry("820x600")
+        self.crear_interfaz()
+        self.cargar_historial()
+    
+    def crear_interfaz(self):
+        """Pestañas de reglas e historial, vista previa y botones"""
+        self.notebook = ttk.Notebook(self.ventana)
+        self.notebook.pack(fill=tk.X, padx=10, pady=10)
+        
+        # Precio por porcentaje
+        marco = ttk.Frame(self.notebook, padding=10)
+        self.notebook.add(marco, text="Precio por porcentaje")
+        ttk.Label(marco, text="Categoría:").grid(row=0, column=0, sticky=tk.W, padx=5, pady=5)
+        self.categoria_var = tk.StringVar(value=self.TODAS)
+        ttk.Combobox(marco, textvariable=self.categoria_var, state="readonly", width=28,
+                     values=[self.TODAS] + list(self.categorias)).grid(row=0, column=1, padx=5, pady=5)
+        ttk.Label(marco, text="Porcentaje (-10 baja 10%):").grid(row=1, column=0, sticky=tk.W, padx=5, pady=5)
+        self.entrada_porcentaje = ttk.Entry(marco, width=30)
+        self.entrada_porcentaje.grid(row=1, column=1, padx=5, pady=5)
+        
+        # Stock por conteo físico
+        marco = ttk.Frame(self.notebook, padding=10)
+        self.notebook.add(marco, text="Stock por conteo")
+        ttk.Button(marco, text="📄 Elegir hoja de conteo...", command=self.elegir_conteo).grid(row=0, column=0, padx=5, pady=5)
+        self.label_conteo = ttk.Label(marco, text="CSV o XLSX con id o codigo_barras y conteo")
+        self.label_conteo.grid(row=0, column=1, sticky=tk.W, padx=5, pady=5)
+        
+        # Desactivar vencidos
+        marco = ttk.Frame(self.notebook, padding=10)
+        self.notebook.add(marco, text="Desactivar vencidos")
+        ttk.Label(marco, text="Vencidos antes de (YYYY-MM-DD):").grid(row=0, column=0, sticky=tk.W, padx=5, pady=5)
+        self.entrada_fecha = ttk.Entry(marco, width=30)
+        self.entrada_fecha.insert(0, date.today().isoformat())
+        self.entrada_fecha.grid(row=0, column=1, padx=5, pady=5)
+        
+        # Historial para deshacer
+        marco = ttk.Frame(self.notebook, padding=10)
+        self.notebook.add(marco, text="Historial")
+        self.tabla_historial = TablaVirtual(
+            marco,
+            columnas=[
+                ('ID', 40, 'id'),
+                ('Fecha', 130, None),
+                ('Ajuste', 380, None),
+                ('Productos', 80, 'productos'),
+                ('Estado', 100, None)
+            ],
+            formatear=lambda a: (
+                a['id'], str(a['fecha'])[:16], a['descripcion'], a['productos'],
+                "deshecho" if a['fecha_reversion'] else "aplicado"
+            ),
+            alto=6
+        )
+        self.tabla_historial.pack(fill=tk.BOTH, expand=True)
+        ttk.Button(marco, text="↩ Deshacer", command=self.deshacer).pack(pady=5)
+        
+        self.notebook.bind("<<NotebookTabChanged>>", lambda e: self.descartar_vista())
+        
+        # Vista previa
+        frame_botones = ttk.Frame(self.ventana)
+        frame_botones.pack(fill=tk.X, padx=10)
+        ttk.Button(frame_botones, text="👁 Vista previa", command=self.vista_previa).pack(side=tk.LEFT, padx=2)
+        self.boton_aplicar = ttk.Button(frame_botones, text="✓ Aplicar", command=self.aplicar, state=tk.DISABLED)
+        self.boton_aplicar.pack(side=tk.LEFT, padx=2)
+        
+        self.label_resumen = ttk.Label(self.ventana, text="", font=("Arial", 10, "bold"))
+        self.label_resumen.pack(padx=10, pady=5, anchor=tk.W)
+        
+        self.tabla = TablaVirtual(
+            self.ventana,
+            columnas=[
+                # Las filas de la hoja con error no tienen id ni nombre
+                ('ID / Fila', 70, lambda fila: fila.get('id', fila.get('fila'))),
+                ('Producto', 300, lambda fila: fila.get('nombre')),
+                ('Antes', 100, None),
+                ('Después', 100, None),
+                ('Estado', 200, None)
+            ],
+            formatear=self.valores_vista,
+            etiquetas=lambda fila: () if fila.get('aplicable') else ('omitido',),
+            alto=12
+        )
+        self.tabla.tag_configure('omitido', background='#ffcccc')
+        self.tabla.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
+    
+    def valores_vista(self, fila):
+        """Fila de la vista previa (producto que cambia o fila de la hoja con error)"""
+        if 'detalle' in fila:
+            return (fila['fila'], "", "", "", fila['detalle'])
+        campo = self.vista.regla.campo
+        return (
+            fila['id'],
+            fila['nombre'],
+            mostrar(campo, fila['anterior']),
+            mostrar(campo, fila['nuevo']),
+            "" if fila['aplicable'] else "se omite"
+        )
+    
+    def elegir_conteo(self):
+        """Elige la hoja de conteo físico"""
+        ruta = filedialog.askopenfilename(
+            parent=self.ventana,
+            title="Hoja de conteo",
+            filetypes=[("CSV o Excel", "*.csv *.xlsx"), ("Todos los archivos", "*.*")]
+        )
+        if ruta:
+            self.ruta_conteo = ruta
+            self.label_conteo.config(text=ruta)
+            self.descartar_vista()
+    
+    def regla_actual(self):
+        """
+        Regla de la pestaña elegida con sus parámetros
+        
+        Raises:
+            ValueError: Si faltan datos o no son válidos
+        """
+        pestaña = self.notebook.index(self.notebook.select())
+        if pestaña == 0:
+            categoria = self.categoria_var.get()
+            if categoria == self.TODAS:
+                return PorcentajePrecio(self.entrada_porcentaje.get())
+            return PorcentajePrecio(self.entrada_porcentaje.get(), self.categorias[categoria], categoria)
+        if pestaña == 1:
+            if not self.ruta_conteo:
+                raise ValueError("Elige la hoja de conteo")
+            return StockPorConteo(self.ruta_conteo)
+        if pestaña == 2:
+            return DesactivarVencidos(date.fromisoformat(self.entrada_fecha.get().strip()))
+        raise ValueError("Elige una regla")
+    
+    def vista_previa(self):
+        """Calcula en segundo plano qué productos cambiarían"""
+        try:
+            regla = self.regla_actual()
+        except ValueError as e:
+            messagebox.showerror("Error", str(e), parent=self.ventana)
+            return
+        
+        self.tareas.ejecutar(
+            'ajuste_vista_previa',
+            lambda cancelacion: regla.vista_previa(self.bd),
+            self.mostrar_vista,
+            al_fallar=lambda e: messagebox.showerror("Error", f"No se pudo calcular: {e}", parent=self.ventana),
+            descripcion="Vista previa"
+        )
+    
+    def mostrar_vista(self, vista):
+        """Muestra la vista previa y habilita Aplicar si algo cambia"""
+        if not self.ventana.winfo_exists():
+            return
+        if vista is None:
+            messagebox.showerror("Error", "No se pudo calcular la vista previa", parent=self.ventana)
+            return
+        
+        self.vista = vista
+        self.label_resumen.config(text=vista.resumen())
+        self.tabla.mostrar(vista.errores + vista.filas)
+        self.boton_aplicar.config(state=tk.NORMAL if vista.aplicables else tk.DISABLED)
+    
+    def descartar_vista(self):
+        """Otra regla u otros parámetros: la vista previa anterior ya no aplica"""
+        self.vista = None
+        self.label_resumen.config(text="")
+        self.tabla.limpiar()
+        self.boton_aplicar.config(state=tk.DISABLED)
+    
+    def aplicar(self):
+        """Aplica la regla de la vista previa en una transacción"""
+        if self.vista is None:
+            return
+        regla = self.vista.regla
+        if not messagebox.askyesno("Confirmar", f"¿Aplicar a {self.vista.aplicables} productos?\n{regla.descripcion}",
+                                   parent=self.ventana):
+            return
+        
+        def terminar(resultado):
+            self.al_aplicar()
+            if not self.ventana.winfo_exists():
+                return
+            if resultado is None:
+                messagebox.showerror("Error", "No se aplicó el ajuste", parent=self.ventana)
+                return
+            ajuste_id, modificados = resultado
+            messagebox.showinfo("Éxito", f"Ajuste {ajuste_id}: {modificados} productos modificados",
+                                parent=self.ventana)
+            self.descartar_vista()
+            self.cargar_historial()
+        
+        self.boton_aplicar.config(state=tk.DISABLED)
+        self.tareas.ejecutar(
+            'ajuste_aplicar',
+            lambda cancelacion: self.ajustes.aplicar(regla),
+            terminar,
+            al_fallar=lambda e: messagebox.showerror("Error", f"No se pudo aplicar: {e}", parent=self.ventana),
+            descripcion="Ajuste masivo"
+        )
+    
+    def cargar_historial(self):
+        """Lee los ajustes recientes"""
+        historial = self.ajustes.historial()
+        self.tabla_historial.mostrar(historial or [])
+    
+    def deshacer(self):
+        """Deshace el ajuste seleccionado en el historial"""
+        ajuste = self.tabla_historial.seleccionada()
+        if not ajuste:
+            messagebox.showwarning("Aviso", "Selecciona un ajuste", parent=self.ventana)
+            return
+        if ajuste['fecha_reversion']:
+            messagebox.showwarning("Aviso", "Ese ajuste ya se deshizo", parent=self.ventana)
+            return
+        if not messagebox.askyesno("Confirmar", f"¿Deshacer '{ajuste['descripcion']}'?", parent=self.ventana):
+            return
+        
+        def terminar(resultado):
+            self.al_aplicar()
+            if not self.ventana.winfo_exists():
+                return
+            if resultado is None:
+                messagebox.showerror("Error", "No se pudo deshacer el ajuste", parent=self.ventana)
+                return
+            revertidos, total = resultado
+            texto = f"{revertidos} de {total} productos regresaron a su valor anterior"
+            if revertidos < total:
+                texto += "\nLos demás cambiaron después del ajuste (ventas u otras ediciones) y se dejaron así"
+            messagebox.showinfo("Éxito", texto, parent=self.ventana)
+            self.cargar_historial()
+        
+        self.tareas.ejecutar(
+            'ajuste_deshacer',
+            lambda cancelacion: self.ajustes.deshacer(ajuste['id']),
+            terminar,
+            al_fallar=lambda e: messagebox.showerror("Error", f"No se pudo deshacer: {e}", parent=self.ventana),
+            descripcion="Deshacer ajuste"
+        )
@@ -1,20 +1,35 @@
 """
 Ventana principal de la aplicación Tkinter
 Mini Super Las Botargas
+
+La caja se muestra primero: el catálogo se carga en segundo plano y las
+pestañas de productos y reportes se construyen al abrirlas por primera
+vez. Reportes importa Matplotlib y pandas, así que el arranque no los
+espera.
 """
 
 import tkinter as tk
+from contextlib import nullcontext
 from tkinter import ttk, messagebox
 from gui.productos_gui import ProductosFrame
 from gui.ventas_gui import VentasFrame
-from gui.reportes_gui import ReportesFrame
+from gui.tareas import EjecutorTareas
 from database.conexion import ConexionBD
-from config import HOST, USUARIO, CONTRASEÑA, BASE_DATOS
+from database.catalogo import CatalogoProductos
+from database.diario import DiarioVentas, SincronizadorVentas
+from config import DIARIO_VENTAS, RUTA_DIARIO, RUTA_COPIA_CATALOGO, RUTA_ESTADISTICAS
 
 
 class VentanaPrincipal:
-    def __init__(self, root):
+    def __init__(self, root, tiempos=None):
+        """
+        Args:
+            root: Ventana Tk
+            tiempos: TiemposArranque para medir el arranque (opcional);
+                     el informe se imprime cuando la caja queda lista
+        """
         self.root = root
+        self.tiempos = tiempos
         self.root.title("Mini Super Las Botargas - Sistema de Punto de Venta")
         self.root.geometry("1200x850")
         self.root.configure(bg="#f0f0f0")
@@ -22,16 +37,82 @@ class VentanaPrincipal:
         self.root.state('zoomed')
         
         # Conexión a BD
-        self.bd = ConexionBD(HOST, USUARIO, CONTRASEÑA, BASE_DATOS)
+        self.bd = ConexionBD.desde_config()
+        
+        # Catálogo compartido por todas las pestañas (se carga una sola vez)
+        self.catalogo = CatalogoProductos(self.bd)
+        self.catalogo_listo = False
         
         # Intentar conexión
-        if not self.bd.conectar():
-            messagebox.showerror("Error", "No se pudo conectar a la base de datos")
-            self.root.destroy()
-            return
+        conectada = self.bd.conectar()
+        self.marcar("Conexión a la base de datos")
+        if not conectada:
+            if DIARIO_VENTAS and self.catalogo.cargar_copia(RUTA_COPIA_CATALOGO):
+                # Sin conexión se vende con el último catálogo guardado
+                messagebox.showwarning(
+                    "Sin conexión",
+                    "No se pudo conectar a la base de datos.\n"
+                    "Se venderá con el catálogo guardado y las ventas se "
+                    "sincronizarán al recuperar la conexión."
+                )
+            else:
+                messagebox.showerror("Error", "No se pudo conectar a la base de datos")
+                self.root.destroy()
+                return
+        
+        # Se conecta al abrir la pestaña de reportes
+        self.bd_reportes = None
+        
+        # Las ventas se cobran contra el diario local y se envían en segundo plano
+        self.sincronizador = None
+        if DIARIO_VENTAS:
+            self.sincronizador = SincronizadorVentas(self.bd, DiarioVentas(RUTA_DIARIO))
+            self.sincronizador.iniciar()
+            self.sincronizador.avisar()
         
         # Crear interfaz
         self.crear_interfaz()
+        self.marcar("Interfaz de la caja")
+        self.root.after_idle(self.marcar, "Ventana visible")
+        
+        self.tareas = EjecutorTareas(self.root, max_hilos=1)
+        if conectada:
+            self.cargar_catalogo()
+        else:
+            self.root.after_idle(self.caja_lista)
+    
+    def marcar(self, etapa):
+        """Cierra una etapa del arranque si se están midiendo los tiempos"""
+        if self.tiempos:
+            self.tiempos.marcar(etapa)
+    
+    def medir(self, etapa):
+        """Mide una etapa independiente si se están midiendo los tiempos"""
+        return self.tiempos.medir(etapa) if self.tiempos else nullcontext()
+    
+    def cargar_catalogo(self):
+        """Carga el catálogo en segundo plano; la caja ya se ve mientras tanto"""
+        def cargar(cancelacion):
+            with self.medir("Carga del catálogo (segundo plano)"):
+                if self.catalogo.cargar() and DIARIO_VENTAS:
+                    self.catalogo.guardar_copia(RUTA_COPIA_CATALOGO)
+        
+        self.frame_ventas.mostrar_catalogo(cargando=True)
+        self.tareas.ejecutar(
+            'catalogo',
+            cargar,
+            lambda resultado: self.caja_lista(),
+            al_fallar=lambda e: messagebox.showerror("Error", f"No se pudo cargar el catálogo: {e}"),
+            descripcion="Catálogo"
+        )
+    
+    def caja_lista(self):
+        """El catálogo ya está en memoria: se puede vender"""
+        self.catalogo_listo = True
+        self.frame_ventas.mostrar_catalogo()
+        self.marcar("Caja lista para vender")
+        if self.tiempos:
+            print(self.tiempos.informe())
     
     def crear_interfaz(self):
         """Crea la interfaz principal"""
@@ -60,14 +141,16 @@ class VentanaPrincipal:
         self.notebook = ttk.Notebook(self.root)
         self.notebook.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         
-        # Pestañas
-        self.frame_productos = ProductosFrame(self.notebook, self.bd)
-        self.frame_ventas = VentasFrame(self.notebook, self.bd)
-        self.frame_reportes = ReportesFrame(self.notebook, self.bd)
+        # Pestañas: solo la caja se construye al arrancar
+        self.frame_productos = None
+        self.frame_reportes = None
+        self.pestañas_diferidas = {}    # índice -> (marco, función que construye la pestaña)
         
-        self.notebook.add(self.frame_productos, text="Productos")
+        self.agregar_pestaña_diferida("Productos", self.crear_productos)
+        self.frame_ventas = VentasFrame(self.notebook, self.bd, self.catalogo, self.sincronizador)
         self.notebook.add(self.frame_ventas, text="Punto de Venta")
-        self.notebook.add(self.frame_reportes, text="Reportes")
+        self.agregar_pestaña_diferida("Reportes", self.crear_reportes)
+        self.notebook.select(self.frame_ventas)
         
         # Evento para detectar cambio de pestaña
         self.notebook.bind("<<NotebookTabChanged>>", self.on_tab_changed)
@@ -84,32 +167,68 @@ class VentanaPrincipal:
             font=("Arial", 9)
         ).pack(pady=5)
     
+    def agregar_pestaña_diferida(self, texto, construir):
+        """Agrega una pestaña vacía que se construye al abrirla"""
+        marco = ttk.Frame(self.notebook)
+        self.notebook.add(marco, text=texto)
+        self.pestañas_diferidas[self.notebook.index(marco)] = (marco, construir)
+    
+    def crear_productos(self, marco):
+        """Construye la pestaña de productos"""
+        self.frame_productos = ProductosFrame(marco, self.bd, self.catalogo)
+        return self.frame_productos
+    
+    def crear_reportes(self, marco):
+        """Construye la pestaña de reportes (importa Matplotlib y pandas)"""
+        from gui.reportes_gui import ReportesFrame
+        
+        # Pool aparte para reportes: una consulta pesada no ocupa las
+        # conexiones que necesita la caja
+        self.bd_reportes = ConexionBD.desde_config(tamaño_pool=2, instrumentacion=self.bd.instrumentacion)
+        if not self.bd_reportes.conectar():
+            self.bd_reportes = self.bd
+        
+        self.frame_reportes = ReportesFrame(marco, self.bd_reportes)
+        return self.frame_reportes
+    
     def on_tab_changed(self, event):
         """Se ejecuta cuando cambias de pestaña"""
         # Obtener el índice de la pestaña seleccionada
         tab_seleccionada = self.notebook.index(self.notebook.select())
         
+        # Primera vez que se abre: construir la pestaña
+        if tab_seleccionada in self.pestañas_diferidas:
+            marco, construir = self.pestañas_diferidas.pop(tab_seleccionada)
+            etapa = f"Pestaña {self.notebook.tab(tab_seleccionada, 'text')}"
+            with self.medir(etapa):
+                construir(marco).pack(fill=tk.BOTH, expand=True)
+            if self.tiempos:
+                print(f"✓ {etapa} construida en {self.tiempos.duracion(etapa):.1f} ms")
+        
         # Si cambias a Punto de Venta (índice 1), recargar productos
-        if tab_seleccionada == 1:
-            # Recargar sin mostrar mensaje (silencioso)
-            sql = """
-                SELECT 
-                    p.id,
-                    p.nombre,
-                    c.nombre as categoria,
-                    p.precio_venta,
-                    p.stock
-                FROM productos p
-                JOIN categorias c ON p.categoria_id = c.id
-                WHERE p.activo = TRUE
-                ORDER BY p.nombre
-            """
-            self.frame_ventas.todos_productos = self.bd.ejecutar_consulta(sql) or []
-            self.frame_ventas.actualizar_sugerencias()
+        if tab_seleccionada == 1 and self.catalogo_listo:
+            # Solo consulta la versión del catálogo; relee lo que cambió
+            self.catalogo.refrescar()
+            self.frame_ventas.mostrar_catalogo()
     
     def cerrar_aplicacion(self):
         """Cierra la aplicación correctamente"""
+        # Regresar al stock lo apartado en el carrito abierto
+        self.frame_ventas.limpiar_carrito()
+        self.tareas.cerrar()
+        if self.frame_productos:
+            self.frame_productos.cerrar()
+        if self.frame_reportes:
+            self.frame_reportes.cerrar()
+        if self.sincronizador:
+            # Lo que no alcance a enviarse queda en el diario para la próxima vez
+            self.sincronizador.detener()
+        if self.bd_reportes and self.bd_reportes is not self.bd:
+            self.bd_reportes.desconectar()
         self.bd.desconectar()
+        if self.bd.instrumentacion:
+            # Consultas más lentas de la sesión: python -m database.instrumentacion
+            self.bd.instrumentacion.guardar(RUTA_ESTADISTICAS)
         self.root.destroy()
 
 
@@ -0,0 +1,69 @@
+"""
+Tiempos del arranque de la aplicación
+
+iniciar.py marca cada etapa hasta que la caja está lista para vender
+(ventana visible y catálogo cargado). Con --tiempos se imprime el informe
+en la consola, en columnas al estilo de python -X importtime:
+
+    python iniciar.py --tiempos
+
+Para el detalle módulo por módulo de los imports:
+
+    python -X importtime iniciar.py 2> imports.txt
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+
+class TiemposArranque:
+    """Etapas del arranque con su duración y el tiempo desde el inicio"""
+    
+    def __init__(self, inicio=None):
+        """
+        Args:
+            inicio: time.perf_counter() tomado al comenzar el proceso
+        """
+        self.inicio = time.perf_counter() if inicio is None else inicio
+        self.etapas = []            # (nombre, ms desde el inicio, ms de la etapa)
+        self._ultima = self.inicio
+        self._candado = threading.Lock()
+    
+    def marcar(self, nombre):
+        """Cierra una etapa que empezó al terminar la anterior"""
+        ahora = time.perf_counter()
+        with self._candado:
+            self._agregar(nombre, ahora, ahora - self._ultima)
+            self._ultima = ahora
+    
+    @contextmanager
+    def medir(self, nombre):
+        """Etapa independiente: carga en otro hilo o pestaña diferida"""
+        comienzo = time.perf_counter()
+        try:
+            yield
+        finally:
+            ahora = time.perf_counter()
+            with self._candado:
+                self._agregar(nombre, ahora, ahora - comienzo)
+    
+    def _agregar(self, nombre, ahora, segundos):
+        self.etapas.append((nombre, (ahora - self.inicio) * 1000, segundos * 1000))
+    
+    def duracion(self, nombre):
+        """Milisegundos de la última etapa con ese nombre (None si no ocurrió)"""
+        with self._candado:
+            for etapa, _, ms in reversed(self.etapas):
+                if etapa == nombre:
+                    return ms
+        return None
+    
+    def informe(self):
+        """Tabla de texto con una etapa por renglón, en orden de término"""
+        with self._candado:
+            etapas = sorted(self.etapas, key=lambda e: e[1])
+        renglones = [f"{'Inicio ms':>10} | {'Etapa ms':>9} | Etapa"]
+        for nombre, desde_inicio, duracion in etapas:
+            renglones.append(f"{desde_inicio:>10.1f} | {duracion:>9.1f} | {nombre}")
+        return "\n".join(renglones)
@@ -1,256 +1,386 @@
 """
 Módulo de gráficas y visualizaciones
+
+Los datos salen de AnaliticaVentas: la primera gráfica carga las líneas
+de venta y las siguientes solo leen lo vendido después.
+
+Cada tipo de gráfica tiene una sola ventana con su figura. Volver a pedir
+la gráfica actualiza en el lugar la altura de las barras y los datos de
+las líneas y repinta solo esos artistas sobre el fondo guardado
+(blitting); el redibujo completo queda para cuando cambian los ejes, las
+etiquetas o el tamaño de la ventana. Los datos se preparan en el hilo de
+la tarea; Matplotlib y Tkinter solo se tocan desde el hilo de la interfaz.
 """
 
 import tkinter as tk
 from tkinter import ttk, messagebox
-from datetime import datetime, timedelta
-import matplotlib.pyplot as plt
+import numpy as np
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.container import Container
 from matplotlib.figure import Figure
-import pandas as pd
-import numpy as np
+from database.consultas import RangoFechas
+
+
+COLORES_CATEGORIAS = ['#3498db', '#e74c3c', '#2ecc71', '#f39c12', '#9b59b6', '#1abc9c', '#34495e']
+
+# El tope del eje Y deja este espacio sobre el máximo para las etiquetas;
+# si el máximo nuevo baja de FRACCION_MINIMA_EJE del tope, se reajusta
+ESPACIO_EJE = 1.25
+FRACCION_MINIMA_EJE = 0.5
+
+
+def ajustar_eje_y(ax, maximo):
+    """
+    Ajusta el tope del eje Y solo si los datos no caben o quedaron muy bajos
+    
+    Returns:
+        True si cambió el eje (hace falta redibujo completo)
+    """
+    piso, tope = ax.get_ylim()
+    if piso == 0 and 0 < maximo <= tope and maximo >= tope * FRACCION_MINIMA_EJE:
+        return False
+    ax.set_ylim(0, max(maximo, 1) * ESPACIO_EJE)
+    return True
+
+
+def poner_etiquetas_x(ax, etiquetas):
+    """Una marca por posición 0..n-1 con su texto"""
+    ax.set_xticks(range(len(etiquetas)))
+    ax.set_xticklabels(etiquetas, rotation=45, ha='right')
+    ax.set_xlim(-0.5, len(etiquetas) - 0.5)
+
+
+class PanelGrafica:
+    """Ventana con una figura persistente que se actualiza con blitting"""
+    
+    def __init__(self, titulo, geometria, tamaño, al_cerrar):
+        """
+        Args:
+            titulo: Título de la ventana
+            geometria: Tamaño inicial de la ventana ("800x500")
+            tamaño: Tamaño de la figura en pulgadas
+            al_cerrar: Se llama cuando el usuario cierra la ventana
+        """
+        self.ventana = tk.Toplevel()
+        self.ventana.title(titulo)
+        self.ventana.geometry(geometria)
+        self.ventana.protocol("WM_DELETE_WINDOW", self.cerrar)
+        self._al_cerrar = al_cerrar
+        
+        self.figura = Figure(figsize=tamaño, dpi=80)
+        self.canvas = FigureCanvasTkAgg(self.figura, master=self.ventana)
+        self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        self.canvas.mpl_connect('draw_event', self._al_dibujar)
+        
+        self.artistas = {}          # Nombre -> artista o contenedor que se actualiza
+        self.animados = []          # Artistas que no forman parte del fondo
+        self._fondo = None
+    
+    def animar(self, *artistas):
+        """Marca artistas (o contenedores de barras) que cambian con los datos"""
+        for artista in artistas:
+            for parte in (artista if isinstance(artista, Container) else [artista]):
+                parte.set_animated(True)
+                self.animados.append(parte)
+    
+    def quitar(self, *artistas):
+        """Quita de la figura artistas animados (o contenedores de barras)"""
+        for artista in artistas:
+            for parte in (artista if isinstance(artista, Container) else [artista]):
+                self.animados.remove(parte)
+            artista.remove()
+    
+    def redibujar(self, completo=False, al_frente=True):
+        """
+        Muestra los datos nuevos
+        
+        Args:
+            completo: True si cambiaron ejes, etiquetas o artistas; si no,
+                      solo se repintan los artistas animados sobre el fondo
+            al_frente: Trae la ventana al frente (False al refrescar solo)
+        """
+        if completo or self._fondo is None:
+            self.figura.tight_layout()
+            # _al_dibujar guarda el fondo nuevo y pinta los animados
+            self.canvas.draw()
+        else:
+            self.canvas.restore_region(self._fondo)
+            self._pintar_animados()
+            self.canvas.blit(self.figura.bbox)
+        if al_frente:
+            self.ventana.deiconify()
+            self.ventana.lift()
+    
+    def cerrar(self):
+        """Destruye la ventana y libera la figura"""
+        self.ventana.destroy()
+        self._al_cerrar()
+    
+    def _al_dibujar(self, evento):
+        """Tras un dibujo completo (incluido un cambio de tamaño) guarda el fondo"""
+        self._fondo = self.canvas.copy_from_bbox(self.figura.bbox)
+        self._pintar_animados()
+    
+    def _pintar_animados(self):
+        for artista in self.animados:
+            self.figura.draw_artist(artista)
 
 
 class VentanaGraficas:
-    """Ventana para mostrar gráficas avanzadas"""
+    """Ventanas de gráficas avanzadas, una por tipo de gráfica"""
     
-    def __init__(self, bd):
+    def __init__(self, bd, tareas, analitica):
         self.bd = bd
-        self.ventana = None
+        self.tareas = tareas
+        self.analitica = analitica
+        self.paneles = {}           # Tipo de gráfica -> PanelGrafica abierto
     
-    def grafica_ventas_por_hora(self):
-        """Muestra las ventas por hora del día"""
-        ventana = tk.Toplevel()
-        ventana.title("Ventas por Hora del Día")
-        ventana.geometry("800x500")
-        
-        # Obtener datos
-        fecha = datetime.now().date()
-        sql = """
-            SELECT 
-                HOUR(v.hora) as hora,
-                COUNT(*) as cantidad,
-                SUM(v.total) as total
-            FROM ventas v
-            WHERE DATE(v.fecha) = %s
-            GROUP BY HOUR(v.hora)
-            ORDER BY hora
+    def consultar(self, clave, descripcion, funcion, al_terminar):
+        """Pone al día la analítica y calcula los datos de una gráfica en segundo plano"""
+        def obtener(cancelacion):
+            self.analitica.actualizar()
+            return funcion(cancelacion)
+        
+        self.tareas.ejecutar(
+            clave,
+            obtener,
+            al_terminar,
+            al_fallar=lambda e: messagebox.showerror("Error", f"Error en la gráfica: {e}"),
+            descripcion=descripcion
+        )
+    
+    def panel(self, tipo, titulo, geometria, tamaño):
         """
+        La ventana de ese tipo de gráfica
         
-        datos = self.bd.ejecutar_consulta(sql, (fecha,))
-        
-        if not datos:
-            messagebox.showinfo("Información", "No hay datos de ventas para hoy")
+        Returns:
+            (panel, nuevo): nuevo es True si se acaba de crear
+        """
+        panel = self.paneles.get(tipo)
+        if panel is not None:
+            return panel, False
+        panel = PanelGrafica(titulo, geometria, tamaño, lambda: self.paneles.pop(tipo, None))
+        self.paneles[tipo] = panel
+        return panel, True
+    
+    def grafica_ventas_por_hora(self, rango=None):
+        """Muestra las ventas por hora del día (hoy por omisión)"""
+        rango = rango or RangoFechas.hoy()
+        
+        def obtener_datos(cancelacion):
+            datos = self.analitica.ventas_por_hora(rango)
+            totales = np.zeros(24)
+            totales[datos['hora'].to_numpy()] = datos['total'].to_numpy()
+            return totales
+        
+        self.consultar(
+            ('grafica_hora', rango), "Ventas por hora",
+            obtener_datos,
+            lambda totales: self.mostrar_ventas_por_hora(totales, rango)
+        )
+    
+    def mostrar_ventas_por_hora(self, totales, rango, al_frente=True):
+        """Dibuja la gráfica de ventas por hora (las 24 horas)"""
+        if not totales.any():
+            messagebox.showinfo("Información", f"No hay datos de ventas para {rango}")
             return
         
-        # Preparar datos para gráfica
-        horas = [f"{d['hora']:02d}:00" for d in datos]
-        ventas = [d['total'] for d in datos]
-        
-        # Crear figura
-        fig = Figure(figsize=(10, 5), dpi=80)
-        ax = fig.add_subplot(111)
-        
-        ax.bar(horas, ventas, color='#3498db', edgecolor='#2c3e50', linewidth=2)
-        ax.set_xlabel('Hora del Día', fontsize=12, fontweight='bold')
-        ax.set_ylabel('Total de Ventas ($)', fontsize=12, fontweight='bold')
-        ax.set_title('Ventas por Hora - Día de Hoy', fontsize=14, fontweight='bold')
-        ax.grid(axis='y', alpha=0.3)
-        
-        # Agregar valores sobre las barras
-        for i, v in enumerate(ventas):
-            ax.text(i, v + 5, f'${v:.2f}', ha='center', va='bottom', fontweight='bold')
-        
-        # Rotar eje x
-        plt.setp(ax.xaxis.get_majorticklabels(), rotation=45, ha='right')
-        
-        fig.tight_layout()
-        
-        # Embedder en Tkinter
-        canvas = FigureCanvasTkAgg(fig, master=ventana)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        panel, completo = self.panel('hora', "Ventas por Hora del Día", "800x500", (10, 5))
+        if completo:
+            ax = panel.figura.add_subplot(111)
+            barras = ax.bar(range(24), np.zeros(24), color='#3498db', edgecolor='#2c3e50', linewidth=2)
+            textos = [ax.text(i, 0, '', ha='center', va='bottom', rotation=90, fontweight='bold', fontsize=8)
+                      for i in range(24)]
+            titulo = ax.set_title('', fontsize=14, fontweight='bold')
+            ax.set_xlabel('Hora del Día', fontsize=12, fontweight='bold')
+            ax.set_ylabel('Total de Ventas ($)', fontsize=12, fontweight='bold')
+            ax.grid(axis='y', alpha=0.3)
+            poner_etiquetas_x(ax, [f"{h:02d}:00" for h in range(24)])
+            panel.artistas.update(barras=barras, textos=textos, titulo=titulo)
+            panel.animar(barras, *textos, titulo)
+        
+        ax = panel.figura.axes[0]
+        for barra, texto, v in zip(panel.artistas['barras'], panel.artistas['textos'], totales):
+            barra.set_height(v)
+            texto.set_y(v + 5)
+            texto.set_text(f'${v:.2f}' if v else '')
+        panel.artistas['titulo'].set_text(f'Ventas por Hora - {rango}')
+        
+        completo |= ajustar_eje_y(ax, totales.max())
+        panel.redibujar(completo, al_frente)
     
-    def grafica_producto_mas_vendido(self):
-        """Muestra tendencia del producto más vendido"""
-        # Obtener el producto más vendido este mes
-        sql = """
-            SELECT 
-                p.id,
-                p.nombre,
-                SUM(dv.cantidad) as total
-            FROM productos p
-            JOIN detalle_ventas dv ON p.id = dv.producto_id
-            JOIN ventas v ON dv.venta_id = v.id
-            WHERE MONTH(v.fecha) = MONTH(NOW()) AND YEAR(v.fecha) = YEAR(NOW())
-            GROUP BY p.id
-            ORDER BY total DESC
-            LIMIT 1
-        """
-        
-        producto_top = self.bd.ejecutar_consulta(sql)
+    def grafica_producto_mas_vendido(self, rango=None):
+        """Muestra tendencia del producto más vendido (mes actual por omisión)"""
+        rango = rango or RangoFechas.mes_actual()
+        
+        def obtener_datos(cancelacion):
+            producto_top = self.analitica.productos_mas_vendidos(rango, limite=1)
+            if producto_top.empty or cancelacion.cancelada:
+                return None, None
+            producto_top = producto_top.iloc[0]
+            datos = self.analitica.tendencia_producto(producto_top['id'], rango)
+            fechas = list(datos['fecha'].dt.strftime('%Y-%m-%d'))
+            return producto_top['nombre'], (fechas, datos['cantidad'].to_numpy())
+        
+        self.consultar(
+            ('grafica_producto', rango), "Producto top",
+            obtener_datos,
+            lambda resultado: self.mostrar_producto_mas_vendido(resultado, rango)
+        )
+    
+    def mostrar_producto_mas_vendido(self, resultado, rango):
+        """Dibuja la tendencia diaria del producto más vendido"""
+        producto_nombre, datos = resultado
         
-        if not producto_top:
-            messagebox.showinfo("Información", "No hay ventas este mes")
+        if producto_nombre is None:
+            messagebox.showinfo("Información", f"No hay ventas para {rango}")
             return
         
-        producto_id = producto_top[0]['id']
-        producto_nombre = producto_top[0]['nombre']
-        
-        # Obtener datos diarios
-        sql_dias = """
-            SELECT 
-                DATE(v.fecha) as fecha,
-                SUM(dv.cantidad) as cantidad,
-                SUM(dv.subtotal) as ingresos
-            FROM detalle_ventas dv
-            JOIN ventas v ON dv.venta_id = v.id
-            WHERE dv.producto_id = %s
-            AND MONTH(v.fecha) = MONTH(NOW())
-            AND YEAR(v.fecha) = YEAR(NOW())
-            GROUP BY DATE(v.fecha)
-            ORDER BY fecha
-        """
-        
-        datos = self.bd.ejecutar_consulta(sql_dias, (producto_id,))
-        
-        if not datos:
+        fechas, cantidades = datos
+        if not fechas:
             messagebox.showinfo("Información", "No hay datos para este producto")
             return
         
-        # Crear figura
-        ventana = tk.Toplevel()
-        ventana.title(f"Tendencia - {producto_nombre}")
-        ventana.geometry("900x500")
-        
-        fig = Figure(figsize=(12, 5), dpi=80)
-        ax = fig.add_subplot(111)
-        
-        fechas = [str(d['fecha']) for d in datos]
-        cantidades = [d['cantidad'] for d in datos]
-        ingresos = [d['ingresos'] for d in datos]
-        
-        ax.plot(fechas, cantidades, marker='o', linewidth=2, markersize=8, label='Cantidad', color='#3498db')
-        ax.set_xlabel('Fecha', fontsize=12, fontweight='bold')
-        ax.set_ylabel('Cantidad Vendida', fontsize=12, fontweight='bold')
-        ax.set_title(f'Tendencia de Ventas - {producto_nombre}', fontsize=14, fontweight='bold')
-        ax.grid(True, alpha=0.3)
-        ax.legend()
-        
-        # Rotar eje x
-        plt.setp(ax.xaxis.get_majorticklabels(), rotation=45, ha='right')
-        
-        fig.tight_layout()
-        
-        canvas = FigureCanvasTkAgg(fig, master=ventana)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        panel, completo = self.panel('producto', "Tendencia", "900x500", (12, 5))
+        if completo:
+            ax = panel.figura.add_subplot(111)
+            linea, = ax.plot([], [], marker='o', linewidth=2, markersize=8, label='Cantidad', color='#3498db')
+            titulo = ax.set_title('', fontsize=14, fontweight='bold')
+            ax.set_xlabel('Fecha', fontsize=12, fontweight='bold')
+            ax.set_ylabel('Cantidad Vendida', fontsize=12, fontweight='bold')
+            ax.grid(True, alpha=0.3)
+            ax.legend()
+            panel.artistas.update(linea=linea, titulo=titulo, fechas=None)
+            panel.animar(linea, titulo)
+        
+        ax = panel.figura.axes[0]
+        if fechas != panel.artistas['fechas']:
+            poner_etiquetas_x(ax, fechas)
+            panel.artistas['fechas'] = fechas
+            completo = True
+        
+        panel.ventana.title(f"Tendencia - {producto_nombre}")
+        panel.artistas['linea'].set_data(range(len(fechas)), cantidades)
+        panel.artistas['titulo'].set_text(f'Tendencia de Ventas - {producto_nombre}')
+        
+        completo |= ajustar_eje_y(ax, cantidades.max())
+        panel.redibujar(completo)
     
-    def grafica_categorias_mas_vendidas(self):
-        """Muestra categorías con más ventas"""
-        sql = """
-            SELECT 
-                c.nombre,
-                SUM(dv.cantidad) as total_cantidad,
-                SUM(dv.subtotal) as total_ingresos
-            FROM categorias c
-            JOIN productos p ON c.id = p.categoria_id
-            JOIN detalle_ventas dv ON p.id = dv.producto_id
-            GROUP BY c.id
-            ORDER BY total_ingresos DESC
-        """
-        
-        datos = self.bd.ejecutar_consulta(sql)
-        
-        if not datos:
+    def grafica_categorias_mas_vendidas(self, rango=None):
+        """Muestra categorías con más ventas (todo el historial por omisión)"""
+        def obtener_datos(cancelacion):
+            datos = self.analitica.ingresos_por_categoria(rango)
+            return list(datos['nombre']), datos['total_ingresos'].to_numpy()
+        
+        self.consultar(
+            ('grafica_categorias', rango), "Categorías",
+            obtener_datos,
+            self.mostrar_categorias_mas_vendidas
+        )
+    
+    def mostrar_categorias_mas_vendidas(self, datos):
+        """Dibuja los ingresos por categoría"""
+        categorias, ingresos = datos
+        if not categorias:
             messagebox.showinfo("Información", "No hay datos de ventas")
             return
         
-        ventana = tk.Toplevel()
-        ventana.title("Categorías Más Vendidas")
-        ventana.geometry("900x500")
-        
-        fig = Figure(figsize=(12, 5), dpi=80)
-        ax = fig.add_subplot(111)
-        
-        categorias = [d['nombre'] for d in datos]
-        ingresos = [d['total_ingresos'] for d in datos]
-        
-        colors = ['#3498db', '#e74c3c', '#2ecc71', '#f39c12', '#9b59b6', '#1abc9c', '#34495e']
-        ax.bar(categorias, ingresos, color=colors[:len(categorias)], edgecolor='#2c3e50', linewidth=2)
-        
-        ax.set_xlabel('Categoría', fontsize=12, fontweight='bold')
-        ax.set_ylabel('Ingresos ($)', fontsize=12, fontweight='bold')
-        ax.set_title('Ingresos por Categoría', fontsize=14, fontweight='bold')
-        ax.grid(axis='y', alpha=0.3)
-        
-        # Agregar valores
-        for i, v in enumerate(ingresos):
-            ax.text(i, v + 10, f'${v:.2f}', ha='center', va='bottom', fontweight='bold', fontsize=9)
-        
-        plt.setp(ax.xaxis.get_majorticklabels(), rotation=45, ha='right')
-        
-        fig.tight_layout()
-        
-        canvas = FigureCanvasTkAgg(fig, master=ventana)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        panel, completo = self.panel('categorias', "Categorías Más Vendidas", "900x500", (12, 5))
+        if completo:
+            ax = panel.figura.add_subplot(111)
+            ax.set_xlabel('Categoría', fontsize=12, fontweight='bold')
+            ax.set_ylabel('Ingresos ($)', fontsize=12, fontweight='bold')
+            ax.set_title('Ingresos por Categoría', fontsize=14, fontweight='bold')
+            ax.grid(axis='y', alpha=0.3)
+            panel.artistas.update(barras=None, textos=[], categorias=None)
+        
+        ax = panel.figura.axes[0]
+        if categorias != panel.artistas['categorias']:
+            # Otro orden u otras categorías: se rehacen las barras
+            if panel.artistas['barras'] is not None:
+                panel.quitar(panel.artistas['barras'], *panel.artistas['textos'])
+            barras = ax.bar(range(len(categorias)), np.zeros(len(categorias)),
+                            color=COLORES_CATEGORIAS[:len(categorias)], edgecolor='#2c3e50', linewidth=2)
+            textos = [ax.text(i, 0, '', ha='center', va='bottom', fontweight='bold', fontsize=9)
+                      for i in range(len(categorias))]
+            poner_etiquetas_x(ax, categorias)
+            panel.artistas.update(barras=barras, textos=textos, categorias=categorias)
+            panel.animar(barras, *textos)
+            completo = True
+        
+        for barra, texto, v in zip(panel.artistas['barras'], panel.artistas['textos'], ingresos):
+            barra.set_height(v)
+            texto.set_y(v + 10)
+            texto.set_text(f'${v:.2f}')
+        
+        completo |= ajustar_eje_y(ax, ingresos.max())
+        panel.redibujar(completo)
     
-    def grafica_tendencia_ventas_mes(self):
-        """Muestra la tendencia de ventas del mes"""
-        sql = """
-            SELECT 
-                DATE(fecha) as fecha,
-                COUNT(*) as cantidad_ventas,
-                SUM(total) as total_ingresos
-            FROM ventas
-            WHERE MONTH(fecha) = MONTH(NOW())
-            AND YEAR(fecha) = YEAR(NOW())
-            GROUP BY DATE(fecha)
-            ORDER BY fecha
-        """
-        
-        datos = self.bd.ejecutar_consulta(sql)
-        
-        if not datos:
-            messagebox.showinfo("Información", "No hay datos de ventas este mes")
+    def grafica_tendencia_ventas_mes(self, rango=None):
+        """Muestra la tendencia diaria de ventas (mes actual por omisión)"""
+        rango = rango or RangoFechas.mes_actual()
+        
+        def obtener_datos(cancelacion):
+            datos = self.analitica.tendencia_diaria(rango)
+            return (list(datos['fecha'].dt.strftime('%Y-%m-%d')),
+                    datos['total_ingresos'].to_numpy(),
+                    datos['cantidad_ventas'].to_numpy())
+        
+        self.consultar(
+            ('grafica_mes', rango), "Tendencia del periodo",
+            obtener_datos,
+            lambda datos: self.mostrar_tendencia_ventas_mes(datos, rango)
+        )
+    
+    def mostrar_tendencia_ventas_mes(self, datos, rango):
+        """Dibuja ingresos y transacciones diarias del periodo"""
+        fechas, ingresos, cantidades = datos
+        if not fechas:
+            messagebox.showinfo("Información", f"No hay datos de ventas para {rango}")
             return
         
-        ventana = tk.Toplevel()
-        ventana.title("Tendencia de Ventas del Mes")
-        ventana.geometry("1000x600")
-        
-        fig = Figure(figsize=(13, 6), dpi=80)
-        
-        # Gráfica 1: Ingresos
-        ax1 = fig.add_subplot(121)
-        fechas = [str(d['fecha']) for d in datos]
-        ingresos = [d['total_ingresos'] for d in datos]
-        
-        ax1.plot(fechas, ingresos, marker='o', linewidth=2.5, markersize=8, color='#27ae60', label='Ingresos')
-        ax1.fill_between(range(len(fechas)), ingresos, alpha=0.3, color='#27ae60')
-        ax1.set_xlabel('Fecha', fontsize=11, fontweight='bold')
-        ax1.set_ylabel('Ingresos ($)', fontsize=11, fontweight='bold')
-        ax1.set_title('Ingresos Diarios', fontsize=12, fontweight='bold')
-        ax1.grid(True, alpha=0.3)
-        
-        # Gráfica 2: Cantidad de ventas
-        ax2 = fig.add_subplot(122)
-        cantidades = [d['cantidad_ventas'] for d in datos]
-        
-        ax2.bar(fechas, cantidades, color='#e74c3c', edgecolor='#2c3e50', linewidth=2, alpha=0.8)
-        ax2.set_xlabel('Fecha', fontsize=11, fontweight='bold')
-        ax2.set_ylabel('Cantidad de Ventas', fontsize=11, fontweight='bold')
-        ax2.set_title('Cantidad de Transacciones', fontsize=12, fontweight='bold')
-        ax2.grid(axis='y', alpha=0.3)
-        
-        # Rotar eje x
-        plt.setp(ax1.xaxis.get_majorticklabels(), rotation=45, ha='right')
-        plt.setp(ax2.xaxis.get_majorticklabels(), rotation=45, ha='right')
-        
-        fig.tight_layout()
-        
-        canvas = FigureCanvasTkAgg(fig, master=ventana)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        panel, completo = self.panel('mes', "Tendencia de Ventas", "1000x600", (13, 6))
+        if completo:
+            # Gráfica 1: Ingresos
+            ax1 = panel.figura.add_subplot(121)
+            linea, = ax1.plot([], [], marker='o', linewidth=2.5, markersize=8, color='#27ae60', label='Ingresos')
+            ax1.set_xlabel('Fecha', fontsize=11, fontweight='bold')
+            ax1.set_ylabel('Ingresos ($)', fontsize=11, fontweight='bold')
+            ax1.set_title('Ingresos Diarios', fontsize=12, fontweight='bold')
+            ax1.grid(True, alpha=0.3)
+            
+            # Gráfica 2: Cantidad de ventas
+            ax2 = panel.figura.add_subplot(122)
+            ax2.set_xlabel('Fecha', fontsize=11, fontweight='bold')
+            ax2.set_ylabel('Cantidad de Ventas', fontsize=11, fontweight='bold')
+            ax2.set_title('Cantidad de Transacciones', fontsize=12, fontweight='bold')
+            ax2.grid(axis='y', alpha=0.3)
+            
+            panel.artistas.update(linea=linea, relleno=None, barras=None, fechas=None)
+            panel.animar(linea)
+        
+        ax1, ax2 = panel.figura.axes
+        if fechas != panel.artistas['fechas']:
+            if panel.artistas['barras'] is not None:
+                panel.quitar(panel.artistas['barras'])
+            barras = ax2.bar(range(len(fechas)), np.zeros(len(fechas)),
+                             color='#e74c3c', edgecolor='#2c3e50', linewidth=2, alpha=0.8)
+            poner_etiquetas_x(ax1, fechas)
+            poner_etiquetas_x(ax2, fechas)
+            panel.artistas.update(barras=barras, fechas=fechas)
+            panel.animar(barras)
+            completo = True
+        
+        panel.ventana.title(f"Tendencia de Ventas - {rango}")
+        panel.artistas['linea'].set_data(range(len(fechas)), ingresos)
+        # El área bajo la línea no se puede modificar: se reemplaza
+        if panel.artistas['relleno'] is not None:
+            panel.quitar(panel.artistas['relleno'])
+        panel.artistas['relleno'] = ax1.fill_between(range(len(fechas)), ingresos, alpha=0.3, color='#27ae60')
+        panel.animar(panel.artistas['relleno'])
+        for barra, v in zip(panel.artistas['barras'], cantidades):
+            barra.set_height(v)
+        
+        completo |= ajustar_eje_y(ax1, ingresos.max())
+        completo |= ajustar_eje_y(ax2, cantidades.max())
+        panel.redibujar(completo)
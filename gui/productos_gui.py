@@ -3,14 +3,29 @@ GUI para gestión de productos
 """
 
 import tkinter as tk
-from tkinter import ttk, messagebox, simpledialog
+from tkinter import ttk, messagebox, simpledialog, filedialog
 from datetime import datetime, timedelta
+from database.dinero import Dinero
+from database.importacion import ImportadorProductos, exportar_productos
+from gui.ajustes_gui import VentanaAjustes
+from gui.tabla_virtual import TablaVirtual
+from gui.tareas import EjecutorTareas
 
 
 class ProductosFrame(ttk.Frame):
-    def __init__(self, parent, bd):
+    def __init__(self, parent, bd, catalogo):
         super().__init__(parent)
         self.bd = bd
+        self.catalogo = catalogo
+        
+        # Estado de la búsqueda incremental
+        self._termino_filtrado = None
+        self._filtrado_pendiente = None
+        
+        # Importaciones, exportaciones y ajustes masivos en segundo plano, uno a la vez
+        self.tareas = EjecutorTareas(self, max_hilos=1)
+        self.importador = ImportadorProductos(bd)
+        
         self.crear_interfaz()
     
     def crear_interfaz(self):
@@ -28,6 +43,9 @@ class ProductosFrame(ttk.Frame):
         ttk.Button(frame_botones, text="✏️  Modificar", command=self.modificar_producto).pack(side=tk.LEFT, padx=2)
         ttk.Button(frame_botones, text="🗑️  Eliminar", command=self.eliminar_producto).pack(side=tk.LEFT, padx=2)
         ttk.Button(frame_botones, text="🔄 Recargar", command=self.cargar_productos).pack(side=tk.LEFT, padx=2)
+        ttk.Button(frame_botones, text="📥 Importar", command=self.importar_productos).pack(side=tk.LEFT, padx=2)
+        ttk.Button(frame_botones, text="📤 Exportar", command=self.exportar_productos).pack(side=tk.LEFT, padx=2)
+        ttk.Button(frame_botones, text="⚙️  Ajuste masivo", command=self.ajuste_masivo).pack(side=tk.LEFT, padx=2)
         
         # Frame de búsqueda
         frame_busqueda = ttk.Frame(self)
@@ -36,117 +54,70 @@ class ProductosFrame(ttk.Frame):
         ttk.Label(frame_busqueda, text="Buscar:").pack(side=tk.LEFT, padx=5)
         self.entrada_busqueda = ttk.Entry(frame_busqueda, width=30)
         self.entrada_busqueda.pack(side=tk.LEFT, padx=5)
-        self.entrada_busqueda.bind('<KeyRelease>', lambda e: self.filtrar_productos())
+        self.entrada_busqueda.bind('<KeyRelease>', lambda e: self.programar_filtrado())
         
-        # Tabla de productos
-        self.tree = ttk.Treeview(
+        # Tabla de productos (solo dibuja las filas visibles)
+        self.tabla = TablaVirtual(
             self,
-            columns=('ID', 'Producto', 'Categoría', 'Precio', 'Stock', 'Mínimo'),
-            height=15,
-            show='headings'
+            columnas=[
+                ('ID', 40, 'id'),
+                ('Producto', 200, 'nombre'),
+                ('Categoría', 120, 'categoria'),
+                ('Precio', 80, 'precio_venta'),
+                ('Stock', 80, 'stock'),
+                ('Mínimo', 80, 'stock_minimo')
+            ],
+            formatear=self.valores_fila,
+            # Colorear fila si stock es bajo
+            etiquetas=lambda prod: ('stock_bajo',) if prod['stock'] <= prod['stock_minimo'] else (),
+            alto=15
         )
-        
-        # Definir encabezados
-        self.tree.column('ID', width=40)
-        self.tree.column('Producto', width=200)
-        self.tree.column('Categoría', width=120)
-        self.tree.column('Precio', width=80)
-        self.tree.column('Stock', width=80)
-        self.tree.column('Mínimo', width=80)
-        
-        self.tree.heading('ID', text='ID')
-        self.tree.heading('Producto', text='Producto')
-        self.tree.heading('Categoría', text='Categoría')
-        self.tree.heading('Precio', text='Precio')
-        self.tree.heading('Stock', text='Stock')
-        self.tree.heading('Mínimo', text='Mínimo')
-        
-        # Scrollbar
-        scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.tree.yview)
-        self.tree.configure(yscroll=scrollbar.set)
-        
-        self.tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tabla.tag_configure('stock_bajo', background='#ffcccc')
+        self.tabla.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         
         # Cargar datos iniciales
         self.cargar_productos()
     
     def cargar_productos(self):
         """Carga los productos en la tabla"""
-        # Limpiar tabla
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
-        # Consultar productos
-        sql = """
-            SELECT 
-                p.id,
-                p.nombre,
-                c.nombre as categoria,
-                p.precio_venta,
-                p.stock,
-                p.stock_minimo
-            FROM productos p
-            JOIN categorias c ON p.categoria_id = c.id
-            WHERE p.activo = TRUE
-            ORDER BY c.nombre, p.nombre
-        """
-        
-        productos = self.bd.ejecutar_consulta(sql)
-        
-        if productos:
-            for prod in productos:
-                valores = (
-                    prod['id'],
-                    prod['nombre'],
-                    prod['categoria'],
-                    f"${prod['precio_venta']:.2f}",
-                    prod['stock'],
-                    prod['stock_minimo']
-                )
-                # Colorear fila si stock es bajo
-                tag = 'stock_bajo' if prod['stock'] <= prod['stock_minimo'] else ''
-                self.tree.insert('', tk.END, values=valores, tags=(tag,))
+        # El catálogo solo relee lo que cambió desde la última vez
+        self.catalogo.refrescar()
         
-        # Configurar colores
-        self.tree.tag_configure('stock_bajo', background='#ffcccc')
+        # Volver a aplicar la búsqueda actual sobre el catálogo nuevo
+        self._termino_filtrado = None
+        self.filtrar_productos()
+    
+    def valores_fila(self, prod):
+        """Valores a mostrar en la tabla para un producto"""
+        return (
+            prod['id'],
+            prod['nombre'],
+            prod['categoria'],
+            f"${prod['precio_venta']:.2f}",
+            prod['stock'],
+            prod['stock_minimo']
+        )
+    
+    def programar_filtrado(self):
+        """Espera a que el usuario deje de teclear antes de filtrar"""
+        if self._filtrado_pendiente:
+            self.after_cancel(self._filtrado_pendiente)
+        self._filtrado_pendiente = self.after(150, self.filtrar_productos)
     
     def filtrar_productos(self):
         """Filtra productos por búsqueda"""
+        self._filtrado_pendiente = None
         termino = self.entrada_busqueda.get().lower()
+        if termino == self._termino_filtrado:
+            return
         
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
-        sql = """
-            SELECT 
-                p.id,
-                p.nombre,
-                c.nombre as categoria,
-                p.precio_venta,
-                p.stock,
-                p.stock_minimo
-            FROM productos p
-            JOIN categorias c ON p.categoria_id = c.id
-            WHERE p.activo = TRUE
-            ORDER BY c.nombre, p.nombre
-        """
+        # El índice compartido resuelve nombre (sin acentos) o categoría
+        resultado = self.catalogo.filtrar(termino)
         
-        productos = self.bd.ejecutar_consulta(sql)
-        
-        if productos:
-            for prod in productos:
-                if termino in prod['nombre'].lower() or termino in prod['categoria'].lower():
-                    valores = (
-                        prod['id'],
-                        prod['nombre'],
-                        prod['categoria'],
-                        f"${prod['precio_venta']:.2f}",
-                        prod['stock'],
-                        prod['stock_minimo']
-                    )
-                    tag = 'stock_bajo' if prod['stock'] <= prod['stock_minimo'] else ''
-                    self.tree.insert('', tk.END, values=valores, tags=(tag,))
+        # La tabla conserva el orden por columna elegido y dibuja solo lo visible
+        self.tabla.mostrar(resultado)
+        
+        self._termino_filtrado = termino
     
     def agregar_producto(self):
         """Abre diálogo para agregar producto"""
@@ -188,20 +159,28 @@ class ProductosFrame(ttk.Frame):
         entrada_vencimiento = ttk.Entry(ventana, width=30)
         entrada_vencimiento.grid(row=6, column=1, padx=10, pady=5)
         
+        ttk.Label(ventana, text="Código de barras:").grid(row=7, column=0, sticky=tk.W, padx=10, pady=5)
+        entrada_codigo = ttk.Entry(ventana, width=30)
+        entrada_codigo.grid(row=7, column=1, padx=10, pady=5)
+        
         def guardar():
             try:
                 nombre = entrada_nombre.get().strip()
                 categoria = categoria_var.get()
-                precio_compra = float(entrada_compra.get())
-                precio_venta = float(entrada_venta.get())
+                precio_compra = Dinero.de(entrada_compra.get())
+                precio_venta = Dinero.de(entrada_venta.get())
                 stock = int(entrada_stock.get())
                 stock_minimo = int(entrada_minimo.get())
                 vencimiento = entrada_vencimiento.get() or None
+                codigo = entrada_codigo.get().strip() or None
                 
                 if not nombre or not categoria:
                     messagebox.showerror("Error", "Completa todos los campos")
                     return
                 
+                if self.codigo_en_uso(codigo):
+                    return
+                
                 if precio_venta <= precio_compra:
                     messagebox.showerror("Error", "Precio venta debe ser > precio compra")
                     return
@@ -209,17 +188,19 @@ class ProductosFrame(ttk.Frame):
                 categoria_id = cat_dict[categoria]
                 sql = """
                     INSERT INTO productos 
-                    (nombre, categoria_id, precio_compra, precio_venta, stock, stock_minimo, fecha_vencimiento)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s)
+                    (nombre, categoria_id, precio_compra, precio_venta, stock, stock_minimo, fecha_vencimiento, codigo_barras)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
                 """
                 
                 resultado = self.bd.ejecutar_insertar(
                     sql,
-                    (nombre, categoria_id, precio_compra, precio_venta, stock, stock_minimo, vencimiento)
+                    (nombre, categoria_id, precio_compra.a_decimal(), precio_venta.a_decimal(),
+                     stock, stock_minimo, vencimiento, codigo)
                 )
                 
                 if resultado > 0:
                     messagebox.showinfo("Éxito", "Producto agregado")
+                    self.catalogo.recargar_productos([resultado])
                     self.cargar_productos()
                     ventana.destroy()
                 else:
@@ -228,17 +209,16 @@ class ProductosFrame(ttk.Frame):
             except ValueError:
                 messagebox.showerror("Error", "Verifica los valores ingresados")
         
-        ttk.Button(ventana, text="Guardar", command=guardar).grid(row=7, column=0, columnspan=2, pady=20)
+        ttk.Button(ventana, text="Guardar", command=guardar).grid(row=8, column=0, columnspan=2, pady=20)
     
     def modificar_producto(self):
         """Modifica el producto seleccionado"""
-        seleccion = self.tree.selection()
-        if not seleccion:
+        seleccionado = self.tabla.seleccionada()
+        if not seleccionado:
             messagebox.showwarning("Aviso", "Selecciona un producto")
             return
         
-        item = self.tree.item(seleccion[0])
-        producto_id = item['values'][0]
+        producto_id = seleccionado['id']
         
         sql = "SELECT * FROM productos WHERE id = %s"
         producto = self.bd.ejecutar_consulta(sql, (producto_id,))
@@ -251,7 +231,7 @@ class ProductosFrame(ttk.Frame):
         
         ventana = tk.Toplevel(self)
         ventana.title("Modificar Producto")
-        ventana.geometry("400x200")
+        ventana.geometry("400x240")
         
         ttk.Label(ventana, text="Stock:").grid(row=0, column=0, sticky=tk.W, padx=10, pady=5)
         entrada_stock = ttk.Entry(ventana, width=30)
@@ -263,34 +243,178 @@ class ProductosFrame(ttk.Frame):
         entrada_precio.insert(0, str(prod['precio_venta']))
         entrada_precio.grid(row=1, column=1, padx=10, pady=5)
         
+        ttk.Label(ventana, text="Código de barras:").grid(row=2, column=0, sticky=tk.W, padx=10, pady=5)
+        entrada_codigo = ttk.Entry(ventana, width=30)
+        entrada_codigo.insert(0, prod.get('codigo_barras') or "")
+        entrada_codigo.grid(row=2, column=1, padx=10, pady=5)
+        
         def guardar():
             try:
                 stock = int(entrada_stock.get())
-                precio = float(entrada_precio.get())
+                precio = Dinero.de(entrada_precio.get())
+                codigo = entrada_codigo.get().strip() or None
+                
+                if self.codigo_en_uso(codigo, producto_id):
+                    return
                 
-                sql = "UPDATE productos SET stock = %s, precio_venta = %s WHERE id = %s"
-                self.bd.ejecutar_actualizar(sql, (stock, precio, producto_id))
+                sql = "UPDATE productos SET stock = %s, precio_venta = %s, codigo_barras = %s WHERE id = %s"
+                self.bd.ejecutar_actualizar(sql, (stock, precio.a_decimal(), codigo, producto_id))
                 messagebox.showinfo("Éxito", "Producto actualizado")
+                self.catalogo.recargar_productos([producto_id])
                 self.cargar_productos()
                 ventana.destroy()
             except ValueError:
                 messagebox.showerror("Error", "Valores inválidos")
         
-        ttk.Button(ventana, text="Guardar", command=guardar).grid(row=2, column=0, columnspan=2, pady=20)
+        ttk.Button(ventana, text="Guardar", command=guardar).grid(row=3, column=0, columnspan=2, pady=20)
+    
+    def codigo_en_uso(self, codigo, producto_id=None):
+        """
+        Avisa si el código de barras ya pertenece a otro producto activo
+        
+        Returns:
+            True si está en uso (no se debe guardar)
+        """
+        if not codigo:
+            return False
+        otro = self.catalogo.buscar_por_codigo(codigo)
+        if otro is not None and otro['id'] != producto_id:
+            messagebox.showerror("Error", f"El código {codigo} ya es de '{otro['nombre']}'")
+            return True
+        return False
     
     def eliminar_producto(self):
         """Elimina el producto seleccionado"""
-        seleccion = self.tree.selection()
-        if not seleccion:
+        seleccionado = self.tabla.seleccionada()
+        if not seleccionado:
             messagebox.showwarning("Aviso", "Selecciona un producto")
             return
         
-        item = self.tree.item(seleccion[0])
-        producto_id = item['values'][0]
-        producto_nombre = item['values'][1]
+        producto_id = seleccionado['id']
+        producto_nombre = seleccionado['nombre']
         
         if messagebox.askyesno("Confirmar", f"¿Eliminar '{producto_nombre}'?"):
             sql = "UPDATE productos SET activo = FALSE WHERE id = %s"
             self.bd.ejecutar_actualizar(sql, (producto_id,))
             messagebox.showinfo("Éxito", "Producto eliminado")
+            self.catalogo.recargar_productos([producto_id])
+            self.cargar_productos()
+    
+    
+    def importar_productos(self):
+        """Simula la importación de un archivo y muestra los cambios antes de aplicarlos"""
+        ruta = filedialog.askopenfilename(
+            parent=self,
+            title="Importar productos",
+            filetypes=[("CSV o Excel", "*.csv *.xlsx"), ("Todos los archivos", "*.*")]
+        )
+        if not ruta:
+            return
+        
+        self.tareas.ejecutar(
+            ('importar', ruta),
+            lambda cancelacion: self.importador.importar(ruta, simular=True, cancelacion=cancelacion),
+            lambda resultado: self.mostrar_simulacion(ruta, resultado),
+            al_fallar=lambda e: messagebox.showerror("Error", f"No se pudo leer el archivo: {e}"),
+            descripcion="Importación"
+        )
+    
+    def mostrar_simulacion(self, ruta, resultado):
+        """Ventana con lo que cambiaría la importación y el botón para aplicarla"""
+        if resultado is None:
+            messagebox.showerror("Error", "No se pudo comparar el archivo con el catálogo")
+            return
+        
+        ventana = tk.Toplevel(self)
+        ventana.title(f"Importar {ruta}")
+        ventana.geometry("800x450")
+        
+        ttk.Label(ventana, text=resultado.resumen(), font=("Arial", 10, "bold")).pack(padx=10, pady=10)
+        
+        tabla = TablaVirtual(
+            ventana,
+            columnas=[
+                ('Fila', 50, 'fila'),
+                ('Acción', 90, 'accion'),
+                ('Producto', 200, 'producto'),
+                ('Detalle', 420, None)
+            ],
+            formatear=lambda fila: (fila['fila'], fila['accion'], fila['producto'], fila['detalle']),
+            etiquetas=lambda fila: ('error',) if fila['accion'] == "error" else (),
+            alto=12
+        )
+        tabla.tag_configure('error', background='#ffcccc')
+        tabla.pack(fill=tk.BOTH, expand=True, padx=10)
+        errores = [dict(error, accion="error") for error in resultado.filas_con_error]
+        tabla.mostrar(errores + resultado.cambios)
+        
+        frame_botones = ttk.Frame(ventana)
+        frame_botones.pack(pady=10)
+        
+        por_aplicar = resultado.nuevos + resultado.modificados
+        texto = "✓ Aplicar"
+        if resultado.errores:
+            texto += f" (sin las {resultado.errores} filas con error)"
+        boton = ttk.Button(frame_botones, text=texto, command=lambda: self.aplicar_importacion(ruta, ventana))
+        boton.pack(side=tk.LEFT, padx=5)
+        if not por_aplicar:
+            boton.config(state=tk.DISABLED)
+        ttk.Button(frame_botones, text="Cancelar", command=ventana.destroy).pack(side=tk.LEFT, padx=5)
+    
+    def aplicar_importacion(self, ruta, ventana):
+        """Importa el archivo ya revisado en una sola transacción"""
+        ventana.destroy()
+        
+        def terminar(resultado):
+            if resultado is None or not resultado.aplicada:
+                messagebox.showerror("Error", "No se aplicó la importación")
+                return
+            messagebox.showinfo(
+                "Éxito",
+                f"{resultado.nuevos} productos nuevos y {resultado.modificados} modificados "
+                f"en {resultado.segundos:.1f} s"
+            )
             self.cargar_productos()
+        
+        self.tareas.ejecutar(
+            ('importar', ruta),
+            lambda cancelacion: self.importador.importar(ruta, omitir_errores=True, cancelacion=cancelacion),
+            terminar,
+            al_fallar=lambda e: messagebox.showerror("Error", f"No se pudo importar: {e}"),
+            descripcion="Importación"
+        )
+    
+    def exportar_productos(self):
+        """Guarda el catálogo completo en CSV o XLSX"""
+        ruta = filedialog.asksaveasfilename(
+            parent=self,
+            title="Exportar productos",
+            defaultextension=".csv",
+            initialfile=f"productos_{datetime.now():%Y%m%d}.csv",
+            filetypes=[("CSV", "*.csv"), ("Excel", "*.xlsx")]
+        )
+        if not ruta:
+            return
+        
+        def terminar(exportados):
+            if exportados is None:
+                messagebox.showerror("Error", "No se pudo exportar el catálogo")
+            else:
+                messagebox.showinfo("Éxito", f"{exportados} productos exportados")
+        
+        self.tareas.ejecutar(
+            ('exportar', ruta),
+            lambda cancelacion: exportar_productos(self.bd, ruta),
+            terminar,
+            al_fallar=lambda e: messagebox.showerror("Error", f"No se pudo exportar: {e}"),
+            descripcion="Exportación"
+        )
+    
+    def ajuste_masivo(self):
+        """Abre la ventana de ajustes masivos (precios, stock por conteo, vencidos)"""
+        # Al terminar, el catálogo relee de una vez lo que cambió
+        VentanaAjustes(self, self.bd, self.tareas, al_aplicar=self.cargar_productos)
+    
+    def cerrar(self):
+        """Cancela la importación, exportación o ajuste en curso (se deshace completo)"""
+        self.tareas.cerrar()
@@ -2,20 +2,38 @@
 GUI para Reportes y Gráficas
 """
 
+import logging
 import tkinter as tk
 from tkinter import ttk, messagebox
-from datetime import datetime
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from matplotlib.figure import Figure
-import pandas as pd
 from gui.graficas import VentanaGraficas
+from gui.tabla_virtual import TablaVirtual
+from gui.tareas import EjecutorTareas
+from database import consultas
+from database.analitica import AnaliticaVentas
+from database.consultas import RangoFechas
+from database.dinero import a_centavos, formato
+from database.ranking import RankingProductos
+from database.tablero import TableroVentas
+
+# Mensajes ✓/✗; ver instrumentacion.configurar_mensajes
+registro = logging.getLogger(__name__)
 
 
 class ReportesFrame(ttk.Frame):
+    TAMAÑO_PAGINA = 500         # Ventas por página en el reporte de ventas
+    INTERVALO_EN_VIVO = 5000    # Milisegundos entre vueltas del tablero en vivo
+    
     def __init__(self, parent, bd):
         super().__init__(parent)
         self.bd = bd
+        self.reporte_en_tabla = None    # Clave del reporte que muestra la tabla
+        self._total_ventas = 0          # Centavos de las páginas ya mostradas
+        # Las consultas corren en hilos aparte para no congelar la caja
+        self.tareas = EjecutorTareas(self, max_hilos=2, al_cambiar_estado=self.actualizar_indicador)
+        # El tablero en vivo usa su propio hilo: no prende el indicador en cada vuelta
+        self.tareas_en_vivo = EjecutorTareas(self, max_hilos=1)
+        self.tablero = None
+        self._vuelta_en_vivo = None     # after() de la siguiente vuelta
         self.crear_interfaz()
     
     def crear_interfaz(self):
@@ -25,14 +43,28 @@ class ReportesFrame(ttk.Frame):
         titulo = ttk.Label(self, text="Reportes y Análisis", font=("Arial", 14, "bold"))
         titulo.pack(pady=10)
         
+        # Frame de periodo (vacío = periodo predeterminado de cada reporte)
+        frame_periodo = ttk.Frame(self)
+        frame_periodo.pack(fill=tk.X, padx=10, pady=5)
+        
+        ttk.Label(frame_periodo, text="Periodo desde (YYYY-MM-DD):").pack(side=tk.LEFT, padx=5)
+        self.entrada_desde = ttk.Entry(frame_periodo, width=12)
+        self.entrada_desde.pack(side=tk.LEFT, padx=5)
+        ttk.Label(frame_periodo, text="hasta:").pack(side=tk.LEFT, padx=5)
+        self.entrada_hasta = ttk.Entry(frame_periodo, width=12)
+        self.entrada_hasta.pack(side=tk.LEFT, padx=5)
+        
         # Frame de botones reportes
         frame_botones1 = ttk.Frame(self)
         frame_botones1.pack(fill=tk.X, padx=10, pady=5)
         
-        ttk.Button(frame_botones1, text="Ventas del Día", command=self.reporte_ventas_dia).pack(side=tk.LEFT, padx=2)
+        ttk.Button(frame_botones1, text="Ventas del Día", command=lambda: self.con_periodo(self.reporte_ventas_dia)).pack(side=tk.LEFT, padx=2)
         ttk.Button(frame_botones1, text="Stock Bajo", command=self.reporte_stock_bajo).pack(side=tk.LEFT, padx=2)
-        ttk.Button(frame_botones1, text="Más Vendidos", command=self.reporte_mas_vendidos).pack(side=tk.LEFT, padx=2)
-        ttk.Button(frame_botones1, text="Menos Vendidos", command=self.reporte_menos_vendidos).pack(side=tk.LEFT, padx=2)
+        ttk.Button(frame_botones1, text="Más Vendidos", command=lambda: self.con_periodo(self.reporte_mas_vendidos)).pack(side=tk.LEFT, padx=2)
+        ttk.Button(frame_botones1, text="Menos Vendidos", command=lambda: self.con_periodo(self.reporte_menos_vendidos)).pack(side=tk.LEFT, padx=2)
+        
+        self.en_vivo = tk.BooleanVar(value=False)
+        ttk.Checkbutton(frame_botones1, text="🔴 En vivo (hoy)", variable=self.en_vivo, command=self.alternar_en_vivo).pack(side=tk.LEFT, padx=10)
         
         # Frame de botones gráficas
         frame_botones2 = ttk.Frame(self)
@@ -40,215 +72,308 @@ class ReportesFrame(ttk.Frame):
         
         ttk.Label(frame_botones2, text="Gráficas:", font=("Arial", 10, "bold")).pack(side=tk.LEFT, padx=5)
         
-        self.graficas = VentanaGraficas(self.bd)
-        
-        ttk.Button(frame_botones2, text="📊 Ventas por Hora", command=self.graficas.grafica_ventas_por_hora).pack(side=tk.LEFT, padx=2)
-        ttk.Button(frame_botones2, text="📈 Producto Top", command=self.graficas.grafica_producto_mas_vendido).pack(side=tk.LEFT, padx=2)
-        ttk.Button(frame_botones2, text="🏆 Categorías", command=self.graficas.grafica_categorias_mas_vendidas).pack(side=tk.LEFT, padx=2)
-        ttk.Button(frame_botones2, text="📉 Tendencia Mes", command=self.graficas.grafica_tendencia_ventas_mes).pack(side=tk.LEFT, padx=2)
-        
-        # Frame para tabla
-        frame_tabla = ttk.Frame(self)
-        frame_tabla.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
-        
-        scrollbar = ttk.Scrollbar(frame_tabla)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        
-        self.tree_reporte = ttk.Treeview(frame_tabla, yscrollcommand=scrollbar.set)
-        self.tree_reporte.pack(fill=tk.BOTH, expand=True)
-        scrollbar.config(command=self.tree_reporte.yview)
-    
-    def reporte_ventas_dia(self):
-        """Muestra las ventas del día actual"""
-        fecha = datetime.now().date()
-        
-        sql = """
-            SELECT 
-                v.id,
-                v.fecha,
-                v.hora,
-                v.total,
-                v.metodo_pago,
-                COUNT(dv.id) as cantidad_productos
-            FROM ventas v
-            LEFT JOIN detalle_ventas dv ON v.id = dv.venta_id
-            WHERE DATE(v.fecha) = %s
-            GROUP BY v.id
-            ORDER BY v.hora
-        """
-        
-        ventas = self.bd.ejecutar_consulta(sql, (fecha,))
-        
-        # Limpiar tabla
-        for item in self.tree_reporte.get_children():
-            self.tree_reporte.delete(item)
+        # Las gráficas comparten una sola carga de las líneas de venta
+        self.analitica = AnaliticaVentas(self.bd)
+        self.ranking = RankingProductos(self.bd)
+        self.graficas = VentanaGraficas(self.bd, self.tareas, self.analitica)
+        
+        ttk.Button(frame_botones2, text="📊 Ventas por Hora", command=lambda: self.con_periodo(self.graficas.grafica_ventas_por_hora)).pack(side=tk.LEFT, padx=2)
+        ttk.Button(frame_botones2, text="📈 Producto Top", command=lambda: self.con_periodo(self.graficas.grafica_producto_mas_vendido)).pack(side=tk.LEFT, padx=2)
+        ttk.Button(frame_botones2, text="🏆 Categorías", command=lambda: self.con_periodo(self.graficas.grafica_categorias_mas_vendidas)).pack(side=tk.LEFT, padx=2)
+        ttk.Button(frame_botones2, text="📉 Tendencia Mes", command=lambda: self.con_periodo(self.graficas.grafica_tendencia_ventas_mes)).pack(side=tk.LEFT, padx=2)
+        
+        # Indicador de ocupado y cancelación
+        frame_estado = ttk.Frame(self)
+        frame_estado.pack(fill=tk.X, padx=10, pady=5)
+        
+        self.barra_progreso = ttk.Progressbar(frame_estado, mode='indeterminate', length=150)
+        self.barra_progreso.pack(side=tk.LEFT, padx=5)
+        self.label_estado = ttk.Label(frame_estado, text="")
+        self.label_estado.pack(side=tk.LEFT, padx=5)
+        self.boton_cancelar = ttk.Button(frame_estado, text="✖ Cancelar", command=self.tareas.cancelar, state=tk.DISABLED)
+        self.boton_cancelar.pack(side=tk.LEFT, padx=5)
+        
+        # Tabla del reporte: cada reporte le pone sus columnas
+        self.tabla_reporte = TablaVirtual(self)
+        self.tabla_reporte.tag_configure('stock_bajo', background='#ffcccc')
+        self.tabla_reporte.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+    
+    def actualizar_indicador(self, ocupado, descripcion):
+        """Muestra u oculta el indicador de consultas en curso"""
+        if ocupado:
+            self.barra_progreso.start(10)
+            self.label_estado.config(text=f"⏳ {descripcion}...")
+            self.boton_cancelar.config(state=tk.NORMAL)
+        else:
+            self.barra_progreso.stop()
+            self.label_estado.config(text="")
+            self.boton_cancelar.config(state=tk.DISABLED)
+    
+    def con_periodo(self, funcion):
+        """Llama funcion(rango) con el periodo escrito, o None si está vacío"""
+        desde = self.entrada_desde.get().strip()
+        hasta = self.entrada_hasta.get().strip()
+        if not desde and not hasta:
+            funcion(None)
+            return
+        
+        try:
+            rango = RangoFechas.desde_texto(desde or hasta, hasta)
+        except ValueError:
+            messagebox.showerror("Error", "Periodo inválido. Usa YYYY-MM-DD y una fecha final posterior")
+            return
+        funcion(rango)
+    
+    def consultar(self, clave, descripcion, funcion, al_terminar):
+        """Ejecuta funcion(bd) en segundo plano y entrega el resultado a al_terminar"""
+        self.tareas.ejecutar(
+            clave,
+            lambda cancelacion: funcion(self.bd),
+            al_terminar,
+            al_fallar=lambda e: messagebox.showerror("Error", f"Error en el reporte: {e}"),
+            descripcion=descripcion
+        )
+    
+    def reporte_ventas_dia(self, rango=None, despues_de=None):
+        """Muestra las ventas del periodo (hoy por omisión), página por página"""
+        rango = rango or RangoFechas.hoy()
+        self.consultar(
+            ('ventas_dia', rango), f"Ventas {rango}",
+            lambda bd: consultas.pagina_ventas_del_periodo(bd, rango, despues_de, self.TAMAÑO_PAGINA),
+            lambda pagina: self.mostrar_ventas_dia(rango, despues_de is None, pagina)
+        )
+    
+    def mostrar_ventas_dia(self, rango, primera, pagina):
+        """Agrega a la tabla una página de ventas y pide la siguiente"""
+        ventas, siguiente = pagina or ([], None)
+        if not primera:
+            if self.reporte_en_tabla != ('ventas_dia', rango):
+                # Se abrió otro reporte mientras se cargaban las páginas
+                return
+            self.agregar_ventas(ventas, siguiente)
+            self.siguiente_pagina(rango, siguiente)
+            return
+        
+        self.tabla_reporte.limpiar()
+        self.reporte_en_tabla = ('ventas_dia', rango)
         
         if ventas:
-            # Configurar columnas
-            self.tree_reporte['columns'] = ('Factura', 'Hora', 'Total', 'Método', 'Productos')
-            self.tree_reporte['show'] = 'headings'
-            
-            self.tree_reporte.column('Factura', width=80)
-            self.tree_reporte.column('Hora', width=100)
-            self.tree_reporte.column('Total', width=100)
-            self.tree_reporte.column('Método', width=100)
-            self.tree_reporte.column('Productos', width=100)
+            self.configurar_tabla_ventas()
             
-            self.tree_reporte.heading('Factura', text='Factura')
-            self.tree_reporte.heading('Hora', text='Hora')
-            self.tree_reporte.heading('Total', text='Total')
-            self.tree_reporte.heading('Método', text='Método')
-            self.tree_reporte.heading('Productos', text='Productos')
-            
-            total_ventas = 0
-            for venta in ventas:
-                self.tree_reporte.insert('', tk.END, values=(
-                    venta['id'],
-                    str(venta['hora']),
-                    f"${venta['total']:.2f}",
-                    venta['metodo_pago'],
-                    venta['cantidad_productos']
-                ))
-                total_ventas += venta['total']
-            
-            self.tree_reporte.insert('', tk.END, values=('', 'TOTAL', f"${total_ventas:.2f}", '', len(ventas)))
+            # La primera página se ve de inmediato; las demás llegan detrás
+            self._total_ventas = 0
+            self.agregar_ventas(ventas, siguiente)
+            self.siguiente_pagina(rango, siguiente)
         else:
-            messagebox.showinfo("Información", "No hay ventas para hoy")
+            messagebox.showinfo("Información", "No hay ventas en el periodo")
+    
+    def configurar_tabla_ventas(self):
+        """Columnas de la tabla para ventas individuales"""
+        self.tabla_reporte.configurar(
+            [
+                ('Factura', 80, 'id'),
+                ('Hora', 100, 'hora'),
+                ('Total', 100, 'total'),
+                ('Método', 100, 'metodo_pago'),
+                ('Productos', 100, 'cantidad_productos')
+            ],
+            lambda venta: (
+                venta['id'],
+                str(venta['hora']),
+                formato(a_centavos(venta['total'])),
+                venta['metodo_pago'],
+                venta['cantidad_productos']
+            )
+        )
+    
+    def agregar_ventas(self, ventas, siguiente):
+        """Agrega ventas a la tabla y actualiza la fila de TOTAL"""
+        self._total_ventas += sum(a_centavos(venta['total']) for venta in ventas)
+        cantidad = len(self.tabla_reporte.filas) + len(ventas)
+        etiqueta = 'TOTAL' if siguiente is None else 'TOTAL (cargando...)'
+        self.tabla_reporte.agregar(ventas, pie=('', etiqueta, formato(self._total_ventas), '', cantidad))
+    
+    def siguiente_pagina(self, rango, siguiente):
+        """Pide la siguiente página o, con la última, verifica el total"""
+        if siguiente is not None:
+            self.reporte_ventas_dia(rango, siguiente)
+            return
+        self.consultar(
+            ('verificar_total', rango), "Verificar total",
+            lambda bd: consultas.totales_del_periodo(bd, rango),
+            lambda resumen: self.verificar_total(rango, resumen)
+        )
+    
+    def verificar_total(self, rango, resumen):
+        """Compara el total sumado en la tabla con el de resumen_ventas_hora"""
+        if not resumen or self.reporte_en_tabla != ('ventas_dia', rango):
+            return
+        # Si entró una venta mientras se cargaban las páginas no hay con qué comparar
+        cantidad = len(self.tabla_reporte.filas)
+        if (resumen['cantidad'] or 0) != cantidad:
+            return
+        en_resumen = a_centavos(resumen['total'] or 0)
+        if en_resumen != self._total_ventas:
+            registro.warning("✗ El total de las ventas (%s) no cuadra con resumen_ventas_hora (%s) en %s",
+                             formato(self._total_ventas), formato(en_resumen), rango)
+            etiqueta = f"TOTAL ⚠ resumen: {formato(en_resumen)}"
+            self.tabla_reporte.agregar([], pie=('', etiqueta, formato(self._total_ventas), '', cantidad))
+    
+    def alternar_en_vivo(self):
+        """Enciende o apaga el tablero en vivo de las ventas de hoy"""
+        if self._vuelta_en_vivo:
+            self.after_cancel(self._vuelta_en_vivo)
+            self._vuelta_en_vivo = None
+        self.tareas_en_vivo.cancelar()
+        if not self.en_vivo.get():
+            return
+        
+        # La primera vuelta trae las ventas de hoy; las siguientes, solo las nuevas
+        self.tablero = TableroVentas(self.bd)
+        self.tabla_reporte.limpiar()
+        self.configurar_tabla_ventas()
+        self.reporte_en_tabla = 'en_vivo'
+        self.vuelta_en_vivo()
+    
+    def vuelta_en_vivo(self):
+        """Pide en segundo plano las ventas nuevas desde la última vuelta"""
+        self._vuelta_en_vivo = None
+        tablero = self.tablero
+        self.tareas_en_vivo.ejecutar(
+            'en_vivo',
+            lambda cancelacion: tablero.actualizar(),
+            self.mostrar_en_vivo,
+            al_fallar=self.fallo_en_vivo
+        )
+    
+    def mostrar_en_vivo(self, resultado):
+        """Agrega a la tabla y a la gráfica por hora las ventas nuevas"""
+        if not self.en_vivo.get():
+            return
+        if self.reporte_en_tabla != 'en_vivo':
+            # Se abrió otro reporte en la tabla
+            self.en_vivo.set(False)
+            return
+        
+        # Si la consulta falló (sin conexión) se reintenta en la siguiente vuelta
+        if resultado is not None:
+            nuevo_dia, nuevas = resultado
+            if nuevo_dia:
+                self.tabla_reporte.limpiar()
+            if nuevas or nuevo_dia:
+                pie = ('', 'TOTAL (en vivo)', str(self.tablero.total), '', self.tablero.cantidad)
+                self.tabla_reporte.agregar(nuevas, pie=pie)
+                
+                # La gráfica se abre al empezar el día y después solo se refresca si sigue abierta
+                _, totales = self.tablero.totales_por_hora()
+                if totales.any() and (nuevo_dia or 'hora' in self.graficas.paneles):
+                    self.graficas.mostrar_ventas_por_hora(totales, RangoFechas.dia(self.tablero.dia), al_frente=nuevo_dia)
+        
+        self._vuelta_en_vivo = self.after(self.INTERVALO_EN_VIVO, self.vuelta_en_vivo)
+    
+    def fallo_en_vivo(self, error):
+        """Apaga el tablero en vivo ante un error inesperado"""
+        self.en_vivo.set(False)
+        messagebox.showerror("Error", f"Error en el tablero en vivo: {error}")
+    
+    def cerrar(self):
+        """Detiene el tablero en vivo y las consultas en curso"""
+        self.en_vivo.set(False)
+        if self._vuelta_en_vivo:
+            self.after_cancel(self._vuelta_en_vivo)
+            self._vuelta_en_vivo = None
+        self.tareas_en_vivo.cerrar()
+        self.tareas.cerrar()
     
     def reporte_stock_bajo(self):
         """Muestra productos con stock bajo"""
-        sql = """
-            SELECT 
-                p.id,
-                p.nombre,
-                c.nombre as categoria,
-                p.stock,
-                p.stock_minimo
-            FROM productos p
-            JOIN categorias c ON p.categoria_id = c.id
-            WHERE p.stock <= p.stock_minimo AND p.activo = TRUE
-            ORDER BY p.stock ASC
-        """
-        
-        productos = self.bd.ejecutar_consulta(sql)
-        
-        # Limpiar tabla
-        for item in self.tree_reporte.get_children():
-            self.tree_reporte.delete(item)
+        self.consultar('stock_bajo', "Stock bajo", consultas.productos_stock_bajo, self.mostrar_stock_bajo)
+    
+    def mostrar_stock_bajo(self, productos):
+        """Muestra en la tabla los productos con stock bajo"""
+        self.tabla_reporte.limpiar()
+        self.reporte_en_tabla = 'stock_bajo'
         
         if productos:
-            self.tree_reporte['columns'] = ('ID', 'Producto', 'Categoría', 'Stock', 'Mínimo')
-            self.tree_reporte['show'] = 'headings'
-            
-            self.tree_reporte.column('ID', width=50)
-            self.tree_reporte.column('Producto', width=200)
-            self.tree_reporte.column('Categoría', width=100)
-            self.tree_reporte.column('Stock', width=80)
-            self.tree_reporte.column('Mínimo', width=80)
-            
-            self.tree_reporte.heading('ID', text='ID')
-            self.tree_reporte.heading('Producto', text='Producto')
-            self.tree_reporte.heading('Categoría', text='Categoría')
-            self.tree_reporte.heading('Stock', text='Stock')
-            self.tree_reporte.heading('Mínimo', text='Mínimo')
-            
-            for prod in productos:
-                self.tree_reporte.insert('', tk.END, values=(
+            self.tabla_reporte.configurar(
+                [
+                    ('ID', 50, 'id'),
+                    ('Producto', 200, 'nombre'),
+                    ('Categoría', 100, 'categoria'),
+                    ('Stock', 80, 'stock'),
+                    ('Mínimo', 80, 'stock_minimo')
+                ],
+                lambda prod: (
                     prod['id'],
                     prod['nombre'],
                     prod['categoria'],
                     prod['stock'],
                     prod['stock_minimo']
-                ), tags=('stock_bajo',))
-            
-            self.tree_reporte.tag_configure('stock_bajo', background='#ffcccc')
+                ),
+                etiquetas=lambda prod: ('stock_bajo',)
+            )
+            self.tabla_reporte.mostrar(productos)
         else:
             messagebox.showinfo("Información", "No hay productos con stock bajo")
     
-    def reporte_mas_vendidos(self):
-        """Muestra los productos más vendidos"""
-        sql = """
-            SELECT 
-                p.id,
-                p.nombre,
-                SUM(dv.cantidad) as total_vendido,
-                SUM(dv.subtotal) as ingresos
-            FROM productos p
-            JOIN detalle_ventas dv ON p.id = dv.producto_id
-            WHERE p.activo = TRUE
-            GROUP BY p.id
-            ORDER BY total_vendido DESC
-            LIMIT 20
-        """
-        
-        productos = self.bd.ejecutar_consulta(sql)
-        
-        # Limpiar tabla
-        for item in self.tree_reporte.get_children():
-            self.tree_reporte.delete(item)
+    def reporte_mas_vendidos(self, rango=None):
+        """Muestra los productos más vendidos (todo el historial por omisión)"""
+        self.consultar(
+            ('mas_vendidos', rango), "Más vendidos",
+            lambda bd: self.ranking.mas_vendidos(rango),
+            self.mostrar_mas_vendidos
+        )
+    
+    def mostrar_mas_vendidos(self, productos):
+        """Muestra en la tabla los productos más vendidos"""
+        self.tabla_reporte.limpiar()
+        self.reporte_en_tabla = 'mas_vendidos'
         
         if productos:
-            self.tree_reporte['columns'] = ('ID', 'Producto', 'Vendido', 'Ingresos')
-            self.tree_reporte['show'] = 'headings'
-            
-            self.tree_reporte.column('ID', width=50)
-            self.tree_reporte.column('Producto', width=250)
-            self.tree_reporte.column('Vendido', width=100)
-            self.tree_reporte.column('Ingresos', width=150)
-            
-            self.tree_reporte.heading('ID', text='ID')
-            self.tree_reporte.heading('Producto', text='Producto')
-            self.tree_reporte.heading('Vendido', text='Unidades')
-            self.tree_reporte.heading('Ingresos', text='Ingresos')
-            
-            for prod in productos:
-                self.tree_reporte.insert('', tk.END, values=(
+            self.tabla_reporte.configurar(
+                [
+                    ('ID', 50, 'id'),
+                    ('Producto', 250, 'nombre'),
+                    ('Unidades', 100, 'total_vendido'),
+                    ('Ingresos', 150, 'ingresos')
+                ],
+                lambda prod: (
                     prod['id'],
                     prod['nombre'],
                     prod['total_vendido'],
                     f"${prod['ingresos']:.2f}"
-                ))
+                )
+            )
+            self.tabla_reporte.mostrar(productos)
         else:
             messagebox.showinfo("Información", "No hay datos de ventas")
     
-    def reporte_menos_vendidos(self):
-        """Muestra los productos menos vendidos"""
-        sql = """
-            SELECT 
-                p.id,
-                p.nombre,
-                COALESCE(SUM(dv.cantidad), 0) as total_vendido
-            FROM productos p
-            LEFT JOIN detalle_ventas dv ON p.id = dv.producto_id
-            WHERE p.activo = TRUE
-            GROUP BY p.id
-            ORDER BY total_vendido ASC
-            LIMIT 20
-        """
-        
-        productos = self.bd.ejecutar_consulta(sql)
-        
-        # Limpiar tabla
-        for item in self.tree_reporte.get_children():
-            self.tree_reporte.delete(item)
+    def reporte_menos_vendidos(self, rango=None):
+        """Muestra los productos menos vendidos (todo el historial por omisión)"""
+        self.consultar(
+            ('menos_vendidos', rango), "Menos vendidos",
+            lambda bd: self.ranking.menos_vendidos(rango),
+            self.mostrar_menos_vendidos
+        )
+    
+    def mostrar_menos_vendidos(self, productos):
+        """Muestra en la tabla los productos menos vendidos"""
+        self.tabla_reporte.limpiar()
+        self.reporte_en_tabla = 'menos_vendidos'
         
         if productos:
-            self.tree_reporte['columns'] = ('ID', 'Producto', 'Vendido')
-            self.tree_reporte['show'] = 'headings'
-            
-            self.tree_reporte.column('ID', width=50)
-            self.tree_reporte.column('Producto', width=300)
-            self.tree_reporte.column('Vendido', width=100)
-            
-            self.tree_reporte.heading('ID', text='ID')
-            self.tree_reporte.heading('Producto', text='Producto')
-            self.tree_reporte.heading('Vendido', text='Unidades')
-            
-            for prod in productos:
-                self.tree_reporte.insert('', tk.END, values=(
+            self.tabla_reporte.configurar(
+                [
+                    ('ID', 50, 'id'),
+                    ('Producto', 300, 'nombre'),
+                    ('Unidades', 100, 'total_vendido')
+                ],
+                lambda prod: (
                     prod['id'],
                     prod['nombre'],
                     prod['total_vendido']
-                ))
+                )
+            )
+            self.tabla_reporte.mostrar(productos)
         else:
             messagebox.showinfo("Información", "No hay datos de productos")
@@ -0,0 +1,323 @@
+"""
+Tabla virtual sobre ttk.Treeview
+
+El Treeview solo tiene tantas filas como caben en pantalla; al desplazarse
+se reescriben sus valores con la ventana visible de la lista de datos, en
+vez de insertar (y luego borrar) un item de Tk por cada fila. Así una tabla
+de decenas de miles de filas se llena, filtra y ordena sin tocar Tk más que
+para unas 20-40 filas.
+
+Columnas: lista de (título, ancho, clave). La clave es el campo de la fila
+(o una función fila -> valor) por el que se ordena al hacer clic en el
+encabezado; None si la columna no se puede ordenar.
+"""
+
+import tkinter as tk
+from tkinter import ttk
+
+
+class TablaVirtual(ttk.Frame):
+    """Treeview con filas recicladas, scroll propio y orden por columna"""
+    
+    ALTO_FILA = 20          # Píxeles por fila si Tk aún no lo informa
+    ALTO_ENCABEZADO = 25    # Píxeles del encabezado si Tk aún no lo informa
+    
+    def __init__(self, parent, columnas=(), formatear=None, etiquetas=None, alto=15):
+        """
+        Args:
+            parent: Widget contenedor
+            columnas: Lista de (título, ancho, clave)
+            formatear: Función fila -> tupla de valores a mostrar
+            etiquetas: Función fila -> tupla de tags (colores) o None
+            alto: Filas visibles solicitadas
+        """
+        super().__init__(parent)
+        self.filas = []
+        self.pie = None             # Fila fija al final (por ejemplo, TOTAL)
+        self.desplazamiento = 0     # Índice de la primera fila visible
+        self.orden = None           # (índice de columna, descendente)
+        
+        self._columnas = []
+        self._formatear = formatear
+        self._etiquetas = etiquetas
+        self._items = []            # iids del Treeview, uno por fila visible
+        self._posiciones = {}       # id(fila) -> índice en self.filas
+        self._visibles = alto
+        self._alto_fila = None
+        self._encabezado = None
+        self._seleccionada = None   # Fila de datos seleccionada
+        self._dibujo_pendiente = False
+        
+        self.tree = ttk.Treeview(self, height=alto, show='headings', selectmode='browse')
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self._yview)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        
+        self.tree.bind('<Configure>', self._al_redimensionar)
+        self.tree.bind('<<TreeviewSelect>>', self._al_seleccionar)
+        self.tree.bind('<MouseWheel>', lambda e: self._desplazar(-1 if e.delta > 0 else 1, 'units'))
+        self.tree.bind('<Button-4>', lambda e: self._desplazar(-1, 'units'))
+        self.tree.bind('<Button-5>', lambda e: self._desplazar(1, 'units'))
+        self.tree.bind('<Up>', lambda e: self._mover_seleccion(-1))
+        self.tree.bind('<Down>', lambda e: self._mover_seleccion(1))
+        self.tree.bind('<Prior>', lambda e: self._mover_seleccion(-self._visibles))
+        self.tree.bind('<Next>', lambda e: self._mover_seleccion(self._visibles))
+        self.tree.bind('<Home>', lambda e: self._mover_seleccion(-len(self.filas)))
+        self.tree.bind('<End>', lambda e: self._mover_seleccion(len(self.filas)))
+        
+        if columnas:
+            self.configurar(columnas, formatear, etiquetas)
+    
+    def configurar(self, columnas, formatear, etiquetas=None):
+        """Cambia las columnas (los reportes reusan la misma tabla)"""
+        self._columnas = list(columnas)
+        self._formatear = formatear
+        self._etiquetas = etiquetas
+        self.orden = None
+        
+        titulos = [titulo for titulo, _, _ in self._columnas]
+        self.tree['columns'] = titulos
+        for i, (titulo, ancho, clave) in enumerate(self._columnas):
+            self.tree.column(titulo, width=ancho)
+            comando = (lambda i=i: self.ordenar(i)) if clave is not None else ''
+            self.tree.heading(titulo, text=titulo, command=comando)
+    
+    def mostrar(self, filas, pie=None):
+        """
+        Cambia los datos de la tabla
+        
+        Args:
+            filas: Lista o cursor de filas (la tabla guarda su propia lista
+                   para poder ordenarla sin tocar la del llamador)
+            pie: Tupla de valores ya formateados fija al final, o None
+        """
+        self.filas = list(filas)
+        self.pie = pie
+        if self.orden:
+            self._ordenar_filas()
+        else:
+            self._indexar()
+        if self._seleccionada is not None and self._indice(self._seleccionada) is None:
+            self._seleccionada = None
+        self.desplazamiento = min(self.desplazamiento, self._maximo_desplazamiento())
+        self.dibujar()
+    
+    def agregar(self, filas, pie=None):
+        """Agrega filas al final, por ejemplo la siguiente página de una consulta"""
+        inicio = len(self.filas)
+        self.filas.extend(filas)
+        self.pie = pie
+        if self.orden:
+            self._ordenar_filas()
+        else:
+            self._indexar(inicio)
+        self.dibujar()
+    
+    def limpiar(self):
+        """Deja la tabla vacía"""
+        self.mostrar([])
+    
+    def actualizar_fila(self, fila):
+        """Vuelve a escribir una fila que cambió (solo si está a la vista)"""
+        if self.orden:
+            # El cambio puede moverla de lugar
+            self._ordenar_filas()
+            self.dibujar()
+            return
+        for posicion, iid in enumerate(self._items):
+            indice = self.desplazamiento + posicion
+            if indice < len(self.filas) and self.filas[indice] is fila:
+                tags = self._etiquetas(fila) if self._etiquetas else ()
+                self.tree.item(iid, values=self._formatear(fila), tags=tags)
+                return
+    
+    def quitar(self, fila):
+        """Quita una fila (por identidad) sin copiar ni reordenar las demás"""
+        indice = self._indice(fila)
+        if indice is None:
+            return
+        del self.filas[indice]
+        del self._posiciones[id(fila)]
+        self._indexar(indice)
+        if fila is self._seleccionada:
+            self._seleccionada = None
+        self.desplazamiento = min(self.desplazamiento, self._maximo_desplazamiento())
+        self.dibujar()
+    
+    def enfocar(self, fila):
+        """Selecciona una fila y desplaza la tabla hasta que se vea"""
+        indice = self._indice(fila)
+        if indice is None:
+            return
+        self._seleccionada = fila
+        self._hacer_visible(indice)
+        self.dibujar()
+    
+    def ordenar(self, columna):
+        """Ordena por la columna (índice); un segundo clic invierte el orden"""
+        descendente = bool(self.orden and self.orden[0] == columna and not self.orden[1])
+        self.orden = (columna, descendente)
+        self._ordenar_filas()
+        
+        for i, (titulo, _, _) in enumerate(self._columnas):
+            flecha = (" ▼" if descendente else " ▲") if i == columna else ""
+            self.tree.heading(titulo, text=titulo + flecha)
+        
+        self.desplazamiento = 0
+        self.dibujar()
+    
+    def seleccionada(self):
+        """Fila de datos seleccionada o None"""
+        return self._seleccionada
+    
+    def tag_configure(self, *args, **kwargs):
+        """Colores por tag, igual que en ttk.Treeview"""
+        self.tree.tag_configure(*args, **kwargs)
+    
+    def dibujar(self):
+        """Reescribe los items visibles con la ventana actual de datos"""
+        self._dibujo_pendiente = False
+        total = self._total()
+        cantidad = min(self._visibles, total - self.desplazamiento)
+        self._ajustar_items(cantidad)
+        
+        seleccion = ()
+        for posicion, iid in enumerate(self._items):
+            indice = self.desplazamiento + posicion
+            if indice < len(self.filas):
+                fila = self.filas[indice]
+                tags = self._etiquetas(fila) if self._etiquetas else ()
+                self.tree.item(iid, values=self._formatear(fila), tags=tags)
+                if fila is self._seleccionada:
+                    seleccion = (iid,)
+            else:
+                self.tree.item(iid, values=self.pie, tags=('pie',))
+        
+        if tuple(self.tree.selection()) != seleccion:
+            self.tree.selection_set(seleccion)
+        
+        if total:
+            self.scrollbar.set(self.desplazamiento / total,
+                               (self.desplazamiento + cantidad) / total)
+        else:
+            self.scrollbar.set(0, 1)
+        
+        if self._alto_fila is None and self._items:
+            # Primer dibujo: medir el alto real de las filas de este tema
+            self.after_idle(self._medir)
+    
+    def programar_dibujo(self):
+        """Junta varios eventos de scroll en un solo dibujo"""
+        if not self._dibujo_pendiente:
+            self._dibujo_pendiente = True
+            self.after_idle(self.dibujar)
+    
+    def _total(self):
+        """Filas a mostrar, contando el pie"""
+        return len(self.filas) + (1 if self.pie else 0)
+    
+    def _maximo_desplazamiento(self):
+        return max(0, self._total() - self._visibles)
+    
+    def _ajustar_items(self, cantidad):
+        """Crea o borra items del Treeview hasta tener exactamente cantidad"""
+        while len(self._items) < cantidad:
+            self._items.append(self.tree.insert('', tk.END))
+        if len(self._items) > cantidad:
+            self.tree.delete(*self._items[cantidad:])
+            del self._items[cantidad:]
+    
+    def _ordenar_filas(self):
+        columna, descendente = self.orden
+        clave = self._columnas[columna][2]
+        obtener = clave if callable(clave) else (lambda fila: fila[clave])
+        
+        def valor(fila):
+            # Los None van al final sin romper la comparación
+            v = obtener(fila)
+            return (v is None, v if v is not None else 0)
+        
+        self.filas.sort(key=valor, reverse=descendente)
+        self._indexar()
+    
+    def _indexar(self, desde=0):
+        """Rehace id(fila) -> índice a partir de una posición (todas por omisión)"""
+        if desde == 0:
+            self._posiciones = {id(fila): i for i, fila in enumerate(self.filas)}
+            return
+        for i in range(desde, len(self.filas)):
+            self._posiciones[id(self.filas[i])] = i
+    
+    def _indice(self, fila):
+        """Posición de la fila en los datos (por identidad) o None"""
+        i = self._posiciones.get(id(fila))
+        # La fila guardada mantiene vivo su id; se confirma por si ya no está
+        return i if i is not None and self.filas[i] is fila else None
+    
+    def _yview(self, accion, cantidad, unidad=None):
+        """Comando de la barra de desplazamiento (moveto / scroll)"""
+        if accion == 'moveto':
+            self.desplazamiento = int(float(cantidad) * self._total())
+            self.desplazamiento = max(0, min(self.desplazamiento, self._maximo_desplazamiento()))
+            self.programar_dibujo()
+        else:
+            self._desplazar(int(cantidad), unidad)
+    
+    def _desplazar(self, cantidad, unidad):
+        """Mueve la ventana visible por filas ('units') o páginas ('pages')"""
+        paso = cantidad * (self._visibles if unidad == 'pages' else 3)
+        nuevo = max(0, min(self.desplazamiento + paso, self._maximo_desplazamiento()))
+        if nuevo != self.desplazamiento:
+            self.desplazamiento = nuevo
+            self.programar_dibujo()
+        return 'break'
+    
+    def _mover_seleccion(self, paso):
+        """Flechas y Re Pág/Av Pág: mueve la selección y la mantiene visible"""
+        if not self.filas:
+            return 'break'
+        actual = self._indice(self._seleccionada) if self._seleccionada is not None else None
+        indice = 0 if actual is None else max(0, min(len(self.filas) - 1, actual + paso))
+        self._seleccionada = self.filas[indice]
+        self._hacer_visible(indice)
+        self.dibujar()
+        return 'break'
+    
+    def _hacer_visible(self, indice):
+        """Ajusta el desplazamiento mínimo para que la fila quede en pantalla"""
+        if indice < self.desplazamiento:
+            self.desplazamiento = indice
+        elif indice >= self.desplazamiento + self._visibles:
+            self.desplazamiento = indice - self._visibles + 1
+    
+    def _al_seleccionar(self, event):
+        """Traduce el item clicado a la fila de datos que muestra"""
+        seleccion = self.tree.selection()
+        if not seleccion or seleccion[0] not in self._items:
+            return
+        indice = self.desplazamiento + self._items.index(seleccion[0])
+        if indice < len(self.filas):
+            self._seleccionada = self.filas[indice]
+    
+    def _al_redimensionar(self, event):
+        """Recalcula cuántas filas caben al cambiar el alto de la tabla"""
+        self._medir(event.height)
+    
+    def _medir(self, alto=None):
+        """Filas que caben en el alto de la tabla, según el alto real de fila"""
+        if self._items:
+            caja = self.tree.bbox(self._items[0])
+            if caja:
+                self._encabezado, self._alto_fila = caja[1], caja[3]
+        alto = alto or self.tree.winfo_height()
+        if alto <= 1:
+            # Todavía no está en pantalla (pestaña oculta)
+            return
+        alto_fila = self._alto_fila or self.ALTO_FILA
+        encabezado = self._encabezado or self.ALTO_ENCABEZADO
+        visibles = max(1, (alto - encabezado) // alto_fila)
+        
+        if visibles != self._visibles:
+            self._visibles = visibles
+            self.desplazamiento = min(self.desplazamiento, self._maximo_desplazamiento())
+            self.programar_dibujo()
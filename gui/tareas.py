@@ -0,0 +1,118 @@
+"""
+Ejecución de consultas pesadas fuera del hilo de Tkinter
+
+Las funciones corren en un pool de hilos; el resultado se entrega de vuelta
+al hilo de la interfaz revisando con after(), porque Tkinter no es seguro
+entre hilos. Un clic repetido sobre una tarea que ya está corriendo se
+ignora, y una tarea cancelada descarta su resultado.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class Cancelacion:
+    """Bandera que la tarea puede revisar entre consultas"""
+    
+    def __init__(self):
+        self._evento = threading.Event()
+    
+    def cancelar(self):
+        """Marca la tarea como cancelada"""
+        self._evento.set()
+    
+    @property
+    def cancelada(self):
+        """True si se pidió cancelar la tarea"""
+        return self._evento.is_set()
+
+
+class EjecutorTareas:
+    """Pool de hilos para reportes y gráficas con entrega vía after()"""
+    
+    INTERVALO_REVISION = 50     # Milisegundos entre revisiones de resultados
+    
+    def __init__(self, widget, max_hilos=2, al_cambiar_estado=None):
+        """
+        Args:
+            widget: Widget de Tkinter usado para programar after()
+            max_hilos: Hilos de trabajo (no debe superar el pool de la BD)
+            al_cambiar_estado: Función(ocupado, descripcion) para el indicador
+        """
+        self.widget = widget
+        self.pool = ThreadPoolExecutor(max_workers=max_hilos, thread_name_prefix="reportes")
+        self.al_cambiar_estado = al_cambiar_estado
+        self.en_curso = {}          # clave -> (future, cancelacion, descripcion)
+    
+    def ejecutar(self, clave, funcion, al_terminar, al_fallar=None, descripcion=""):
+        """
+        Ejecuta funcion(cancelacion) en segundo plano
+        
+        Args:
+            clave: Identificador de la tarea; si ya está corriendo se ignora
+            funcion: Recibe un Cancelacion y devuelve el resultado
+            al_terminar: Se llama en el hilo de Tkinter con el resultado
+            al_fallar: Se llama en el hilo de Tkinter con la excepción
+            descripcion: Texto para el indicador de ocupado
+        
+        Returns:
+            True si la tarea se lanzó, False si ya estaba en curso
+        """
+        if clave in self.en_curso:
+            return False
+        
+        cancelacion = Cancelacion()
+        future = self.pool.submit(funcion, cancelacion)
+        self.en_curso[clave] = (future, cancelacion, descripcion)
+        self._notificar()
+        self.widget.after(self.INTERVALO_REVISION, self._revisar, clave, future, al_terminar, al_fallar)
+        return True
+    
+    def cancelar(self, clave=None):
+        """Cancela una tarea, o todas si no se indica clave"""
+        claves = [clave] if clave is not None else list(self.en_curso)
+        for c in claves:
+            if c in self.en_curso:
+                future, cancelacion, _ = self.en_curso.pop(c)
+                cancelacion.cancelar()
+                future.cancel()
+        self._notificar()
+    
+    def ocupado(self):
+        """True si hay alguna tarea en curso"""
+        return bool(self.en_curso)
+    
+    def cerrar(self):
+        """Cancela lo pendiente y libera los hilos"""
+        self.cancelar()
+        self.pool.shutdown(wait=False)
+    
+    def _revisar(self, clave, future, al_terminar, al_fallar):
+        """Revisa desde el hilo de Tkinter si la tarea terminó"""
+        entrada = self.en_curso.get(clave)
+        if entrada is None or entrada[0] is not future:
+            # Fue cancelada (y quizá relanzada): el resultado se descarta
+            return
+        
+        cancelacion = entrada[1]
+        if not future.done():
+            self.widget.after(self.INTERVALO_REVISION, self._revisar, clave, future, al_terminar, al_fallar)
+            return
+        
+        del self.en_curso[clave]
+        self._notificar()
+        if cancelacion.cancelada:
+            return
+        
+        error = future.exception()
+        if error is not None:
+            if al_fallar:
+                al_fallar(error)
+            return
+        al_terminar(future.result())
+    
+    def _notificar(self):
+        """Informa al indicador de ocupado"""
+        if self.al_cambiar_estado:
+            descripciones = [d for _, _, d in self.en_curso.values() if d]
+            self.al_cambiar_estado(bool(self.en_curso), ", ".join(descripciones))
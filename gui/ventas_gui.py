@@ -5,14 +5,42 @@ GUI para Punto de Venta
 import tkinter as tk
 from tkinter import ttk, messagebox
 from datetime import datetime
+import socket
+from database.carrito import Carrito
+from database.dinero import a_centavos, formato
+from database.reservas import MotorReservas, StockInsuficienteError
+from gui.tabla_virtual import TablaVirtual
+from config import RESERVAR_EN_CARRITO, DURACION_RESERVA_MINUTOS, MODO_ESCANER
+
+
+# Resultados de búsqueda ordenados por relevancia en la tabla de sugerencias
+LIMITE_SUGERENCIAS = 200
+
+# El escáner teclea el código en milisegundos: las sugerencias esperan a que
+# termine en lugar de buscar con cada dígito
+RETRASO_SUGERENCIAS_MS = 150
 
 
 class VentasFrame(ttk.Frame):
-    def __init__(self, parent, bd):
+    def __init__(self, parent, bd, catalogo, sincronizador=None):
         super().__init__(parent)
         self.bd = bd
-        self.carrito = []
+        self.catalogo = catalogo
+        # Con sincronizador, las ventas se cobran contra el diario local
+        self.sincronizador = sincronizador
+        self.carrito = Carrito()
+        self._sugerencias_pendientes = None
+        
+        # Reservas opcionales de stock mientras el producto está en el carrito
+        self.reservas = None
+        if RESERVAR_EN_CARRITO:
+            self.reservas = MotorReservas(bd, socket.gethostname(), DURACION_RESERVA_MINUTOS)
+            self.after(60000, self.expirar_reservas)
+        
         self.crear_interfaz()
+        
+        if self.sincronizador:
+            self.actualizar_estado_sincronizacion()
     
     def crear_interfaz(self):
         """Crea la interfaz de ventas"""
@@ -25,10 +53,13 @@ class VentasFrame(ttk.Frame):
         frame_superior = ttk.Frame(self)
         frame_superior.pack(fill=tk.X, padx=10, pady=5)
         
-        ttk.Label(frame_superior, text="🔍 Buscar Producto (nombre o ID):").pack(side=tk.LEFT, padx=5)
+        ttk.Label(frame_superior, text="🔍 Buscar Producto (nombre, ID o código):").pack(side=tk.LEFT, padx=5)
         self.entrada_busqueda = ttk.Entry(frame_superior, width=25)
         self.entrada_busqueda.pack(side=tk.LEFT, padx=5)
-        self.entrada_busqueda.bind('<KeyRelease>', lambda e: self.actualizar_sugerencias())
+        self.entrada_busqueda.bind('<KeyRelease>', lambda e: self.programar_sugerencias())
+        # El escáner termina cada código con Enter
+        self.entrada_busqueda.bind('<Return>', self.escanear)
+        self.entrada_busqueda.focus_set()
         
         ttk.Label(frame_superior, text="Cantidad:").pack(side=tk.LEFT, padx=5)
         self.entrada_cantidad = ttk.Entry(frame_superior, width=10)
@@ -38,58 +69,64 @@ class VentasFrame(ttk.Frame):
         ttk.Button(frame_superior, text="➕ Agregar al Carrito", command=self.agregar_carrito).pack(side=tk.LEFT, padx=5)
         ttk.Button(frame_superior, text="🔄 Recargar", command=self.cargar_todos_productos).pack(side=tk.LEFT, padx=5)
         
-        # Frame para mostrar sugerencias
-        frame_sugerencias = ttk.LabelFrame(self, text="Productos Disponibles (filtrados)")
-        frame_sugerencias.pack(fill=tk.BOTH, expand=False, padx=10, pady=5)
-        
-        # Tabla de productos para seleccionar
-        self.tree_productos = ttk.Treeview(
-            frame_sugerencias,
-            columns=('ID', 'Producto', 'Categoría', 'Precio', 'Stock'),
-            height=4,
-            show='headings'
-        )
+        self.modo_escaner = tk.BooleanVar(value=MODO_ESCANER)
+        ttk.Checkbutton(frame_superior, text="📷 Modo escáner", variable=self.modo_escaner).pack(side=tk.LEFT, padx=5)
         
-        self.tree_productos.column('ID', width=40)
-        self.tree_productos.column('Producto', width=200)
-        self.tree_productos.column('Categoría', width=100)
-        self.tree_productos.column('Precio', width=80)
-        self.tree_productos.column('Stock', width=80)
+        # Avisos sin ventanas modales: el escáner puede seguir leyendo
+        self.label_aviso = ttk.Label(self, text="", font=("Arial", 10, "bold"))
+        self.label_aviso.pack(fill=tk.X, padx=15)
         
-        self.tree_productos.heading('ID', text='ID')
-        self.tree_productos.heading('Producto', text='Producto')
-        self.tree_productos.heading('Categoría', text='Categoría')
-        self.tree_productos.heading('Precio', text='Precio')
-        self.tree_productos.heading('Stock', text='Stock')
+        # Frame para mostrar sugerencias
+        self.frame_sugerencias = ttk.LabelFrame(self, text="Productos Disponibles (filtrados)")
+        self.frame_sugerencias.pack(fill=tk.BOTH, expand=False, padx=10, pady=5)
+        
+        # Tabla de productos para seleccionar (solo dibuja las filas visibles)
+        self.tabla_productos = TablaVirtual(
+            self.frame_sugerencias,
+            columnas=[
+                ('ID', 40, 'id'),
+                ('Producto', 200, 'nombre'),
+                ('Categoría', 100, 'categoria'),
+                ('Precio', 80, 'precio_venta'),
+                ('Stock', 80, 'stock')
+            ],
+            formatear=lambda prod: (
+                prod['id'],
+                prod['nombre'],
+                prod['categoria'],
+                f"${prod['precio_venta']:.2f}",
+                prod['stock']
+            ),
+            etiquetas=lambda prod: ('stock_bajo',) if prod['stock'] <= 5 else (),
+            alto=4
+        )
+        self.tabla_productos.tag_configure('stock_bajo', background='#ffcccc')
+        self.tabla_productos.pack(fill=tk.BOTH, expand=True)
         
         # Eventos para la tabla
-        self.tree_productos.bind('<Double-1>', self.seleccionar_producto_tabla)
-        
-        scrollbar_prod = ttk.Scrollbar(frame_sugerencias, orient=tk.VERTICAL, command=self.tree_productos.yview)
-        self.tree_productos.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scrollbar_prod.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tabla_productos.tree.bind('<Double-1>', self.seleccionar_producto_tabla)
         
         # Frame central - carrito
         ttk.Label(self, text="Carrito de Compra", font=("Arial", 12, "bold")).pack(pady=5)
         
-        self.tree_carrito = ttk.Treeview(
+        # Filas: LineaCarrito; agregar o quitar solo toca la línea afectada
+        self.tabla_carrito = TablaVirtual(
             self,
-            columns=('Producto', 'Cantidad', 'Precio', 'Subtotal'),
-            height=12,
-            show='headings'
+            columnas=[
+                ('Producto', 250, lambda linea: linea.nombre),
+                ('Cantidad', 80, lambda linea: linea.cantidad),
+                ('Precio', 80, lambda linea: linea.precio_centavos),
+                ('Subtotal', 100, lambda linea: linea.subtotal_centavos)
+            ],
+            formatear=lambda linea: (
+                linea.nombre,
+                linea.cantidad,
+                formato(linea.precio_centavos),
+                formato(linea.subtotal_centavos)
+            ),
+            alto=12
         )
-        
-        self.tree_carrito.column('Producto', width=250)
-        self.tree_carrito.column('Cantidad', width=80)
-        self.tree_carrito.column('Precio', width=80)
-        self.tree_carrito.column('Subtotal', width=100)
-        
-        self.tree_carrito.heading('Producto', text='Producto')
-        self.tree_carrito.heading('Cantidad', text='Cantidad')
-        self.tree_carrito.heading('Precio', text='Precio')
-        self.tree_carrito.heading('Subtotal', text='Subtotal')
-        
-        self.tree_carrito.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+        self.tabla_carrito.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
         
         # Frame de botones carrito
         frame_botones = ttk.Frame(self)
@@ -113,101 +150,207 @@ class VentasFrame(ttk.Frame):
         
         ttk.Button(frame_inferior, text="Registrar Venta", command=self.registrar_venta).pack(side=tk.LEFT, padx=5)
         
-        # Cargar productos iniciales
-        self.cargar_todos_productos()
+        # Estado del diario de ventas (pendientes de enviar a la BD)
+        self.label_sincronizacion = ttk.Label(frame_inferior, text="", foreground="gray")
+        self.label_sincronizacion.pack(side=tk.RIGHT, padx=5)
+        
+        # Lo que ya tenga el catálogo; la ventana principal lo carga en segundo plano
+        self.mostrar_catalogo()
     
-    def agregar_carrito(self):
-        """Agrega un producto al carrito"""
+    def agregar_carrito(self, producto_id=None):
+        """Agrega al carrito el producto elegido o el mejor resultado de la búsqueda"""
         try:
             nombre_busqueda = self.entrada_busqueda.get().strip()
             cantidad = int(self.entrada_cantidad.get())
             
-            if not nombre_busqueda or cantidad <= 0:
+            if (not nombre_busqueda and producto_id is None) or cantidad <= 0:
                 messagebox.showwarning("Aviso", "Ingresa nombre y cantidad válidos")
                 return
             
-            # Buscar producto
-            sql = """
-                SELECT p.id, p.nombre, p.precio_venta, p.stock, c.nombre as categoria
-                FROM productos p
-                JOIN categorias c ON p.categoria_id = c.id
-                WHERE p.activo = TRUE AND (p.nombre LIKE %s OR p.id = %s)
-                LIMIT 1
-            """
-            
-            productos = self.bd.ejecutar_consulta(sql, (f"%{nombre_busqueda}%", nombre_busqueda))
+            # Buscar producto: el elegido en la tabla, o el mejor resultado
+            # del índice (ID, código de barras o nombre)
+            if producto_id is not None:
+                producto = self.catalogo.obtener(producto_id)
+            else:
+                resultados = self.catalogo.buscar(nombre_busqueda, limite=1)
+                producto = resultados[0] if resultados else None
             
-            if not productos:
+            if not producto:
                 messagebox.showerror("Error", "Producto no encontrado")
                 return
             
-            producto = productos[0]
-            
-            # Validar stock
-            if producto['stock'] < cantidad:
-                messagebox.showerror("Error", f"Stock insuficiente. Disponible: {producto['stock']}")
-                return
-            
-            # Agregar al carrito
-            subtotal = producto['precio_venta'] * cantidad
-            self.carrito.append({
-                'id': producto['id'],
-                'nombre': producto['nombre'],
-                'cantidad': cantidad,
-                'precio': producto['precio_venta'],
-                'subtotal': subtotal
-            })
-            
-            self.actualizar_carrito()
-            self.entrada_busqueda.delete(0, tk.END)
-            self.entrada_cantidad.delete(0, tk.END)
-            self.entrada_cantidad.insert(0, "1")
-            messagebox.showinfo("Éxito", f"{producto['nombre']} agregado al carrito")
+            if self.agregar_producto(producto, cantidad):
+                self.entrada_busqueda.delete(0, tk.END)
+                self.reiniciar_cantidad()
         
         except ValueError:
             messagebox.showerror("Error", "Cantidad debe ser un número")
     
+    def escanear(self, event=None):
+        """
+        Enter en la búsqueda: agrega el producto del código de barras
+        
+        Fuera del modo escáner, un texto que no es código agrega el mejor
+        resultado de la búsqueda, como el botón.
+        """
+        codigo = self.entrada_busqueda.get().strip()
+        if not codigo:
+            return 'break'
+        
+        producto = self.catalogo.buscar_por_codigo(codigo)
+        if producto is None and not self.modo_escaner.get():
+            self.agregar_carrito()
+            return 'break'
+        
+        # Lista para el siguiente código aunque este no exista
+        self.entrada_busqueda.delete(0, tk.END)
+        if producto is None:
+            self.avisar(f"Código no registrado: {codigo}", error=True)
+            return 'break'
+        
+        # La cantidad escrita antes de escanear multiplica (3, Enter con el código)
+        try:
+            cantidad = max(int(self.entrada_cantidad.get()), 1)
+        except ValueError:
+            cantidad = 1
+        self.agregar_producto(producto, cantidad)
+        self.reiniciar_cantidad()
+        return 'break'
+    
+    def agregar_producto(self, producto, cantidad):
+        """
+        Suma unidades de un producto al carrito (a su línea si ya estaba)
+        
+        Args:
+            producto: Diccionario del catálogo
+            cantidad: Unidades a agregar
+        
+        Returns:
+            True si se agregaron
+        """
+        linea = self.carrito.linea(producto['id'])
+        total = cantidad + (linea.cantidad if linea else 0)
+        
+        # Validar stock
+        if producto['stock'] < total:
+            self.avisar(f"Stock insuficiente de {producto['nombre']}. Disponible: {producto['stock']}", error=True)
+            return False
+        
+        # Apartar las unidades para que otra caja no las venda; la línea
+        # conserva una sola reserva que cubre todas sus unidades
+        reserva_id = None
+        if self.reservas:
+            if linea:
+                apartado = self.reservas.ampliar(linea.reserva_id, producto['id'], cantidad)
+            else:
+                reserva_id = self.reservas.reservar(producto['id'], cantidad)
+                apartado = bool(reserva_id)
+            if not apartado:
+                self.avisar(f"No se pudieron apartar unidades de {producto['nombre']} (otra caja las tomó)", error=True)
+                return False
+        
+        linea, nueva = self.carrito.agregar(
+            producto['id'], producto['nombre'], a_centavos(producto['precio_venta']), cantidad, reserva_id
+        )
+        if nueva:
+            self.tabla_carrito.agregar([linea])
+        else:
+            self.tabla_carrito.actualizar_fila(linea)
+        self.tabla_carrito.enfocar(linea)
+        self.actualizar_total()
+        self.avisar(f"✓ {producto['nombre']} × {total}")
+        return True
+    
+    def reiniciar_cantidad(self):
+        """Deja la cantidad en 1 para el siguiente producto"""
+        self.entrada_cantidad.delete(0, tk.END)
+        self.entrada_cantidad.insert(0, "1")
+    
+    def avisar(self, texto, error=False):
+        """Muestra un aviso junto a la búsqueda (con campana si es error)"""
+        self.label_aviso.config(text=texto, foreground="red" if error else "green")
+        if error:
+            self.bell()
+    
     def actualizar_carrito(self):
-        """Actualiza la visualización del carrito"""
-        for item in self.tree_carrito.get_children():
-            self.tree_carrito.delete(item)
-        
-        total = 0
-        for item in self.carrito:
-            self.tree_carrito.insert('', tk.END, values=(
-                item['nombre'],
-                item['cantidad'],
-                f"${item['precio']:.2f}",
-                f"${item['subtotal']:.2f}"
-            ))
-            total += item['subtotal']
-        
-        self.label_total.config(text=f"${total:.2f}")
+        """Vuelve a mostrar todo el carrito y su total"""
+        self.tabla_carrito.mostrar(self.carrito)
+        self.actualizar_total()
+    
+    def actualizar_total(self):
+        """Muestra el total que el carrito lleva acumulado"""
+        self.label_total.config(text=str(self.carrito.total))
     
     def eliminar_carrito(self):
         """Elimina un producto del carrito"""
-        seleccion = self.tree_carrito.selection()
-        if not seleccion:
+        linea = self.tabla_carrito.seleccionada()
+        if not linea:
             messagebox.showwarning("Aviso", "Selecciona un producto")
             return
         
-        index = self.tree_carrito.index(seleccion[0])
-        self.carrito.pop(index)
-        self.actualizar_carrito()
+        self.carrito.quitar(linea.producto_id)
+        self.tabla_carrito.quitar(linea)
+        self.liberar_reservas([linea])
+        self.actualizar_total()
     
-    def limpiar_carrito(self):
+    def limpiar_carrito(self, liberar=True):
         """Limpia todo el carrito"""
-        self.carrito = []
+        if liberar:
+            self.liberar_reservas(self.carrito)
+        self.carrito.vaciar()
         self.actualizar_carrito()
     
+    def liberar_reservas(self, lineas):
+        """Regresa al stock las unidades apartadas por las líneas"""
+        if self.reservas:
+            self.reservas.liberar([linea.reserva_id for linea in lineas if linea.reserva_id])
+    
+    def actualizar_estado_sincronizacion(self):
+        """Muestra cada 2 segundos cuántas ventas faltan por sincronizar"""
+        estado = self.sincronizador.estado()
+        texto = "🟢 En línea" if estado['en_linea'] else "🔴 Sin conexión"
+        if estado['pendientes']:
+            texto += f" | {estado['pendientes']} ventas por sincronizar"
+        if estado['conflictos']:
+            texto += f" | ⚠ {estado['conflictos']} conflictos (ver {self.sincronizador.diario.ruta_conflictos})"
+        self.label_sincronizacion.config(text=texto)
+        
+        sobreventas = self.sincronizador.tomar_sobreventas()
+        if sobreventas:
+            self.avisar_sobreventas(sobreventas)
+        self.after(2000, self.actualizar_estado_sincronizacion)
+    
+    def avisar_sobreventas(self, sobreventas):
+        """Avisa en la caja de las ventas sin conexión que dejaron stock negativo"""
+        renglones = []
+        for venta in sobreventas:
+            for fallido in venta['fallidos']:
+                producto = self.catalogo.obtener(fallido['producto_id'])
+                nombre = producto['nombre'] if producto else f"ID {fallido['producto_id']}"
+                renglones.append(
+                    f"• Ticket #{venta['id_cliente'][:8].upper()} ({venta['fecha']} {venta['hora']}): "
+                    f"{nombre} × {fallido['cantidad']}"
+                )
+        messagebox.showwarning(
+            "Stock negativo",
+            "Ventas cobradas sin conexión que otra caja ya había surtido:\n"
+            + "\n".join(renglones)
+            + "\n\nSe registraron con stock negativo; revisa el inventario de estos productos.\n"
+            + f"Detalle en {self.sincronizador.diario.ruta_conflictos}"
+        )
+    
+    def expirar_reservas(self):
+        """Repone periódicamente las reservas abandonadas de cualquier caja"""
+        self.reservas.expirar_reservas()
+        self.after(60000, self.expirar_reservas)
+    
     def registrar_venta(self):
         """Registra la venta en la BD"""
         if not self.carrito:
             messagebox.showwarning("Aviso", "El carrito está vacío")
             return
         
-        # Calcular total
-        total = sum(item['subtotal'] for item in self.carrito)
+        total = self.carrito.total
         
         try:
             # Registrar venta
@@ -215,112 +358,107 @@ class VentasFrame(ttk.Frame):
             hora = datetime.now().time()
             metodo_pago = self.combo_pago.get()
             
-            sql_venta = "INSERT INTO ventas (fecha, hora, total, metodo_pago) VALUES (%s, %s, %s, %s)"
-            venta_id = self.bd.ejecutar_insertar(sql_venta, (fecha, hora, total, metodo_pago))
+            lineas = self.carrito.lineas_venta()
             
-            if venta_id == 0:
+            if self.sincronizador:
+                # En línea se registra como siempre; el diario solo sin conexión
+                venta_id, id_cliente = self.sincronizador.cobrar(fecha, hora, metodo_pago, lineas)
+            else:
+                # Encabezado, detalles y stock en una sola transacción
+                venta_id, id_cliente = self.bd.registrar_venta(fecha, hora, metodo_pago, lineas), None
+            
+            if id_cliente:
+                # Queda en disco; la BD la recibe al volver la conexión
+                self.catalogo.descontar_local(lineas)
+                comprobante = f"Ticket #{id_cliente[:8].upper()}"
+            elif venta_id == 0:
                 messagebox.showerror("Error", "No se pudo registrar la venta")
                 return
+            else:
+                # Releer solo el stock de los productos vendidos
+                self.catalogo.recargar_productos(list(self.carrito.lineas))
+                comprobante = f"Factura #{venta_id}"
             
-            # Registrar detalles y actualizar stock
-            for item in self.carrito:
-                # Insertar detalle
-                sql_detalle = """
-                    INSERT INTO detalle_ventas (venta_id, producto_id, cantidad, precio_unitario, subtotal)
-                    VALUES (%s, %s, %s, %s, %s)
-                """
-                self.bd.ejecutar_insertar(sql_detalle, 
-                    (venta_id, item['id'], item['cantidad'], item['precio'], item['subtotal']))
-                
-                # Actualizar stock
-                sql_stock = "UPDATE productos SET stock = stock - %s WHERE id = %s"
-                self.bd.ejecutar_actualizar(sql_stock, (item['cantidad'], item['id']))
+            self.todos_productos = self.catalogo.listar()
+            self.actualizar_sugerencias()
             
-            messagebox.showinfo("Éxito", f"Venta registrada. Factura #{venta_id}\nTotal: ${total:.2f}")
-            self.limpiar_carrito()
+            messagebox.showinfo("Éxito", f"Venta registrada. {comprobante}\nTotal: {total}")
+            # Las reservas se consumieron con la venta
+            self.limpiar_carrito(liberar=False)
+        
+        except StockInsuficienteError as e:
+            faltantes = "\n".join(
+                f"• {self.carrito.linea(f['producto_id']).nombre} (pedido {f['cantidad']})"
+                for f in e.fallidos
+            )
+            messagebox.showerror("Stock insuficiente", f"Otra caja vendió estas unidades:\n{faltantes}")
         
         except Exception as e:
             messagebox.showerror("Error", f"Error al registrar: {str(e)}")
     
     # ===== NUEVOS MÉTODOS PARA BÚSQUEDA EN TIEMPO REAL =====
     
-    def cargar_todos_productos(self):
-        """Carga todos los productos en la tabla de sugerencias"""
-        sql = """
-            SELECT 
-                p.id,
-                p.nombre,
-                c.nombre as categoria,
-                p.precio_venta,
-                p.stock
-            FROM productos p
-            JOIN categorias c ON p.categoria_id = c.id
-            WHERE p.activo = TRUE
-            ORDER BY p.nombre
+    def mostrar_catalogo(self, cargando=False):
         """
+        Muestra en las sugerencias lo que tiene el catálogo en memoria
         
-        self.todos_productos = self.bd.ejecutar_consulta(sql) or []
+        Args:
+            cargando: True mientras el catálogo se sigue cargando
+        """
+        self.todos_productos = self.catalogo.listar()
+        texto = "Productos Disponibles (cargando catálogo...)" if cargando else "Productos Disponibles (filtrados)"
+        self.frame_sugerencias.configure(text=texto)
+        self.actualizar_sugerencias()
+    
+    def cargar_todos_productos(self):
+        """Carga todos los productos en la tabla de sugerencias"""
+        # Solo relee los productos que cambiaron desde la última carga
+        self.catalogo.refrescar()
         
         # Limpiar búsqueda para mostrar todos
         self.entrada_busqueda.delete(0, tk.END)
         
-        self.actualizar_sugerencias()
+        self.mostrar_catalogo()
         
         # Mensaje de confirmación
         messagebox.showinfo("Éxito", f"✅ {len(self.todos_productos)} productos actualizados")
     
+    def programar_sugerencias(self):
+        """Espera a que se deje de teclear antes de buscar"""
+        if self._sugerencias_pendientes:
+            self.after_cancel(self._sugerencias_pendientes)
+        self._sugerencias_pendientes = self.after(RETRASO_SUGERENCIAS_MS, self.actualizar_sugerencias)
+    
     def actualizar_sugerencias(self):
         """Actualiza la tabla de productos según la búsqueda en tiempo real"""
-        # Limpiar tabla
-        for item in self.tree_productos.get_children():
-            self.tree_productos.delete(item)
-        
+        self._sugerencias_pendientes = None
         # Obtener término de búsqueda
-        termino = self.entrada_busqueda.get().lower().strip()
+        termino = self.entrada_busqueda.get().strip()
         
-        # Si no hay término, mostrar todos
+        # Si no hay término, mostrar todos (la tabla solo dibuja los visibles)
         if not termino:
             productos_filtrados = self.todos_productos
         else:
-            # Filtrar por nombre o ID
-            productos_filtrados = [
-                p for p in self.todos_productos
-                if termino in p['nombre'].lower() or termino in str(p['id'])
-            ]
-        
-        # Insertar productos filtrados
-        for prod in productos_filtrados[:20]:  # Limitar a 20 resultados
-            tag = 'stock_bajo' if prod['stock'] <= 5 else ''
-            self.tree_productos.insert('', tk.END, values=(
-                prod['id'],
-                prod['nombre'],
-                prod['categoria'],
-                f"${prod['precio_venta']:.2f}",
-                prod['stock']
-            ), tags=(tag,))
+            # Índice por nombre (sin acentos), ID o código de barras
+            productos_filtrados = self.catalogo.buscar(termino, limite=LIMITE_SUGERENCIAS)
         
-        # Configurar colores
-        self.tree_productos.tag_configure('stock_bajo', background='#ffcccc')
+        self.tabla_productos.mostrar(productos_filtrados)
     
     def seleccionar_producto_tabla(self, event):
         """Selecciona un producto de la tabla con doble click"""
-        seleccion = self.tree_productos.selection()
-        if not seleccion:
+        producto = self.tabla_productos.seleccionada()
+        if not producto:
             return
         
-        item = self.tree_productos.item(seleccion[0])
-        valores = item['values']
-        
         # Obtener datos del producto
-        producto_id = valores[0]
-        producto_nombre = valores[1]
+        producto_id = producto['id']
+        producto_nombre = producto['nombre']
         
         # Llenar el campo de búsqueda y cantidad
         self.entrada_busqueda.delete(0, tk.END)
         self.entrada_busqueda.insert(0, producto_nombre)
         
-        self.entrada_cantidad.delete(0, tk.END)
-        self.entrada_cantidad.insert(0, "1")
+        self.reiniciar_cantidad()
         
-        # Agregar al carrito automáticamente
-        self.agregar_carrito()
+        # Agregar al carrito exactamente el producto elegido
+        self.agregar_carrito(producto_id)
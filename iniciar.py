@@ -1,19 +1,38 @@
 """
 Punto de Entrada Principal
 Mini Super Las Botargas - Sistema de Punto de Venta
+
+    python iniciar.py              # Abrir la caja
+    python iniciar.py --tiempos    # Además, imprimir los tiempos del arranque
 """
 
+import time
+INICIO = time.perf_counter()
+
 import sys
 import os
 
 # Agregar ruta al path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-import tkinter as tk
-from gui.app import VentanaPrincipal
+from gui.arranque import TiemposArranque
 
 if __name__ == "__main__":
+    tiempos = TiemposArranque(INICIO) if "--tiempos" in sys.argv[1:] else None
+    
+    import tkinter as tk
+    if tiempos:
+        tiempos.marcar("Importar tkinter")
+    
+    # Solo la caja: reportes (Matplotlib, pandas) se importa al abrir su pestaña
+    from gui.app import VentanaPrincipal
+    if tiempos:
+        tiempos.marcar("Importar gui.app")
+    
     root = tk.Tk()
-    app = VentanaPrincipal(root)
+    if tiempos:
+        tiempos.marcar("Crear ventana Tk")
+    
+    app = VentanaPrincipal(root, tiempos)
     root.protocol("WM_DELETE_WINDOW", app.cerrar_aplicacion)
     root.mainloop()
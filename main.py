@@ -4,7 +4,11 @@ Proyecto Final - Programación para el Análisis de Datos
 """
 
 from database.conexion import ConexionBD
-from config import HOST, USUARIO, CONTRASEÑA, BASE_DATOS
+from database.reservas import StockInsuficienteError
+from database import consultas
+from database.consultas import RangoFechas
+from database.dinero import Dinero
+from config import RUTA_ESTADISTICAS
 import os
 from datetime import datetime
 
@@ -12,12 +16,7 @@ from datetime import datetime
 class SistemaVentas:
     def __init__(self):
         # Configuración de base de datos
-        self.bd = ConexionBD(
-            host=HOST,
-            usuario=USUARIO,
-            contraseña=CONTRASEÑA,
-            base_datos=BASE_DATOS
-        )
+        self.bd = ConexionBD.desde_config()
         self.conexion = None
     
     def conectar(self):
@@ -25,13 +24,16 @@ class SistemaVentas:
         self.conexion = self.bd.conectar()
         if self.conexion is None:
             print("\n✗ No se pudo conectar a la base de datos")
-            print("Verifica tu usuario y contraseña de MySQL")
+            print("Verifica la configuración de la base de datos en config.py")
             return False
         return True
     
     def desconectar(self):
         """Desconecta de la base de datos"""
         self.bd.desconectar()
+        if self.bd.instrumentacion:
+            # Consultas más lentas de la sesión: python -m database.instrumentacion
+            self.bd.instrumentacion.guardar(RUTA_ESTADISTICAS)
     
     def limpiar_pantalla(self):
         """Limpia la pantalla de la consola"""
@@ -112,8 +114,8 @@ class SistemaVentas:
         try:
             categoria_id = int(input("\nSelecciona categoría (ID): ").strip())
             nombre = input("Nombre del producto: ").strip()
-            precio_compra = float(input("Precio de compra: "))
-            precio_venta = float(input("Precio de venta: "))
+            precio_compra = Dinero.de(input("Precio de compra: "))
+            precio_venta = Dinero.de(input("Precio de venta: "))
             stock = int(input("Stock inicial: "))
             stock_minimo = int(input("Stock mínimo: "))
             fecha_vencimiento = input("Fecha de vencimiento (YYYY-MM-DD) [opcional, presiona Enter]: ").strip()
@@ -136,7 +138,7 @@ class SistemaVentas:
                 VALUES (%s, %s, %s, %s, %s, %s, %s)
             """
             
-            parametros = (nombre, categoria_id, precio_compra, precio_venta, stock, stock_minimo, 
+            parametros = (nombre, categoria_id, precio_compra.a_decimal(), precio_venta.a_decimal(), stock, stock_minimo, 
                          fecha_vencimiento if fecha_vencimiento else None)
             
             id_producto = self.bd.ejecutar_insertar(sql, parametros)
@@ -236,6 +238,9 @@ class SistemaVentas:
             }
             
             if opcion in campos:
+                if campos[opcion] in ("precio_compra", "precio_venta"):
+                    # Redondeado al centavo igual que en la caja
+                    nuevovalor = Dinero.de(nuevovalor).a_decimal()
                 sql_update = f"UPDATE productos SET {campos[opcion]} = %s WHERE id = %s"
                 resultado = self.bd.ejecutar_actualizar(sql_update, (nuevovalor, producto_id))
                 
@@ -303,7 +308,7 @@ class SistemaVentas:
         print("(Escribe 'listo' cuando termines de agregar productos)\n")
         
         productos_venta = []
-        total = 0
+        total = Dinero()
         
         while True:
             try:
@@ -332,15 +337,16 @@ class SistemaVentas:
                     print(f"✗ Stock insuficiente. Disponible: {prod['stock']}")
                     continue
                 
-                subtotal = prod['precio_venta'] * cantidad
+                precio = Dinero.de(prod['precio_venta'])
+                subtotal = precio * cantidad
                 total += subtotal
                 
                 productos_venta.append({
                     'producto_id': producto_id,
                     'nombre': prod['nombre'],
                     'cantidad': cantidad,
-                    'precio_unitario': prod['precio_venta'],
-                    'subtotal': subtotal
+                    'precio_unitario': precio.a_decimal(),
+                    'subtotal': subtotal.a_decimal()
                 })
                 
                 print(f"✓ {prod['nombre']} agregado a la venta")
@@ -356,7 +362,7 @@ class SistemaVentas:
             print(f"{item['nombre']}: {item['cantidad']} x ${item['precio_unitario']:.2f} = ${item['subtotal']:.2f}")
         
         print("-" * 60)
-        print(f"TOTAL: ${total:.2f}")
+        print(f"TOTAL: {total}")
         print("=" * 60)
         
         metodo_pago = input("\nMétodo de pago (Efectivo/Tarjeta): ").strip() or "Efectivo"
@@ -372,30 +378,22 @@ class SistemaVentas:
             fecha = datetime.now().date()
             hora = datetime.now().time().strftime('%H:%M:%S')
             
-            sql_venta = "INSERT INTO ventas (fecha, hora, total, metodo_pago) VALUES (%s, %s, %s, %s)"
-            venta_id = self.bd.ejecutar_insertar(sql_venta, (fecha, hora, total, metodo_pago))
+            # Encabezado, detalles y stock en una sola transacción
+            venta_id = self.bd.registrar_venta(fecha, hora, metodo_pago, productos_venta)
             
             if venta_id == 0:
                 print("✗ Error al registrar la venta")
                 input("Presiona Enter para continuar...")
                 return
             
-            # Registrar detalles y actualizar stock
-            for item in productos_venta:
-                # Insertar detalle
-                sql_detalle = """
-                    INSERT INTO detalle_ventas (venta_id, producto_id, cantidad, precio_unitario, subtotal)
-                    VALUES (%s, %s, %s, %s, %s)
-                """
-                self.bd.ejecutar_insertar(sql_detalle, 
-                    (venta_id, item['producto_id'], item['cantidad'], item['precio_unitario'], item['subtotal']))
-                
-                # Actualizar stock
-                sql_stock = "UPDATE productos SET stock = stock - %s WHERE id = %s"
-                self.bd.ejecutar_actualizar(sql_stock, (item['cantidad'], item['producto_id']))
-            
             print(f"\n✓ Venta registrada exitosamente. Factura #{venta_id}")
         
+        except StockInsuficienteError as e:
+            # Otra caja vendió las unidades entre la consulta y la venta
+            print("✗ Venta cancelada, ya no hay stock suficiente de:")
+            for fallido in e.fallidos:
+                print(f"  ID {fallido['producto_id']}: pedido {fallido['cantidad']}")
+        
         except Exception as e:
             print(f"✗ Error al registrar la venta: {e}")
         
@@ -410,23 +408,9 @@ class SistemaVentas:
         
         print("REPORTE DE VENTAS DEL DÍA\n")
         
-        fecha = datetime.now().date()
-        sql = """
-            SELECT 
-                v.id,
-                v.fecha,
-                v.hora,
-                v.total,
-                v.metodo_pago,
-                COUNT(dv.id) as cantidad_productos
-            FROM ventas v
-            LEFT JOIN detalle_ventas dv ON v.id = dv.venta_id
-            WHERE DATE(v.fecha) = %s
-            GROUP BY v.id
-            ORDER BY v.hora
-        """
-        
-        ventas = self.bd.ejecutar_consulta(sql, (fecha,))
+        rango = RangoFechas.hoy()
+        fecha = rango.inicio
+        ventas = consultas.ventas_del_periodo(self.bd, rango)
         
         if not ventas:
             print(f"No hay ventas registradas para {fecha}")
@@ -437,13 +421,13 @@ class SistemaVentas:
         print(f"{'Factura':<8} {'Hora':<10} {'Total':<10} {'Método':<10} {'Productos':<10}")
         print("-" * 50)
         
-        total_ventas = 0
+        total_ventas = Dinero()
         for venta in ventas:
             print(f"{venta['id']:<8} {str(venta['hora']):<10} ${venta['total']:<9.2f} {venta['metodo_pago']:<10} {venta['cantidad_productos']:<10}")
-            total_ventas += venta['total']
+            total_ventas += Dinero.de(venta['total'])
         
         print("-" * 50)
-        print(f"TOTAL DEL DÍA: ${total_ventas:.2f}")
+        print(f"TOTAL DEL DÍA: {total_ventas}")
         print(f"CANTIDAD DE VENTAS: {len(ventas)}")
         
         input("Presiona Enter para continuar...")
@@ -455,21 +439,7 @@ class SistemaVentas:
         
         print("PRODUCTOS PRÓXIMOS A AGOTARSE\n")
         
-        sql = """
-            SELECT 
-                p.id,
-                p.nombre,
-                c.nombre as categoria,
-                p.stock,
-                p.stock_minimo,
-                p.fecha_vencimiento
-            FROM productos p
-            JOIN categorias c ON p.categoria_id = c.id
-            WHERE p.stock <= p.stock_minimo AND p.activo = TRUE
-            ORDER BY p.stock ASC
-        """
-        
-        productos = self.bd.ejecutar_consulta(sql)
+        productos = consultas.productos_stock_bajo(self.bd)
         
         if not productos:
             print("✓ No hay productos con stock bajo")
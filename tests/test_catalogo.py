@@ -0,0 +1,56 @@
+"""
+Búsqueda incremental de la pantalla de productos sobre el catálogo
+
+    python -m unittest discover tests
+"""
+
+import os
+import tempfile
+import unittest
+
+from database.catalogo import CatalogoProductos
+from database.conexion import ConexionBD
+from database.motores import MotorSQLite
+
+
+class FiltrarTest(unittest.TestCase):
+
+    def setUp(self):
+        carpeta = tempfile.TemporaryDirectory()
+        self.addCleanup(carpeta.cleanup)
+        bd = ConexionBD(None, None, None, None, tamaño_pool=1,
+                        motor=MotorSQLite(os.path.join(carpeta.name, "prueba.db")))
+        self.assertTrue(bd.conectar())
+        self.addCleanup(bd.desconectar)
+        self.catalogo = CatalogoProductos(bd)
+        self.assertTrue(self.catalogo.cargar())
+    
+    def nombres(self, termino):
+        return {prod['nombre'] for prod in self.catalogo.filtrar(termino)}
+    
+    def test_alargar_termino_no_pierde_productos(self):
+        # "col" encuentra productos que "co" no devolvía: reducir el
+        # resultado anterior los perdería
+        anteriores = self.nombres("co")
+        nombres = self.nombres("col")
+        self.assertIn("Chocolate Blanco", nombres)
+        self.assertIn("Brócoli Fresco", nombres)
+        self.assertFalse(nombres <= anteriores)
+    
+    def test_alargar_numero(self):
+        anteriores = {prod['id'] for prod in self.catalogo.filtrar("1")}
+        ids = {prod['id'] for prod in self.catalogo.filtrar("12")}
+        self.assertIn(12, ids)
+        self.assertFalse(ids <= anteriores)
+    
+    def test_termino_sin_coincidencias_intermedias(self):
+        self.assertEqual(self.nombres("ol"), set())
+        self.assertEqual(len(self.catalogo.filtrar("ola")), 10)
+    
+    def test_orden_por_categoria(self):
+        resultado = self.catalogo.filtrar("")
+        self.assertEqual(resultado, self.catalogo.listar(por_categoria=True))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+"""
+Diario local de ventas y sincronizador
+
+    python -m unittest discover tests
+"""
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from datetime import date, datetime
+
+from database.conexion import ConexionBD
+from database.diario import DiarioVentas, SincronizadorVentas
+from database.motores import MotorSQLite
+from database.resumenes import verificar_totales
+
+
+HORA = datetime(2026, 1, 1, 10).time()
+LINEAS = [{'producto_id': 1, 'cantidad': 1, 'precio_unitario': 2.5, 'subtotal': 2.5}]
+
+
+class SinConexion:
+    """ConexionBD caída que falla la prueba si la caja intenta usarla"""
+    
+    pool = None
+    
+    def __getattr__(self, nombre):
+        raise AssertionError(f"La caja no debe llamar a bd.{nombre} sin conexión")
+
+
+class CobrarTest(unittest.TestCase):
+
+    def setUp(self):
+        carpeta = tempfile.TemporaryDirectory()
+        self.addCleanup(carpeta.cleanup)
+        self.carpeta = carpeta.name
+        self.diario = DiarioVentas(os.path.join(self.carpeta, "diario_ventas.jsonl"))
+    
+    def conectar(self):
+        bd = ConexionBD(None, None, None, None, tamaño_pool=1,
+                        motor=MotorSQLite(os.path.join(self.carpeta, "prueba.db")))
+        self.assertTrue(bd.conectar())
+        self.addCleanup(bd.desconectar)
+        return bd
+    
+    def esperar(self, condicion):
+        for _ in range(100):
+            if condicion():
+                return True
+            time.sleep(0.02)
+        return False
+    
+    def test_sin_conexion_solo_escribe_el_diario(self):
+        sincronizador = SincronizadorVentas(SinConexion(), self.diario)
+        self.assertFalse(sincronizador.en_linea)
+        venta_id, id_cliente = sincronizador.cobrar(date.today(), HORA, "Efectivo", LINEAS)
+        self.assertIsNone(venta_id)
+        self.assertEqual(self.diario.pendientes, 1)
+        self.assertEqual(self.diario.leer_pendientes(10)[0][0]['id_cliente'], id_cliente)
+    
+    def test_el_sincronizador_prueba_la_conexion(self):
+        bd = self.conectar()
+        sincronizador = SincronizadorVentas(bd, self.diario, intervalo=0.02)
+        self.assertTrue(sincronizador.en_linea)
+        
+        # Servidor caído con el pool aún abierto: tener pool no basta
+        bd.responde = lambda tiempo_conexion=3: False
+        sincronizador.iniciar()
+        self.addCleanup(sincronizador.detener)
+        self.assertTrue(self.esperar(lambda: not sincronizador.en_linea))
+        
+        def registrar_venta(*args, **kwargs):
+            raise AssertionError("La caja no debe intentar en línea sin conexión")
+        bd.registrar_venta = registrar_venta
+        venta_id, _ = sincronizador.cobrar(date.today(), HORA, "Efectivo", LINEAS)
+        self.assertIsNone(venta_id)
+        
+        # Al volver, el sincronizador reenvía lo del diario
+        del bd.registrar_venta, bd.responde
+        self.assertTrue(self.esperar(lambda: sincronizador.en_linea and not self.diario.pendientes))
+        self.assertEqual(sincronizador.sincronizadas, 1)
+
+
+class ReenvioTest(unittest.TestCase):
+
+    def setUp(self):
+        carpeta = tempfile.TemporaryDirectory()
+        self.addCleanup(carpeta.cleanup)
+        self.ruta = os.path.join(carpeta.name, "diario_ventas.jsonl")
+        self.bd = ConexionBD(None, None, None, None, tamaño_pool=1,
+                             motor=MotorSQLite(os.path.join(carpeta.name, "prueba.db")))
+        self.assertTrue(self.bd.conectar())
+        self.addCleanup(self.bd.desconectar)
+    
+    def estado_bd(self):
+        return (
+            self.bd.ejecutar_consulta("SELECT COUNT(*) as n, SUM(total) as total FROM ventas")[0],
+            self.bd.ejecutar_consulta("SELECT stock FROM productos WHERE id = 1")[0]['stock'],
+            self.bd.ejecutar_consulta("SELECT SUM(total) as total FROM resumen_ventas_hora")[0]['total'],
+        )
+    
+    def test_reenviar_el_diario_no_duplica(self):
+        diario = DiarioVentas(self.ruta)
+        ids = [diario.registrar(date.today(), HORA, "Efectivo", LINEAS) for _ in range(3)]
+        # La primera alcanzó a registrarse en línea antes de caer al diario
+        self.assertTrue(self.bd.registrar_venta(date.today(), HORA, "Efectivo", LINEAS, id_cliente=ids[0]))
+        copia = self.ruta + ".copia"
+        shutil.copy(self.ruta, copia)
+        
+        self.assertEqual(SincronizadorVentas(self.bd, diario).sincronizar(), 3)
+        despues = self.estado_bd()
+        self.assertEqual(despues[0]['n'], 3)
+        
+        # Corte antes de guardar la posición: el diario completo se reenvía
+        shutil.copy(copia, self.ruta)
+        os.remove(diario.ruta_posicion)
+        diario = DiarioVentas(self.ruta)
+        self.assertEqual(diario.pendientes, 3)
+        self.assertEqual(SincronizadorVentas(self.bd, diario).sincronizar(), 3)
+        
+        self.assertEqual(self.estado_bd(), despues)
+        self.assertEqual(verificar_totales(self.bd), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
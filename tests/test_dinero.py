@@ -0,0 +1,101 @@
+"""
+Importes en centavos enteros y total del carrito
+
+    python -m unittest discover tests
+"""
+
+import unittest
+from decimal import Decimal
+
+from database.carrito import Carrito
+from database.dinero import Dinero, a_centavos, a_decimal, formato
+
+
+class CentavosTest(unittest.TestCase):
+
+    def test_redondeo_mitad_hacia_arriba(self):
+        self.assertEqual(a_centavos("0.005"), 1)
+        self.assertEqual(a_centavos("0.015"), 2)
+        self.assertEqual(a_centavos("-0.005"), -1)
+        self.assertEqual(a_centavos(Decimal("2.675")), 268)
+    
+    def test_float_por_su_texto(self):
+        # 2.675 en binario es 2.67499999...; se redondea el número que se ve
+        self.assertEqual(a_centavos(2.675), 268)
+        self.assertEqual(a_centavos(0.1 + 0.2), 30)
+    
+    def test_texto_invalido(self):
+        with self.assertRaises(ValueError):
+            a_centavos("3,50")
+    
+    def test_salidas(self):
+        self.assertEqual(a_decimal(1234), Decimal("12.34"))
+        self.assertEqual(a_decimal(-5), Decimal("-0.05"))
+        self.assertEqual(formato(123456), "$1234.56")
+        self.assertEqual(formato(-5), "$-0.05")
+
+
+class DineroTest(unittest.TestCase):
+
+    def test_suma_sin_errores_de_redondeo(self):
+        total = sum(Dinero.de("0.10") for _ in range(1000))
+        self.assertEqual(total, Dinero.de("100"))
+        self.assertEqual(total.a_decimal(), Decimal("100.00"))
+    
+    def test_aritmetica_entera(self):
+        precio = Dinero.de("12.99")
+        self.assertEqual(precio * 3, Dinero(3897))
+        self.assertEqual(3 * precio - precio, Dinero(2598))
+        self.assertEqual(-precio, Dinero(-1299))
+        with self.assertRaises(TypeError):
+            precio * 1.5
+        with self.assertRaises(TypeError):
+            precio * True
+    
+    def test_porcentaje_por_linea(self):
+        self.assertEqual(Dinero(1005).porcentaje("0.16"), Dinero(161))
+        self.assertEqual(Dinero(5).porcentaje("0.5"), Dinero(3))
+        # Redondear cada línea y sumar no es lo mismo que redondear el total
+        lineas = [Dinero(3), Dinero(3), Dinero(3)]
+        self.assertEqual(sum(linea.porcentaje("0.5") for linea in lineas), Dinero(6))
+        self.assertEqual(sum(lineas).porcentaje("0.5"), Dinero(5))
+    
+    def test_repartir_no_pierde_centavos(self):
+        partes = Dinero(100).repartir([1, 1, 1])
+        self.assertEqual([parte.centavos for parte in partes], [34, 33, 33])
+        self.assertEqual(sum(partes), Dinero(100))
+        self.assertEqual(Dinero(7).repartir([0, 0]), [Dinero(), Dinero()])
+    
+    def test_inmutable(self):
+        with self.assertRaises(AttributeError):
+            Dinero(1).centavos = 2
+
+
+class CarritoTest(unittest.TestCase):
+
+    def test_total_acumulado(self):
+        carrito = Carrito()
+        carrito.agregar(1, "Coca Cola 2L", 350, 2)
+        linea, nueva = carrito.agregar(1, "Coca Cola 2L", 999, 1)
+        self.assertFalse(nueva)
+        self.assertEqual((linea.cantidad, linea.precio_centavos), (3, 350))
+        carrito.agregar(2, "Pan", 125, 4)
+        self.assertEqual(carrito.total, Dinero(1550))
+        
+        carrito.quitar(1)
+        self.assertEqual(carrito.total, Dinero(500))
+        carrito.vaciar()
+        self.assertEqual(carrito.total, Dinero())
+    
+    def test_lineas_venta_cuadran_con_el_total(self):
+        carrito = Carrito()
+        for producto_id, precio in enumerate(["0.10", "0.20", "19.99", "2.675"], start=1):
+            carrito.agregar(producto_id, f"Producto {producto_id}", a_centavos(precio), 3)
+        lineas = carrito.lineas_venta()
+        self.assertEqual(sum(linea['subtotal'] for linea in lineas), carrito.total.a_decimal())
+        self.assertEqual(lineas[3]['precio_unitario'], Decimal("2.68"))
+        self.assertEqual(lineas[3]['subtotal'], Decimal("8.04"))
+
+
+if __name__ == "__main__":
+    unittest.main()
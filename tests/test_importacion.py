@@ -0,0 +1,60 @@
+"""
+Importación de listas de proveedores guardadas desde Excel en español
+
+    python -m unittest discover tests
+"""
+
+import os
+import tempfile
+import unittest
+
+from database.conexion import ConexionBD
+from database.importacion import CONVERSIONES, ImportadorProductos, leer_columnas
+from database.motores import MotorSQLite
+
+
+class ComaDecimalTest(unittest.TestCase):
+
+    def setUp(self):
+        self.carpeta = tempfile.TemporaryDirectory()
+        self.addCleanup(self.carpeta.cleanup)
+    
+    def escribir(self, nombre, texto):
+        ruta = os.path.join(self.carpeta.name, nombre)
+        with open(ruta, 'w', encoding='utf-8-sig', newline='') as archivo:
+            archivo.write(texto)
+        return ruta
+    
+    def test_precio_con_coma_decimal(self):
+        self.assertEqual(CONVERSIONES['precio_venta']("3,50"), 350)
+        self.assertEqual(CONVERSIONES['precio_venta']("$ 3.50"), 350)
+        self.assertEqual(CONVERSIONES['precio_venta']("1,234.50"), 123450)
+    
+    def test_csv_con_punto_y_coma(self):
+        ruta = self.escribir("lista.csv", "codigo;precio;costo\n7509999999999;3,50;1.234,50\n7509999999998;4.25;2\n")
+        filas = [
+            (numero, {columna: CONVERSIONES[columna](valor) for columna, valor in celdas.items()})
+            for numero, celdas in leer_columnas(ruta)
+        ]
+        self.assertEqual(filas, [
+            (2, {'codigo_barras': '7509999999999', 'precio_venta': 350, 'precio_compra': 123450}),
+            (3, {'codigo_barras': '7509999999998', 'precio_venta': 425, 'precio_compra': 200}),
+        ])
+    
+    def test_simular_lista_de_proveedor(self):
+        bd = ConexionBD(None, None, None, None, tamaño_pool=1,
+                        motor=MotorSQLite(os.path.join(self.carpeta.name, "prueba.db")))
+        self.assertTrue(bd.conectar())
+        self.addCleanup(bd.desconectar)
+        producto = bd.ejecutar_consulta("SELECT id, precio_venta FROM productos ORDER BY id LIMIT 1")[0]
+        
+        precio = f"{producto['precio_venta'] + 1:.2f}".replace('.', ',')
+        ruta = self.escribir("lista.csv", f"id;precio\n{producto['id']};{precio}\n")
+        resultado = ImportadorProductos(bd).importar(ruta, simular=True)
+        
+        self.assertEqual(resultado.errores, 0, resultado.filas_con_error)
+        self.assertEqual(resultado.modificados, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
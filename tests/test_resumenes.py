@@ -0,0 +1,105 @@
+"""
+Acumulado de las ventas en las tablas de resumen
+
+    python -m unittest discover tests
+"""
+
+import os
+import re
+import tempfile
+import unittest
+from datetime import date, datetime, timedelta
+
+from database.carrito import Carrito
+from database.conexion import ConexionBD
+from database.dinero import a_centavos
+from database.motores import DialectoMySQL, DialectoSQLite, MotorSQLite
+from database.resumenes import reconstruir_resumenes, sentencias_acumular, verificar_totales
+
+
+# tabla.columna, VALUES(columna) o excluded.columna: referencias sin ambigüedad
+PATRON_CALIFICADA = re.compile(r"\b\w+\.\w+\b|\bVALUES\(\w+\)")
+
+
+class SentenciasAcumularTest(unittest.TestCase):
+
+    def asignaciones(self, sql, inicio):
+        """(tabla destino, [(columna, expresión)]) de la cláusula de acumulado"""
+        tabla = re.search(r"INSERT INTO (\w+)", sql).group(1)
+        clausula = sql[sql.index(inicio) + len(inicio):]
+        return tabla, [parte.split("=", 1) for parte in clausula.split(",")]
+    
+    def test_mysql_califica_las_columnas_destino(self):
+        # INSERT ... SELECT ... FROM ventas: una columna sin tabla (total) es
+        # ambigua para MySQL y la venta completa se deshace
+        for sql in sentencias_acumular(DialectoMySQL()):
+            tabla, asignaciones = self.asignaciones(sql, "ON DUPLICATE KEY UPDATE")
+            for columna, expresion in asignaciones:
+                self.assertTrue(columna.strip().startswith(tabla + "."), sql)
+                sueltas = re.findall(r"[A-Za-z_]\w*", PATRON_CALIFICADA.sub("", expresion))
+                self.assertEqual(sueltas, [], sql)
+    
+    def test_sqlite_califica_las_columnas_destino(self):
+        for sql in sentencias_acumular(DialectoSQLite()):
+            tabla, asignaciones = self.asignaciones(sql, "DO UPDATE SET")
+            for _, expresion in asignaciones:
+                sueltas = re.findall(r"[A-Za-z_]\w*", PATRON_CALIFICADA.sub("", expresion))
+                self.assertEqual(sueltas, [], sql)
+
+
+
+class AcumularVsReconstruirTest(unittest.TestCase):
+
+    def setUp(self):
+        carpeta = tempfile.TemporaryDirectory()
+        self.addCleanup(carpeta.cleanup)
+        self.bd = ConexionBD(None, None, None, None, tamaño_pool=1,
+                             motor=MotorSQLite(os.path.join(carpeta.name, "prueba.db")))
+        self.assertTrue(self.bd.conectar())
+        self.addCleanup(self.bd.desconectar)
+        self.productos = self.bd.ejecutar_consulta(
+            "SELECT id, nombre, precio_venta FROM productos ORDER BY id LIMIT 4"
+        )
+    
+    def vender(self, fecha, hora, metodo_pago, cantidades):
+        carrito = Carrito()
+        for producto, cantidad in zip(self.productos, cantidades):
+            if cantidad:
+                carrito.agregar(producto['id'], producto['nombre'], a_centavos(producto['precio_venta']), cantidad)
+        venta_id = self.bd.registrar_venta(fecha, hora, metodo_pago, carrito.lineas_venta())
+        self.assertTrue(venta_id)
+    
+    def resumenes(self):
+        return {
+            tabla: sorted(tuple(str(valor) for valor in fila)
+                          for fila in self.bd.ejecutar_consulta(f"SELECT * FROM {tabla}", filas='tupla'))
+            for tabla in ('resumen_ventas_hora', 'resumen_productos_dia', 'resumen_categorias_dia')
+        }
+    
+    def test_acumulado_igual_a_reconstruido(self):
+        hoy = date.today()
+        # Misma fecha, hora, método y productos: pasa por la rama de conflicto
+        self.vender(hoy, datetime(2026, 1, 1, 10, 5).time(), "Efectivo", [1, 2, 0, 0])
+        self.vender(hoy, datetime(2026, 1, 1, 10, 40).time(), "Efectivo", [3, 0, 1, 0])
+        self.vender(hoy, datetime(2026, 1, 1, 18, 0).time(), "Tarjeta", [0, 1, 1, 5])
+        self.vender(hoy - timedelta(days=1), datetime(2026, 1, 1, 10, 0).time(), "Efectivo", [1, 1, 1, 1])
+        
+        acumulados = self.resumenes()
+        self.assertEqual(verificar_totales(self.bd), [])
+        self.assertTrue(reconstruir_resumenes(self.bd))
+        self.assertEqual(self.resumenes(), acumulados)
+        self.assertEqual(verificar_totales(self.bd), [])
+    
+    def test_verificar_detecta_resumen_desfasado(self):
+        self.vender(date.today(), datetime(2026, 1, 1, 12, 0).time(), "Efectivo", [1, 0, 0, 0])
+        self.bd.ejecutar_actualizar("UPDATE resumen_productos_dia SET ingresos = ingresos + 0.01")
+        diferencias = verificar_totales(self.bd)
+        self.assertEqual(len(diferencias), 1)
+        self.assertTrue(diferencias[0].startswith("resumen_productos_dia vs detalle_ventas"))
+        
+        self.assertTrue(reconstruir_resumenes(self.bd))
+        self.assertEqual(verificar_totales(self.bd), [])
+
+
+if __name__ == "__main__":
+    unittest.main()